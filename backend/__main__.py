@@ -0,0 +1,46 @@
+"""Production launcher: `python -m backend`.
+
+Runs uvicorn with a single worker (opt into more with `WEB_CONCURRENCY`), using
+uvloop and httptools when they are installed.
+"""
+import importlib.util
+import logging
+
+import uvicorn
+
+from .db.database import Database
+from .jobs import JOB_RETENTION_SECONDS
+from .settings import Settings
+
+
+def main() -> None:
+    settings = Settings.from_env()
+    logging.basicConfig(level=logging.INFO)
+    if settings.workers > 1:
+        logging.getLogger(__name__).warning(
+            "Running %d workers: live updates, idempotent replays of in-flight requests, /metrics "
+            "and the calendar feed cache only see their own worker's state.",
+            settings.workers,
+        )
+
+    # Jobs cannot survive a restart; clear them once instead of once per worker.
+    database = Database(settings.db_path)
+    database.fail_interrupted_jobs()
+    database.prune_jobs(JOB_RETENTION_SECONDS)
+    database.close()
+
+    uvicorn.run(
+        "backend.main:create_app",
+        factory=True,
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        timeout_graceful_shutdown=settings.graceful_timeout,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
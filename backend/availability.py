@@ -0,0 +1,114 @@
+"""Conflict detection and shared free time over a window of events.
+
+`IntervalIndex` sorts the timed events of a window once by start time; both
+queries are then a single sweep over that order, so a window of n events
+costs O(n log n) (plus one entry per reported conflict) instead of comparing
+every pair. The window itself comes from `idx_events_house_date`.
+
+All-day events have no time span and neither conflict nor block free time.
+Events without an end time last `DEFAULT_DURATION`; an end time at or before
+the start time runs to midnight.
+"""
+import heapq
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .models import Event
+
+DEFAULT_DURATION = timedelta(hours=1)
+
+
+class Interval(NamedTuple):
+    start: datetime
+    end: datetime
+    event: Event
+
+
+def event_interval(event: Event) -> Optional[Interval]:
+    """Return the time span of `event`, or None for all-day events."""
+    if event.start_time is None:
+        return None
+    start = datetime.combine(event.date, event.start_time)
+    if event.end_time is None:
+        end = start + DEFAULT_DURATION
+    elif event.end_time <= event.start_time:
+        end = datetime.combine(event.date + timedelta(days=1), time.min)
+    else:
+        end = datetime.combine(event.date, event.end_time)
+    return Interval(start, end, event)
+
+
+def involves(event: Event, people: Sequence[str]) -> bool:
+    """Whether `event` concerns any of `people`; unassigned events concern everyone."""
+    return not event.assigned_to or any(person in event.assigned_to for person in people)
+
+
+class IntervalIndex:
+    """Timed events of one window, sorted by start time."""
+
+    def __init__(self, events: Iterable[Event]):
+        intervals = (event_interval(event) for event in events)
+        self.intervals: List[Interval] = sorted(
+            (interval for interval in intervals if interval is not None),
+            key=lambda interval: (interval.start, interval.end),
+        )
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def conflicts(self) -> List[Tuple[Interval, Interval]]:
+        """Return every pair of overlapping intervals, ordered by the later one's start.
+
+        Sweeps the intervals by start time, keeping a heap of those still
+        running: each new interval overlaps exactly the ones left in the heap
+        after dropping those that ended at or before its start.
+        """
+        pairs: List[Tuple[Interval, Interval]] = []
+        active: List[Tuple[datetime, int]] = []  # (end, position in self.intervals)
+        for position, interval in enumerate(self.intervals):
+            while active and active[0][0] <= interval.start:
+                heapq.heappop(active)
+            pairs.extend((self.intervals[other], interval) for _, other in sorted(active, key=lambda item: item[1]))
+            heapq.heappush(active, (interval.end, position))
+        return pairs
+
+    def free_slots(
+        self,
+        start: date,
+        end: date,
+        day_start: time,
+        day_end: time,
+        min_duration: timedelta,
+    ) -> List[Tuple[datetime, datetime]]:
+        """Return the gaps of at least `min_duration` between `day_start` and `day_end` of each day.
+
+        Args:
+            start (date): First day of the window.
+            end (date): Last day of the window, inclusive.
+            day_start (time): Earliest time of day a slot may start.
+            day_end (time): Latest time of day a slot may end.
+            min_duration (timedelta): Shortest slot worth reporting.
+
+        Returns:
+            list: `(start, end)` pairs in chronological order.
+        """
+        slots: List[Tuple[datetime, datetime]] = []
+        intervals = iter(self.intervals)
+        pending = next(intervals, None)
+        busy_until = datetime.min
+        day = start
+        while day <= end:
+            cursor = datetime.combine(day, day_start)
+            closing = datetime.combine(day, day_end)
+            # Busy time carried over from an earlier interval (e.g. the night before)
+            cursor = max(cursor, busy_until)
+            while pending is not None and pending.start < closing:
+                if pending.start - cursor >= min_duration:
+                    slots.append((cursor, pending.start))
+                cursor = max(cursor, pending.end)
+                busy_until = max(busy_until, pending.end)
+                pending = next(intervals, None)
+            if closing - cursor >= min_duration:
+                slots.append((cursor, closing))
+            day += timedelta(days=1)
+        return slots
@@ -1,21 +1,215 @@
 import hashlib
+import heapq
+import itertools
 import json
 import secrets
+import os
+import re
 import sqlite3
+import threading
 import time
+from contextlib import contextmanager
+from datetime import date, time as time_of_day, timedelta
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from ..models import Event, Expense, HouseSettings, Reimbursement, ShoppingItem, User
+from pydantic import BaseModel
+
+from ..metrics import timed
+from ..models import (
+    Event,
+    EventPatch,
+    Expense,
+    ExpensePatch,
+    HouseSettings,
+    Job,
+    Recurrence,
+    Reimbursement,
+    SearchHit,
+    ShoppingItem,
+    ShoppingItemPatch,
+    ShoppingItemUpdate,
+    User,
+)
+from ..profiling import ProfilingConnection
+from ..recurrence import iter_occurrences, occurrences_between
+from ..settings import DEFAULT_DB_PATH
+
+# Bump whenever _ensure_tables changes so existing files get migrated on connect.
+SCHEMA_VERSION = 8
+
+# Per-house tables included in exports/imports, with the columns that travel with them.
+EXPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "events": ("title", "date", "start_time", "end_time", "description", "assigned_to", "recurrence"),
+    "shopping_items": ("name", "quantity", "added_by", "purchased"),
+    "expenses": ("title", "amount", "payer", "involved_people"),
+    "reimbursements": ("from_person", "to_person", "amount", "note"),
+}
+LIST_COLUMNS = ("assigned_to", "involved_people")
+# Columns holding a JSON object, or NULL.
+JSON_COLUMNS = ("recurrence",)
+EVENT_COLUMNS = (
+    "id, title, date, start_time, end_time, description, assigned_to, recurrence, series_id, original_date, version"
+)
+SHOPPING_COLUMNS = "id, name, quantity, added_by, purchased, version"
+EXPENSE_COLUMNS = "id, title, amount, payer, involved_people, version"
+# Tables whose rows carry a version, bumped on every change, for optimistic concurrency.
+VERSIONED_TABLES = ("events", "shopping_items", "expenses")
+# How far ahead recurring events are expanded when no window is requested.
+RECURRENCE_HORIZON_DAYS = 366
+# Change-notification topic published when a table's rows change.
+TABLE_TOPICS: Dict[str, str] = {
+    "events": "events",
+    "shopping_items": "shopping",
+    "expenses": "expenses",
+    "reimbursements": "reimbursements",
+}
+# Columns paged listings may be sorted by.
+PAGE_SORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "expenses": ("id", "title", "amount", "payer"),
+    "reimbursements": ("id", "amount", "from_person", "to_person"),
+}
+# Every topic tracked in `house_versions`; clients use the counters to revalidate cached lists.
+VERSION_TOPICS: Tuple[str, ...] = ("house", *TABLE_TOPICS.values())
+# Text indexed in `search_index` per table: the SQL of its title and body, over a row alias.
+# A row's index entry has rowid `house_id << SEARCH_HOUSE_SHIFT | id * len(SEARCH_SOURCES) + position`,
+# so each house's entries are one rowid range, and its domain column holds the table's topic.
+SEARCH_SOURCES: Dict[str, Tuple[str, str]] = {
+    "events": ("{row}.title", "{row}.description"),
+    "shopping_items": ("{row}.name", "NULL"),
+    "expenses": ("{row}.title", "NULL"),
+    "reimbursements": ("{row}.from_person || ' → ' || {row}.to_person", "{row}.note"),
+}
+SEARCH_HOUSE_SHIFT = 40
+# Relative weight of title and body matches in search ranking (bm25).
+SEARCH_WEIGHTS = (10.0, 1.0)
+# Delimiters placed around matched words in search results (STX/ETX never occur in user text).
+SEARCH_MARKS = ("\x02", "\x03")
+
+
+class VersionConflict(Exception):
+    """A conditional update found the row at another version than the client read."""
+
+    def __init__(self, version: int):
+        super().__init__(f"The record was changed meanwhile (now at version {version})")
+        self.version = version
+
+
+def _like_pattern(text: str) -> str:
+    """Build a LIKE pattern matching `text` anywhere, with `%`, `_` and `\\` escaped."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _match_expression(query: str, domains: Iterable[str]) -> Optional[str]:
+    """Build an FTS5 MATCH expression for a user query, or None if it has no words.
+
+    Every word must appear in a title or body. The last one may also be the start
+    of a word, so results follow the user's typing; earlier words are matched whole,
+    as prefix terms cost FTS5 a merge of every matching term's full doclist.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    terms = " AND ".join([*(f'"{word}"' for word in words[:-1]), f'"{words[-1]}"*'])
+    expression = f"{{title body}}: ({terms})"
+    domains = list(domains)
+    if domains:
+        expression += f" AND domain: ({' OR '.join(domains)})"
+    return expression
+
+
+def _calendar_order(event: Event) -> tuple:
+    """Sort key matching `get_events`: by date, all-day events last within a day."""
+    return (event.date, event.start_time is None, event.start_time or time_of_day.min, event.id)
+
+
+def _upcoming_order(event: Event) -> tuple:
+    """Sort key putting all-day events first within a day, as `idx_events_house_date` does."""
+    return (event.date, event.start_time is not None, event.start_time or time_of_day.min, event.id)
 
 
 class Database:
-    def __init__(self):
-        """Initialize the SQLite connection and ensure tables exist."""
-        self.db_path = Path(__file__).resolve().parent / "flatmates.db"
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self._ensure_tables()
+    def __init__(self, db_path: Optional[Path] = None):
+        """Prepare a database bound to `db_path`; the connection is opened on first use.
+
+        Args:
+            db_path (Path, optional): SQLite file, defaulting to `FLATMATES_DB_PATH`
+                or `backend/db/flatmates.db`.
+        """
+        self.db_path = Path(db_path or os.environ.get("FLATMATES_DB_PATH") or DEFAULT_DB_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._connect_lock = threading.Lock()
+        # Per-thread override of the shared connection (see `dedicated_connection`).
+        self._local = threading.local()
+        self._profiling = False
+        self._listeners: List[Callable[[int, List[str]], None]] = []
+
+    # --- Connection lifecycle ---
+    @property
+    def conn(self) -> sqlite3.Connection:
+        dedicated = getattr(self._local, "conn", None)
+        if dedicated is not None:
+            return dedicated
+        if self._conn is None:
+            with self._connect_lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+        return self._conn
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection) -> None:
+        self._conn = value
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # WAL lets several connections (and worker processes) read while one writes.
+        conn.execute("PRAGMA journal_mode=WAL")
+        return ProfilingConnection(conn) if self._profiling else conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite file and create or migrate the schema if needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._open()
+        self._conn = conn
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._ensure_tables()
+        return conn
+
+    @contextmanager
+    def dedicated_connection(self) -> Iterator[sqlite3.Connection]:
+        """Run this thread's calls on a connection of their own until the block exits.
+
+        Background jobs and imports keep write transactions open for a while. On
+        the shared connection, a request's commit or rollback would end them
+        halfway, and theirs would end the request's. Nested blocks reuse the
+        outer connection.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self._local.conn
+            return
+        self.conn  # Create or migrate the schema first
+        conn = self._open()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            conn.close()
+
+    def configure(self, db_path: Path) -> None:
+        """Point the database at another file, closing any open connection."""
+        if Path(db_path) != self.db_path:
+            self.close()
+            self.db_path = Path(db_path)
+
+    def close(self) -> None:
+        """Close the connection; the next access reopens it."""
+        with self._connect_lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
 
     # --- Setup helpers ---
     def _ensure_column(self, table: str, column: str, definition: str) -> None:
@@ -64,6 +258,18 @@ class Database:
             """
         )
 
+        # Read-only credentials for calendar subscriptions, one per user
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feed_tokens (
+                token TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL UNIQUE,
+                created_at REAL NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+            """
+        )
+
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS events (
@@ -127,8 +333,174 @@ class Database:
         self._ensure_column("shopping_items", "house_id", "INTEGER")
         self._ensure_column("expenses", "house_id", "INTEGER")
         self._ensure_column("reimbursements", "house_id", "INTEGER")
+        # Recurring events keep their rule; edited occurrences point back to their series
+        self._ensure_column("events", "recurrence", "TEXT")
+        self._ensure_column("events", "series_id", "INTEGER")
+        self._ensure_column("events", "original_date", "TEXT")
+        for table in VERSIONED_TABLES:
+            self._ensure_column(table, "version", "INTEGER NOT NULL DEFAULT 1")
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                house_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                content_type TEXT,
+                body BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency_keys(created_at)")
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS house_versions (
+                house_id INTEGER NOT NULL,
+                topic TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (house_id, topic)
+            )
+            """
+        )
+
+        # Per-house lookups and chunked deletes filter on house_id
+        for table in EXPORT_COLUMNS:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_house ON {table}(house_id)")
+        # Day and upcoming lookups walk this index in (date, start_time, id) order
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_house_date ON events(house_id, date, start_time)")
+        # Covers the per-payer totals of the expense summary
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_house_payer ON expenses(house_id, payer, amount)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_events_series ON events(house_id) WHERE recurrence IS NOT NULL"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_overrides ON events(series_id, original_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_house ON users(house_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id)")
+
+        self._ensure_search_index()
+
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def _ensure_search_index(self) -> None:
+        """Create the FTS5 search index and the triggers keeping it in sync with its tables.
+
+        Triggers (rather than each mutation method) maintain the index so that batched
+        writes (imports, shopping batches, chunked purges) stay in sync too.
+        Existing rows are indexed when the index is first created.
+        """
+        created = not self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        ).fetchone()
+        self.conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                title, body, domain,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """
+        )
+        self.conn.execute(
+            "INSERT INTO search_index (search_index, rank) VALUES ('rank', ?)",
+            (f"bm25({SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]}, 0.0)",),
+        )
+        slots = len(SEARCH_SOURCES)
+        for position, (table, (title, body)) in enumerate(SEARCH_SOURCES.items()):
+            def rowid(row: str) -> str:
+                return f"(COALESCE({row}.house_id, 0) << {SEARCH_HOUSE_SHIFT} | {row}.id * {slots} + {position})"
+
+            def entry(row: str) -> str:
+                return f"{rowid(row)}, {title.format(row=row)}, {body.format(row=row)}, '{TABLE_TOPICS[table]}'"
+
+            insert = f"INSERT INTO search_index (rowid, title, body, domain) VALUES ({entry('new')});"
+            delete = f"DELETE FROM search_index WHERE rowid = {rowid('old')};"
+            self.conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END"
+            )
+            self.conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END"
+            )
+            columns = sorted(set(re.findall(r"\{row\}\.(\w+)", f"{title} {body}")) | {"house_id"})
+            self.conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {', '.join(columns)} ON {table} "
+                f"BEGIN {delete} {insert} END"
+            )
+            if created:
+                self.conn.execute(
+                    f"INSERT INTO search_index (rowid, title, body, domain) SELECT {entry(table)} FROM {table}"
+                )
+
+    def enable_profiling(self) -> None:
+        """Route every statement through the SQL profiler (see `backend.profiling`)."""
+        self._profiling = True
+        if not isinstance(self.conn, ProfilingConnection):
+            self.conn = ProfilingConnection(self.conn)
+
+    # --- Change notification ---
+    def add_listener(self, callback: Callable[[int, List[str]], None]) -> None:
+        """Register a callback invoked with `(house_id, topics)` after each committed change."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
 
+    def _commit_changes(self, house_id: int, *topics: str) -> None:
+        """Bump the topics' versions, commit the current transaction and notify listeners."""
+        now = time.time()
+        self.conn.executemany(
+            """
+            INSERT INTO house_versions (house_id, topic, version, updated_at) VALUES (?, ?, 1, ?)
+            ON CONFLICT (house_id, topic) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+            """,
+            [(house_id, topic, now) for topic in dict.fromkeys(topics)],
+        )
         self.conn.commit()
+        self._notify(house_id, topics)
+
+    def _notify(self, house_id: int, topics: Iterable[str]) -> None:
+        for callback in self._listeners:
+            callback(house_id, list(topics))
+
+    @timed
+    def get_house_versions(self, house_id: int) -> Dict[str, int]:
+        """Return the change counter of every topic of a house (0 if never changed)."""
+        versions = {topic: 0 for topic in VERSION_TOPICS}
+        cursor = self.conn.execute("SELECT topic, version FROM house_versions WHERE house_id = ?", (house_id,))
+        for row in cursor.fetchall():
+            versions[row["topic"]] = row["version"]
+        return versions
+
+    @timed
+    def get_topics_stamp(self, house_id: int, topics: Iterable[str]) -> Tuple[Tuple[int, ...], Optional[float]]:
+        """Return the versions of `topics` (in order) and the time of the latest change among them."""
+        topics = tuple(topics)
+        cursor = self.conn.execute(
+            f"SELECT topic, version, updated_at FROM house_versions WHERE house_id = ? "
+            f"AND topic IN ({', '.join('?' for _ in topics)})",
+            (house_id, *topics),
+        )
+        rows = {row["topic"]: row for row in cursor.fetchall()}
+        versions = tuple(rows[topic]["version"] if topic in rows else 0 for topic in topics)
+        updated_at = max((row["updated_at"] for row in rows.values()), default=None)
+        return versions, updated_at
 
     # --- Serialization helpers ---
     @staticmethod
@@ -145,6 +517,19 @@ class Database:
         except json.JSONDecodeError:
             return []
 
+    @classmethod
+    def _column_value(cls, value: Any) -> Any:
+        """Convert a model field value to the form stored in its column (see the row builders)."""
+        if isinstance(value, (date, time_of_day)):
+            return value.isoformat()
+        if isinstance(value, list):
+            return cls._serialize_list(value)
+        if isinstance(value, BaseModel):
+            return value.model_dump_json()
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
     # --- Auth helpers ---
     def _hash_password(self, password: str, salt: Optional[str] = None) -> Tuple[str, str]:
         salt_to_use = salt or secrets.token_hex(16)
@@ -154,6 +539,7 @@ class Database:
     def _row_to_user(self, row: sqlite3.Row) -> User:
         return User(id=row["id"], username=row["username"], house_id=row["house_id"])
 
+    @timed
     def create_house(self, name: str) -> HouseSettings:
         cursor = self.conn.execute(
             "INSERT INTO houses (name, join_code) VALUES (?, ?)",
@@ -162,13 +548,15 @@ class Database:
         house_id = cursor.lastrowid
         join_code = str(house_id)
         self.conn.execute("UPDATE houses SET join_code = ? WHERE id = ?", (join_code, house_id))
-        self.conn.commit()
+        self._commit_changes(house_id, "house")
         return self.get_house_settings(house_id)
 
+    @timed
     def get_house_by_code(self, code: str) -> Optional[sqlite3.Row]:
         cursor = self.conn.execute("SELECT id, name, join_code FROM houses WHERE join_code = ?", (code,))
         return cursor.fetchone()
 
+    @timed
     def get_house_settings(self, house_id: int) -> HouseSettings:
         cursor = self.conn.execute("SELECT id, name, join_code FROM houses WHERE id = ?", (house_id,))
         row = cursor.fetchone()
@@ -177,29 +565,34 @@ class Database:
         members = self.get_house_members(house_id)
         return HouseSettings(id=row["id"], name=row["name"] or "", flatmates=members, join_code=row["join_code"])
 
+    @timed
     def update_house_settings(self, house_id: int, settings: HouseSettings) -> HouseSettings:
         self.conn.execute("UPDATE houses SET name = ? WHERE id = ?", (settings.name, house_id))
-        self.conn.commit()
+        self._commit_changes(house_id, "house")
         return self.get_house_settings(house_id)
 
+    @timed
     def get_house_members(self, house_id: int) -> List[str]:
         cursor = self.conn.execute("SELECT username FROM users WHERE house_id = ? ORDER BY username ASC", (house_id,))
         return [row["username"] for row in cursor.fetchall()]
 
+    @timed
     def create_user(self, username: str, password: str, house_id: int) -> User:
         salt, hashed = self._hash_password(password)
         cursor = self.conn.execute(
             "INSERT INTO users (username, password_hash, password_salt, house_id) VALUES (?, ?, ?, ?)",
             (username, hashed, salt, house_id),
         )
-        self.conn.commit()
+        self._commit_changes(house_id, "house")
         return self._row_to_user(self.conn.execute("SELECT * FROM users WHERE id = ?", (cursor.lastrowid,)).fetchone())
 
+    @timed
     def get_user_by_username(self, username: str) -> Optional[User]:
         cursor = self.conn.execute("SELECT * FROM users WHERE username = ?", (username,))
         row = cursor.fetchone()
         return self._row_to_user(row) if row else None
 
+    @timed
     def verify_user_credentials(self, username: str, password: str) -> Optional[User]:
         cursor = self.conn.execute("SELECT * FROM users WHERE username = ?", (username,))
         row = cursor.fetchone()
@@ -211,6 +604,7 @@ class Database:
             return None
         return self._row_to_user(row)
 
+    @timed
     def create_session_token(self, user_id: int) -> str:
         token = secrets.token_hex(16)
         self.conn.execute(
@@ -220,6 +614,7 @@ class Database:
         self.conn.commit()
         return token
 
+    @timed
     def get_user_by_token(self, token: str) -> Optional[User]:
         cursor = self.conn.execute(
             """
@@ -233,175 +628,619 @@ class Database:
         row = cursor.fetchone()
         return self._row_to_user(row) if row else None
 
+    @timed
+    def get_feed_token(self, user_id: int, rotate: bool = False) -> str:
+        """Return the user's calendar feed token, creating it (or a new one when `rotate`) if needed.
+
+        Feed tokens only authenticate `/calendar/feed.ics`; rotating revokes the previous one.
+        """
+        if not rotate:
+            row = self.conn.execute("SELECT token FROM feed_tokens WHERE user_id = ?", (user_id,)).fetchone()
+            if row:
+                return row["token"]
+        token = secrets.token_hex(16)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO feed_tokens (token, user_id, created_at) VALUES (?, ?, ?)",
+            (token, user_id, time.time()),
+        )
+        self.conn.commit()
+        return token
+
+    @timed
+    def get_user_by_feed_token(self, token: str) -> Optional[User]:
+        cursor = self.conn.execute(
+            """
+            SELECT users.id, users.username, users.house_id
+            FROM feed_tokens
+            JOIN users ON users.id = feed_tokens.user_id
+            WHERE feed_tokens.token = ?
+            """,
+            (token,),
+        )
+        row = cursor.fetchone()
+        return self._row_to_user(row) if row else None
+
+    # --- Row builders (column order matches EXPORT_COLUMNS) ---
+    def _event_values(self, event: Event) -> tuple:
+        return (
+            event.title,
+            event.date.isoformat(),
+            event.start_time.isoformat() if event.start_time else None,
+            event.end_time.isoformat() if event.end_time else None,
+            event.description,
+            self._serialize_list(event.assigned_to),
+            event.recurrence.model_dump_json() if event.recurrence else None,
+        )
+
+    def _shopping_item_values(self, item: ShoppingItem) -> tuple:
+        return (item.name, item.quantity, item.added_by, 1 if item.purchased else 0)
+
+    def _expense_values(self, expense: Expense) -> tuple:
+        return (expense.title, expense.amount, expense.payer, self._serialize_list(expense.involved_people))
+
+    def _reimbursement_values(self, reimbursement: Reimbursement) -> tuple:
+        return (reimbursement.from_person, reimbursement.to_person, reimbursement.amount, reimbursement.note)
+
+    def _patch_row(
+        self,
+        table: str,
+        row_id: int,
+        house_id: int,
+        fields: Dict[str, Any],
+        columns: str,
+        version: Optional[int] = None,
+    ) -> Optional[sqlite3.Row]:
+        """Set `fields` of one row in a single statement and return its `columns` afterwards.
+
+        The row's version is bumped with the change. If `version` is given, the
+        update only applies while the row is still at that version.
+
+        Raises:
+            VersionConflict: If the row exists but is at another version.
+        """
+        where = "id = ? AND house_id = ?" + (" AND version = ?" if version is not None else "")
+        params: tuple = (row_id, house_id, *(() if version is None else (version,)))
+        if not fields:
+            rows = self.conn.execute(f"SELECT {columns} FROM {table} WHERE {where}", params).fetchall()
+        else:
+            # The savepoint scopes undoing a miss or failure to this statement; a commit or
+            # rollback of the whole connection would also end other callers' pending writes.
+            self.conn.execute("SAVEPOINT patch_row")
+            try:
+                assignments = ", ".join(f"{column} = ?" for column in fields)
+                rows = self.conn.execute(
+                    f"UPDATE {table} SET {assignments}, version = version + 1 WHERE {where} RETURNING {columns}",
+                    (*(self._column_value(value) for value in fields.values()), *params),
+                ).fetchall()
+                if rows:
+                    self._commit_changes(house_id, TABLE_TOPICS[table])
+            except Exception:
+                self.conn.execute("ROLLBACK TO patch_row")
+                self.conn.execute("RELEASE patch_row")
+                raise
+            if not rows:
+                self.conn.execute("ROLLBACK TO patch_row")
+                self.conn.execute("RELEASE patch_row")
+        if rows:
+            return rows[0]
+        # Missed: either the row is gone (or in another house) or someone changed it first.
+        current = self.conn.execute(
+            f"SELECT version FROM {table} WHERE id = ? AND house_id = ?", (row_id, house_id)
+        ).fetchone()
+        if current is None:
+            return None
+        raise VersionConflict(current["version"])
+
     # --- Domain data accessors ---
+    @timed
     def add_event(self, event: Event, house_id: int) -> Event:
         cursor = self.conn.execute(
             """
-            INSERT INTO events (title, date, start_time, end_time, description, assigned_to, house_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO events (title, date, start_time, end_time, description, assigned_to, recurrence, house_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                event.title,
-                event.date.isoformat(),
-                event.start_time.isoformat() if event.start_time else None,
-                event.end_time.isoformat() if event.end_time else None,
-                event.description,
-                self._serialize_list(event.assigned_to),
-                house_id,
-            ),
+            (*self._event_values(event), house_id),
         )
-        self.conn.commit()
-        return event.model_copy(update={"id": cursor.lastrowid})
+        self._commit_changes(house_id, "events")
+        return event.model_copy(update={"id": cursor.lastrowid, "series_id": None, "occurrence": None, "version": 1})
 
+    @timed
     def update_event(self, event_id: int, event: Event, house_id: int) -> Optional[Event]:
-        cursor = self.conn.execute("SELECT id FROM events WHERE id = ? AND house_id = ?", (event_id, house_id))
-        if not cursor.fetchone():
+        """Replace an event's fields; a `recurrence` left out of `event` keeps the stored rule and its exdates."""
+        fields = dict(zip(EXPORT_COLUMNS["events"], self._event_values(event)))
+        if "recurrence" not in event.model_fields_set:
+            fields.pop("recurrence")
+        row = self._patch_row("events", event_id, house_id, fields, EVENT_COLUMNS, event.version)
+        return self._row_to_event(row) if row else None
+
+    @timed
+    def patch_event(self, event_id: int, patch: EventPatch, house_id: int) -> Optional[Event]:
+        """Change only the fields set in `patch`, if the event is still at `patch.version`."""
+        fields = {name: getattr(patch, name) for name in patch.model_fields_set - {"version"}}
+        row = self._patch_row("events", event_id, house_id, fields, EVENT_COLUMNS, patch.version)
+        return self._row_to_event(row) if row else None
+
+    @timed
+    def override_occurrence(self, series_id: int, original_date: date, event: Event, house_id: int) -> Optional[Event]:
+        """Store an edited occurrence of a series as an exception.
+
+        The edit becomes its own (non-recurring) row linked to the series, and
+        `original_date` is added to the series' `exdates` so expansion skips it.
+        Editing the same occurrence again updates that row.
+
+        Returns:
+            Event: The stored exception, or None if the series does not exist.
+
+        Raises:
+            ValueError: If the series has no occurrence on `original_date`.
+        """
+        series = self.conn.execute(
+            f"SELECT {EVENT_COLUMNS} FROM events WHERE id = ? AND house_id = ? AND recurrence IS NOT NULL",
+            (series_id, house_id),
+        ).fetchone()
+        if not series:
             return None
+        values = self._event_values(event.model_copy(update={"recurrence": None}))
+        existing = self.conn.execute(
+            "SELECT id FROM events WHERE series_id = ? AND original_date = ? AND house_id = ?",
+            (series_id, original_date.isoformat(), house_id),
+        ).fetchone()
+        try:
+            if existing:
+                event_id = existing["id"]
+                cursor = self.conn.execute(
+                    """
+                    UPDATE events
+                    SET title = ?, date = ?, start_time = ?, end_time = ?, description = ?, assigned_to = ?, recurrence = ?,
+                        version = version + 1
+                    WHERE id = ?
+                    RETURNING version
+                    """,
+                    (*values, event_id),
+                )
+                version = cursor.fetchall()[0]["version"]
+            else:
+                rule = Recurrence.model_validate_json(series["recurrence"])
+                dtstart = date.fromisoformat(series["date"])
+                scheduled = iter_occurrences(rule.model_copy(update={"exdates": []}), dtstart, original_date)
+                if next(scheduled, None) != original_date:
+                    raise ValueError(f"The series has no occurrence on {original_date.isoformat()}")
+                cursor = self.conn.execute(
+                    """
+                    INSERT INTO events
+                        (title, date, start_time, end_time, description, assigned_to, recurrence, house_id, series_id, original_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (*values, house_id, series_id, original_date.isoformat()),
+                )
+                event_id, version = cursor.lastrowid, 1
+                self._set_exdates(series_id, rule, rule.exdates + [original_date])
+            self._commit_changes(house_id, "events")
+        except Exception:
+            self.conn.rollback()
+            raise
+        return event.model_copy(
+            update={
+                "id": event_id,
+                "recurrence": None,
+                "series_id": series_id,
+                "occurrence": original_date,
+                "version": version,
+            }
+        )
+
+    @timed
+    def cancel_occurrence(self, series_id: int, original_date: date, house_id: int) -> bool:
+        """Skip one occurrence of a series, dropping its edited copy if there is one.
+
+        Returns:
+            bool: False if the series does not exist.
+        """
+        series = self.conn.execute(
+            "SELECT recurrence FROM events WHERE id = ? AND house_id = ? AND recurrence IS NOT NULL",
+            (series_id, house_id),
+        ).fetchone()
+        if not series:
+            return False
+        rule = Recurrence.model_validate_json(series["recurrence"])
+        try:
+            if original_date not in rule.exdates:
+                self._set_exdates(series_id, rule, rule.exdates + [original_date])
+            self.conn.execute(
+                "DELETE FROM events WHERE series_id = ? AND original_date = ? AND house_id = ?",
+                (series_id, original_date.isoformat(), house_id),
+            )
+            self._commit_changes(house_id, "events")
+        except Exception:
+            self.conn.rollback()
+            raise
+        return True
+
+    def _set_exdates(self, series_id: int, rule: Recurrence, exdates: List[date]) -> None:
+        updated = rule.model_copy(update={"exdates": sorted(set(exdates))})
         self.conn.execute(
-            """
-            UPDATE events
-            SET title = ?,
-                date = ?,
-                start_time = ?,
-                end_time = ?,
-                description = ?,
-                assigned_to = ?
-            WHERE id = ? AND house_id = ?
-            """,
-            (
-                event.title,
-                event.date.isoformat(),
-                event.start_time.isoformat() if event.start_time else None,
-                event.end_time.isoformat() if event.end_time else None,
-                event.description,
-                self._serialize_list(event.assigned_to),
-                event_id,
-                house_id,
-            ),
+            "UPDATE events SET recurrence = ?, version = version + 1 WHERE id = ?", (updated.model_dump_json(), series_id)
         )
-        self.conn.commit()
-        return event.model_copy(update={"id": event_id})
 
-    def get_events(self, house_id: int) -> List[Event]:
+    def _row_to_event(self, row: sqlite3.Row) -> Event:
+        return Event(
+            id=row["id"],
+            title=row["title"],
+            date=row["date"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            description=row["description"],
+            assigned_to=self._deserialize_list(row["assigned_to"]),
+            recurrence=Recurrence.model_validate_json(row["recurrence"]) if row["recurrence"] else None,
+            series_id=row["series_id"],
+            occurrence=row["original_date"],
+            version=row["version"],
+        )
+
+    def _series(self, house_id: int, assignee: Optional[str] = None) -> List[sqlite3.Row]:
+        """Return the house's recurring events, optionally only those assigned to `assignee`."""
+        assignee_filter = (
+            "AND EXISTS (SELECT 1 FROM json_each(events.assigned_to) WHERE json_each.value = ?)" if assignee else ""
+        )
         cursor = self.conn.execute(
-            """
-            SELECT id, title, date, start_time, end_time, description, assigned_to
+            f"SELECT {EVENT_COLUMNS} FROM events WHERE house_id = ? AND recurrence IS NOT NULL {assignee_filter}",
+            (house_id, *((assignee,) if assignee else ())),
+        )
+        return cursor.fetchall()
+
+    def _occurrence(self, series: Event, day: date) -> Event:
+        return series.model_copy(update={"date": day, "series_id": series.id, "occurrence": day})
+
+    def _expand(self, rows: List[sqlite3.Row], start: date, end: date) -> List[Event]:
+        """Expand recurring rows into their occurrences between `start` and `end` (inclusive)."""
+        events: List[Event] = []
+        for row in rows:
+            days = occurrences_between(row["recurrence"], date.fromisoformat(row["date"]), start, end)
+            if days:
+                series = self._row_to_event(row)
+                events.extend(self._occurrence(series, day) for day in days)
+        return events
+
+    @timed
+    def get_events(self, house_id: int, start: Optional[date] = None, end: Optional[date] = None) -> List[Event]:
+        """Return the house's events, with recurring ones expanded into occurrences.
+
+        Either bound may be omitted: single events are then unbounded on that side,
+        and recurring events are expanded from their first date or up to
+        `RECURRENCE_HORIZON_DAYS` from today.
+        """
+        window = ("AND date >= ? " if start else "") + ("AND date <= ?" if end else "")
+        bounds = tuple(bound.isoformat() for bound in (start, end) if bound)
+        cursor = self.conn.execute(
+            f"""
+            SELECT {EVENT_COLUMNS}
             FROM events
-            WHERE house_id = ?
+            WHERE house_id = ? AND recurrence IS NULL {window}
             ORDER BY date ASC, (start_time IS NULL), start_time ASC, id ASC
             """,
-            (house_id,),
+            (house_id, *bounds),
         )
-        events: List[Event] = []
-        for row in cursor.fetchall():
-            events.append(
-                Event(
-                    id=row["id"],
-                    title=row["title"],
-                    date=row["date"],
-                    start_time=row["start_time"],
-                    end_time=row["end_time"],
-                    description=row["description"],
-                    assigned_to=self._deserialize_list(row["assigned_to"]),
-                )
-            )
-        return events
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
+        series = self._series(house_id)
+        if not series:
+            return events
+        events += self._expand(
+            series, start or date.min, end or date.today() + timedelta(days=RECURRENCE_HORIZON_DAYS)
+        )
+        return sorted(events, key=_calendar_order)
 
+    @timed
+    def get_events_on(self, house_id: int, day: date) -> List[Event]:
+        """Return the events of one day, all-day events first."""
+        cursor = self.conn.execute(
+            f"""
+            SELECT {EVENT_COLUMNS}
+            FROM events
+            WHERE house_id = ? AND date = ? AND recurrence IS NULL
+            ORDER BY start_time ASC, id ASC
+            """,
+            (house_id, day.isoformat()),
+        )
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
+        occurrences = self._expand(self._series(house_id), day, day)
+        if not occurrences:
+            return events
+        return sorted(events + occurrences, key=_upcoming_order)
+
+    @timed
+    def get_upcoming_events(
+        self, house_id: int, start: date, limit: int, assignee: Optional[str] = None
+    ) -> List[Event]:
+        """Return the first `limit` events on or after `start`, optionally only those assigned to `assignee`.
+
+        The ordering matches `idx_events_house_date`, so SQLite stops after `limit` rows
+        instead of sorting the house's whole history. Each recurring event contributes
+        at most `limit` occurrences, generated lazily from `start`.
+        """
+        assignee_filter = (
+            "AND EXISTS (SELECT 1 FROM json_each(events.assigned_to) WHERE json_each.value = ?)" if assignee else ""
+        )
+        cursor = self.conn.execute(
+            f"""
+            SELECT {EVENT_COLUMNS}
+            FROM events
+            WHERE house_id = ? AND date >= ? AND recurrence IS NULL {assignee_filter}
+            ORDER BY date ASC, start_time ASC, id ASC
+            LIMIT ?
+            """,
+            (house_id, start.isoformat(), *((assignee,) if assignee else ()), limit),
+        )
+        events = [self._row_to_event(row) for row in cursor.fetchall()]
+        for row in self._series(house_id, assignee):
+            series = self._row_to_event(row)
+            days = itertools.islice(iter_occurrences(series.recurrence, series.date, start), limit)
+            events.extend(self._occurrence(series, day) for day in days)
+        return heapq.nsmallest(limit, events, key=_upcoming_order)
+
+    @timed
     def add_shopping_item(self, item: ShoppingItem, house_id: int) -> ShoppingItem:
         cursor = self.conn.execute(
             """
             INSERT INTO shopping_items (name, quantity, added_by, purchased, house_id)
             VALUES (?, ?, ?, ?, ?)
             """,
-            (item.name, item.quantity, item.added_by, 1 if item.purchased else 0, house_id),
+            (*self._shopping_item_values(item), house_id),
+        )
+        self._commit_changes(house_id, "shopping")
+        return item.model_copy(update={"id": cursor.lastrowid, "version": 1})
+
+    def _row_to_shopping_item(self, row: sqlite3.Row) -> ShoppingItem:
+        return ShoppingItem(
+            id=row["id"],
+            name=row["name"],
+            quantity=row["quantity"],
+            added_by=row["added_by"],
+            purchased=bool(row["purchased"]),
+            version=row["version"],
         )
-        self.conn.commit()
-        return item.model_copy(update={"id": cursor.lastrowid})
 
+    @timed
     def get_shopping_list(self, house_id: int) -> List[ShoppingItem]:
         cursor = self.conn.execute(
-            """
-            SELECT id, name, quantity, added_by, purchased
-            FROM shopping_items
-            WHERE house_id = ?
-            ORDER BY id ASC
-            """,
-            (house_id,),
+            f"SELECT {SHOPPING_COLUMNS} FROM shopping_items WHERE house_id = ? ORDER BY id ASC", (house_id,)
         )
-        items: List[ShoppingItem] = []
-        for row in cursor.fetchall():
-            items.append(
-                ShoppingItem(
-                    id=row["id"],
-                    name=row["name"],
-                    quantity=row["quantity"],
-                    added_by=row["added_by"],
-                    purchased=bool(row["purchased"]),
-                )
-            )
-        return items
+        return [self._row_to_shopping_item(row) for row in cursor.fetchall()]
+
+    @timed
+    def patch_shopping_item(self, item_id: int, patch: ShoppingItemPatch, house_id: int) -> Optional[ShoppingItem]:
+        """Change only the fields set in `patch`, if the item is still at `patch.version`."""
+        fields = {name: getattr(patch, name) for name in patch.model_fields_set - {"version"}}
+        row = self._patch_row("shopping_items", item_id, house_id, fields, SHOPPING_COLUMNS, patch.version)
+        return self._row_to_shopping_item(row) if row else None
 
+    @timed
     def remove_shopping_item(self, item_id: int, house_id: int) -> None:
         self.conn.execute("DELETE FROM shopping_items WHERE id = ? AND house_id = ?", (item_id, house_id))
-        self.conn.commit()
+        self._commit_changes(house_id, "shopping")
+
+    @timed
+    def apply_shopping_batch(
+        self,
+        house_id: int,
+        updates: List[ShoppingItemUpdate],
+        deletes: List[int],
+        versions: Optional[Dict[int, int]] = None,
+    ) -> None:
+        """Apply quantity/purchased edits and deletions in one transaction.
+
+        Fields left as None keep their stored value; IDs from other houses (or
+        already deleted) are ignored.
+
+        Raises:
+            VersionConflict: If an item listed in `versions` is no longer at that
+                version; nothing is applied then.
+        """
+        versions = versions or {}
 
+        def check(cursor: sqlite3.Cursor, item_id: int) -> None:
+            if cursor.rowcount == 0 and item_id in versions:
+                current = self.conn.execute(
+                    "SELECT version FROM shopping_items WHERE id = ? AND house_id = ?", (item_id, house_id)
+                ).fetchone()
+                if current:
+                    raise VersionConflict(current["version"])
+
+        try:
+            for update in updates:
+                cursor = self.conn.execute(
+                    """
+                    UPDATE shopping_items
+                    SET quantity = COALESCE(?, quantity), purchased = COALESCE(?, purchased), version = version + 1
+                    WHERE id = ? AND house_id = ? AND version = COALESCE(?, version)
+                    """,
+                    (
+                        update.quantity,
+                        None if update.purchased is None else int(update.purchased),
+                        update.id,
+                        house_id,
+                        versions.get(update.id),
+                    ),
+                )
+                check(cursor, update.id)
+            for item_id in deletes:
+                cursor = self.conn.execute(
+                    "DELETE FROM shopping_items WHERE id = ? AND house_id = ? AND version = COALESCE(?, version)",
+                    (item_id, house_id, versions.get(item_id)),
+                )
+                check(cursor, item_id)
+            self._commit_changes(house_id, "shopping")
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    @timed
     def add_expense(self, expense: Expense, house_id: int) -> Expense:
         cursor = self.conn.execute(
             """
             INSERT INTO expenses (title, amount, payer, involved_people, house_id)
             VALUES (?, ?, ?, ?, ?)
             """,
-            (
-                expense.title,
-                expense.amount,
-                expense.payer,
-                self._serialize_list(expense.involved_people),
-                house_id,
-            ),
+            (*self._expense_values(expense), house_id),
         )
-        self.conn.commit()
-        return expense.model_copy(update={"id": cursor.lastrowid})
+        self._commit_changes(house_id, "expenses")
+        return expense.model_copy(update={"id": cursor.lastrowid, "version": 1})
+
+    @timed
+    def patch_expense(self, expense_id: int, patch: ExpensePatch, house_id: int) -> Optional[Expense]:
+        """Change only the fields set in `patch`, if the expense is still at `patch.version`."""
+        fields = {name: getattr(patch, name) for name in patch.model_fields_set - {"version"}}
+        row = self._patch_row("expenses", expense_id, house_id, fields, EXPENSE_COLUMNS, patch.version)
+        return self._row_to_expense(row) if row else None
+
+    def _row_to_expense(self, row: sqlite3.Row) -> Expense:
+        return Expense(
+            id=row["id"],
+            title=row["title"],
+            amount=row["amount"],
+            payer=row["payer"],
+            involved_people=self._deserialize_list(row["involved_people"]),
+            version=row["version"],
+        )
+
+    def _row_to_reimbursement(self, row: sqlite3.Row) -> Reimbursement:
+        return Reimbursement(
+            id=row["id"],
+            from_person=row["from_person"],
+            to_person=row["to_person"],
+            amount=row["amount"],
+            note=row["note"],
+        )
+
+    def _page(
+        self,
+        table: str,
+        filters: List[Tuple[str, tuple]],
+        house_id: int,
+        sort: str,
+        descending: bool,
+        offset: int,
+        limit: int,
+    ) -> Tuple[List[sqlite3.Row], int]:
+        """Return one sorted page of a house's rows and the number of rows matching `filters`.
 
+        `filters` are `(sql, params)` conditions ANDed to the house filter; `sort`
+        must be a column of `PAGE_SORT_COLUMNS[table]`. Ties are broken by id so
+        pages never overlap.
+        """
+        if sort not in PAGE_SORT_COLUMNS[table]:
+            raise ValueError(f"Cannot sort {table} by {sort!r}")
+        where = " AND ".join(["house_id = ?", *(sql for sql, _ in filters)])
+        params = (house_id, *(value for _, values in filters for value in values))
+        direction = "DESC" if descending else "ASC"
+        order = f"{sort} {direction}" if sort == "id" else f"{sort} {direction}, id {direction}"
+        columns = ("id", *EXPORT_COLUMNS[table], *(("version",) if table in VERSIONED_TABLES else ()))
+        total = self.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+        rows = self.conn.execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+        return rows, total
+
+    @timed
     def get_expenses(self, house_id: int) -> List[Expense]:
+        cursor = self.conn.execute(
+            f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE house_id = ? ORDER BY id ASC", (house_id,)
+        )
+        return [self._row_to_expense(row) for row in cursor.fetchall()]
+
+    @timed
+    def get_expenses_page(
+        self,
+        house_id: int,
+        offset: int = 0,
+        limit: int = 20,
+        sort: str = "id",
+        descending: bool = True,
+        search: Optional[str] = None,
+        person: Optional[str] = None,
+    ) -> Tuple[List[Expense], int]:
+        """Return one page of expenses and the total matching the filters.
+
+        `search` matches the title case-insensitively; `person` matches the payer
+        or anyone the expense is split with.
+        """
+        filters: List[Tuple[str, tuple]] = []
+        if search:
+            filters.append(("title LIKE ? ESCAPE '\\'", (_like_pattern(search),)))
+        if person:
+            filters.append((
+                "(payer = ? OR EXISTS (SELECT 1 FROM json_each(expenses.involved_people) WHERE json_each.value = ?))",
+                (person, person),
+            ))
+        rows, total = self._page("expenses", filters, house_id, sort, descending, offset, limit)
+        return [self._row_to_expense(row) for row in rows], total
+
+    @timed
+    def get_expense_totals(self, house_id: int) -> Tuple[float, int, Dict[str, float]]:
         cursor = self.conn.execute(
             """
-            SELECT id, title, amount, payer, involved_people
+            SELECT payer, SUM(amount) AS total, COUNT(*) AS count
             FROM expenses
             WHERE house_id = ?
-            ORDER BY id ASC
+            GROUP BY payer
             """,
             (house_id,),
         )
-        expenses: List[Expense] = []
+        by_payer: Dict[str, float] = {}
+        total, count = 0.0, 0
         for row in cursor.fetchall():
-            expenses.append(
-                Expense(
-                    id=row["id"],
-                    title=row["title"],
-                    amount=row["amount"],
-                    payer=row["payer"],
-                    involved_people=self._deserialize_list(row["involved_people"]),
+            by_payer[row["payer"]] = row["total"]
+            total += row["total"]
+            count += row["count"]
+        return total, count, by_payer
+
+    @timed
+    def get_balances(self, house_id: int) -> Dict[str, float]:
+        """Net balance per person: what they paid or sent minus their shares and what they received.
+
+        Expenses without anyone to split with are ignored, as are non-positive reimbursements.
+        People come in order of first appearance (expenses by id, payer before the
+        people involved, then reimbursements by id), which decides how ties are
+        settled by the greedy pairing of debtors and creditors.
+        """
+        cursor = self.conn.execute(
+            """
+            SELECT person, SUM(amount) AS balance FROM (
+                SELECT person, amount, ROW_NUMBER() OVER (ORDER BY source, row_id, position) AS appearance
+                FROM (
+                    SELECT payer AS person, amount, 0 AS source, id AS row_id, -1 AS position FROM expenses
+                    WHERE house_id = :house AND json_array_length(involved_people) > 0
+                    UNION ALL
+                    SELECT share.value, -expenses.amount / json_array_length(expenses.involved_people),
+                           0, expenses.id, share.key
+                    FROM expenses, json_each(expenses.involved_people) AS share
+                    WHERE expenses.house_id = :house
+                    UNION ALL
+                    SELECT from_person, amount, 1, id, 0 FROM reimbursements WHERE house_id = :house AND amount > 0
+                    UNION ALL
+                    SELECT to_person, -amount, 1, id, 1 FROM reimbursements WHERE house_id = :house AND amount > 0
                 )
             )
-        return expenses
+            GROUP BY person
+            ORDER BY MIN(appearance)
+            """,
+            {"house": house_id},
+        )
+        return {row["person"]: row["balance"] for row in cursor.fetchall()}
 
+    @timed
     def add_reimbursement(self, reimbursement: Reimbursement, house_id: int) -> Reimbursement:
         cursor = self.conn.execute(
             """
             INSERT INTO reimbursements (from_person, to_person, amount, note, house_id)
             VALUES (?, ?, ?, ?, ?)
             """,
-            (
-                reimbursement.from_person,
-                reimbursement.to_person,
-                reimbursement.amount,
-                reimbursement.note,
-                house_id,
-            ),
+            (*self._reimbursement_values(reimbursement), house_id),
         )
-        self.conn.commit()
+        self._commit_changes(house_id, "reimbursements")
         return reimbursement.model_copy(update={"id": cursor.lastrowid})
 
+    @timed
     def get_reimbursements(self, house_id: int) -> List[Reimbursement]:
         cursor = self.conn.execute(
             """
@@ -412,44 +1251,337 @@ class Database:
             """,
             (house_id,),
         )
-        reimbursements: List[Reimbursement] = []
-        for row in cursor.fetchall():
-            reimbursements.append(
-                Reimbursement(
-                    id=row["id"],
-                    from_person=row["from_person"],
-                    to_person=row["to_person"],
-                    amount=row["amount"],
-                    note=row["note"],
-                )
+        return [self._row_to_reimbursement(row) for row in cursor.fetchall()]
+
+    @timed
+    def get_reimbursements_page(
+        self,
+        house_id: int,
+        offset: int = 0,
+        limit: int = 20,
+        sort: str = "id",
+        descending: bool = True,
+        person: Optional[str] = None,
+    ) -> Tuple[List[Reimbursement], int]:
+        """Return one page of reimbursements and the total, optionally only those `person` sent or received."""
+        filters: List[Tuple[str, tuple]] = []
+        if person:
+            filters.append(("(from_person = ? OR to_person = ?)", (person, person)))
+        rows, total = self._page("reimbursements", filters, house_id, sort, descending, offset, limit)
+        return [self._row_to_reimbursement(row) for row in rows], total
+
+    # --- Search ---
+    @timed
+    def search(
+        self, house_id: int, query: str, domains: Iterable[str] = (), limit: int = 20, offset: int = 0
+    ) -> List[SearchHit]:
+        """Return the house's rows matching every word of `query` (the last one as a prefix), best first.
+
+        Args:
+            house_id (int): House to search.
+            query (str): Free text; punctuation is ignored.
+            domains: Topics to restrict the search to (`events`, `shopping`, `expenses`,
+                `reimbursements`); all of them when empty.
+            limit (int): Maximum number of hits.
+            offset (int): Hits to skip, for paging.
+
+        Returns:
+            List[SearchHit]: Hits ranked by bm25, titles weighted above bodies. Matched
+            words in `title` and `snippet` are wrapped in `SEARCH_MARKS`.
+        """
+        expression = _match_expression(query, domains)
+        if expression is None:
+            return []
+        # The house's entries are one rowid range, which FTS5 seeks to in every term's doclist
+        first_rowid = house_id << SEARCH_HOUSE_SHIFT
+        last_rowid = first_rowid + (1 << SEARCH_HOUSE_SHIFT) - 1
+        cursor = self.conn.execute(
+            """
+            SELECT rowid, domain, rank,
+                   highlight(search_index, 0, ?, ?) AS title,
+                   snippet(search_index, 1, ?, ?, '…', 16) AS snippet
+            FROM search_index
+            WHERE search_index MATCH ? AND rowid BETWEEN ? AND ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+            """,
+            (*SEARCH_MARKS, *SEARCH_MARKS, expression, first_rowid, last_rowid, limit, offset),
+        )
+        return [
+            SearchHit(
+                domain=row["domain"],
+                id=(row["rowid"] & ((1 << SEARCH_HOUSE_SHIFT) - 1)) // len(SEARCH_SOURCES),
+                title=row["title"] or "",
+                snippet=row["snippet"] or None,
+                score=-row["rank"],
             )
-        return reimbursements
+            for row in cursor.fetchall()
+        ]
 
+    # --- Bulk export/import ---
+    def iter_house_rows(self, house_id: int, batch_size: int = 500) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield `(entity, row)` pairs for every exportable row of a house.
+
+        Rows are pulled with `fetchmany` so memory stays bounded regardless of house size.
+        List columns are decoded from their stored JSON representation.
+        """
+        for table, columns in EXPORT_COLUMNS.items():
+            cursor = self.conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE house_id = ? ORDER BY id ASC",
+                (house_id,),
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    record = dict(zip(columns, row))
+                    for column in LIST_COLUMNS:
+                        if column in record:
+                            record[column] = self._deserialize_list(record[column])
+                    for column in JSON_COLUMNS:
+                        if record.get(column):
+                            record[column] = json.loads(record[column])
+                    yield table, record
+
+    @timed
+    def import_house_data(
+        self,
+        house_id: int,
+        records: Iterable[Tuple[str, Dict[str, Any]]],
+        batch_size: int = 1000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, int]:
+        """Insert exported rows into a house within a single transaction.
+
+        Args:
+            house_id (int): Target house; ids from the source are not preserved.
+            records: Iterable of `(entity, row)` pairs as produced by `iter_house_rows`.
+            batch_size (int): Rows buffered per table before an `executemany` flush.
+            progress: Optional callback receiving the running total after each flush.
+
+        Returns:
+            dict: Number of imported rows per table.
+
+        Raises:
+            ValueError: If an entity is unknown or a row fails validation. Nothing is written.
+        """
+        builders = {
+            "events": lambda data: self._event_values(Event.model_validate(data)),
+            "shopping_items": lambda data: self._shopping_item_values(ShoppingItem.model_validate(data)),
+            "expenses": lambda data: self._expense_values(Expense.model_validate(data)),
+            "reimbursements": lambda data: self._reimbursement_values(Reimbursement.model_validate(data)),
+        }
+        pending: Dict[str, List[tuple]] = {table: [] for table in EXPORT_COLUMNS}
+        counts: Dict[str, int] = {table: 0 for table in EXPORT_COLUMNS}
+
+        def flush(table: str) -> None:
+            rows = pending[table]
+            if not rows:
+                return
+            columns = EXPORT_COLUMNS[table]
+            placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}, house_id) VALUES ({placeholders})",
+                rows,
+            )
+            counts[table] += len(rows)
+            pending[table] = []
+            if progress:
+                progress(sum(counts.values()))
+
+        # Its own connection: the import is one long transaction that other threads must not end.
+        with self.dedicated_connection():
+            try:
+                for line_no, (entity, data) in enumerate(records, start=1):
+                    if entity not in builders:
+                        raise ValueError(f"Record {line_no}: unknown entity '{entity}'")
+                    try:
+                        values = builders[entity](data)
+                    except Exception as exc:
+                        raise ValueError(f"Record {line_no}: invalid {entity} row ({exc})") from exc
+                    pending[entity].append((*values, house_id))
+                    if len(pending[entity]) >= batch_size:
+                        flush(entity)
+                for table in EXPORT_COLUMNS:
+                    flush(table)
+                self._commit_changes(house_id, *(TABLE_TOPICS[table] for table, count in counts.items() if count))
+            except Exception:
+                self.conn.rollback()
+                raise
+        return counts
+
+    @timed
     def clear_house_data(self, house_id: int) -> None:
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM events WHERE house_id = ?", (house_id,))
         cursor.execute("DELETE FROM shopping_items WHERE house_id = ?", (house_id,))
         cursor.execute("DELETE FROM expenses WHERE house_id = ?", (house_id,))
         cursor.execute("DELETE FROM reimbursements WHERE house_id = ?", (house_id,))
-        self.conn.commit()
+        self._commit_changes(house_id, *TABLE_TOPICS.values())
 
+    @timed
     def delete_house(self, house_id: int) -> None:
         """Remove a house and all its related data, users, and sessions."""
         cursor = self.conn.cursor()
-        # Clear domain data first
-        cursor.execute("DELETE FROM events WHERE house_id = ?", (house_id,))
-        cursor.execute("DELETE FROM shopping_items WHERE house_id = ?", (house_id,))
-        cursor.execute("DELETE FROM expenses WHERE house_id = ?", (house_id,))
-        cursor.execute("DELETE FROM reimbursements WHERE house_id = ?", (house_id,))
-        # Remove sessions for users in this house
-        cursor.execute(
-            "DELETE FROM sessions WHERE user_id IN (SELECT id FROM users WHERE house_id = ?)",
-            (house_id,),
+        try:
+            # Clear domain data first
+            cursor.execute("DELETE FROM events WHERE house_id = ?", (house_id,))
+            cursor.execute("DELETE FROM shopping_items WHERE house_id = ?", (house_id,))
+            cursor.execute("DELETE FROM expenses WHERE house_id = ?", (house_id,))
+            cursor.execute("DELETE FROM reimbursements WHERE house_id = ?", (house_id,))
+            # Remove sessions and feed tokens for users in this house
+            cursor.execute(
+                "DELETE FROM sessions WHERE user_id IN (SELECT id FROM users WHERE house_id = ?)",
+                (house_id,),
+            )
+            cursor.execute(
+                "DELETE FROM feed_tokens WHERE user_id IN (SELECT id FROM users WHERE house_id = ?)",
+                (house_id,),
+            )
+            # Remove users, the house and its change counters (no version bump: nothing is left to revalidate)
+            cursor.execute("DELETE FROM users WHERE house_id = ?", (house_id,))
+            cursor.execute("DELETE FROM houses WHERE id = ?", (house_id,))
+            cursor.execute("DELETE FROM house_versions WHERE house_id = ?", (house_id,))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self._notify(house_id, ("house", *TABLE_TOPICS.values()))
+
+    @timed
+    def purge_house_data(
+        self,
+        house_id: int,
+        delete_house: bool = False,
+        chunk_size: int = 500,
+        pause: float = 0.01,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Delete a house's domain rows in small committed chunks.
+
+        Unlike `clear_house_data`/`delete_house` this does not hold one long write
+        transaction: each chunk commits and then sleeps for `pause` seconds so other
+        requests can write in between. It runs on its own connection, so its commits
+        never include a request's unfinished writes.
+
+        Args:
+            house_id (int): House to purge.
+            delete_house (bool): Also remove the house, its users and their sessions at the end.
+            chunk_size (int): Rows deleted per statement.
+            pause (float): Seconds to wait between chunks.
+            progress: Optional callback receiving `(deleted, total)` after each chunk.
+
+        Returns:
+            int: Number of domain rows deleted.
+        """
+        with self.dedicated_connection():
+            totals = {
+                table: self.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE house_id = ?", (house_id,)).fetchone()[0]
+                for table in EXPORT_COLUMNS
+            }
+            total = sum(totals.values())
+            deleted = 0
+            if progress:
+                progress(deleted, total)
+            for table in EXPORT_COLUMNS:
+                while True:
+                    cursor = self.conn.execute(
+                        f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE house_id = ? LIMIT ?)",
+                        (house_id, chunk_size),
+                    )
+                    self.conn.commit()
+                    if cursor.rowcount <= 0:
+                        break
+                    deleted += cursor.rowcount
+                    if progress:
+                        progress(deleted, total)
+                    if pause:
+                        time.sleep(pause)
+            if delete_house:
+                self.delete_house(house_id)
+            else:
+                self._commit_changes(house_id, *TABLE_TOPICS.values())
+        return deleted
+
+    # --- Idempotent request replay ---
+    @timed
+    def get_idempotent_response(self, key: str, ttl: float) -> Optional[sqlite3.Row]:
+        """Return the stored response for `key` if it is younger than `ttl` seconds."""
+        cursor = self.conn.execute(
+            "SELECT fingerprint, status_code, content_type, body FROM idempotency_keys WHERE key = ? AND created_at >= ?",
+            (key, time.time() - ttl),
+        )
+        return cursor.fetchone()
+
+    @timed
+    def save_idempotent_response(
+        self, key: str, fingerprint: str, status_code: int, content_type: Optional[str], body: bytes, ttl: float
+    ) -> None:
+        """Store a response for replay and drop entries older than `ttl` seconds."""
+        now = time.time()
+        self.conn.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (now - ttl,))
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, status_code, content_type, body, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (key, fingerprint, status_code, content_type, body, now),
+        )
+        self.conn.commit()
+
+    # --- Background jobs ---
+    def _row_to_job(self, row: sqlite3.Row) -> Job:
+        return Job(**{key: row[key] for key in row.keys() if key != "house_id"})
+
+    @timed
+    def create_job(self, house_id: int, kind: str) -> Job:
+        job_id = secrets.token_hex(16)
+        now = time.time()
+        self.conn.execute(
+            "INSERT INTO jobs (id, house_id, kind, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, house_id, kind, now, now),
+        )
+        self.conn.commit()
+        return self.get_job(job_id)
+
+    @timed
+    def get_job(self, job_id: str, house_id: Optional[int] = None) -> Optional[Job]:
+        """Return a job record, or None if it does not exist or belongs to another house than `house_id`."""
+        if house_id is None:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        else:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ? AND house_id = ?", (job_id, house_id)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    @timed
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        """Update status/progress columns of a job record."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        self.conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        self.conn.commit()
+
+    @timed
+    def fail_interrupted_jobs(self) -> int:
+        """Mark jobs left queued or running by a previous process as failed."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted by a server restart', updated_at = ? "
+            "WHERE status IN ('queued', 'running')",
+            (time.time(),),
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    @timed
+    def prune_jobs(self, max_age: float) -> int:
+        """Delete finished or failed jobs last updated more than `max_age` seconds ago."""
+        cursor = self.conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (time.time() - max_age,),
         )
-        # Remove users and house
-        cursor.execute("DELETE FROM users WHERE house_id = ?", (house_id,))
-        cursor.execute("DELETE FROM houses WHERE id = ?", (house_id,))
         self.conn.commit()
+        return cursor.rowcount
 
 
 db = Database()
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""In-process transport for single-node deployments.
+
+`EmbeddedAdapter` is a `requests` transport adapter that hands each request to
+the FastAPI application as an ASGI call on a private event loop, instead of
+sending it over a socket to uvicorn. Routing, auth dependencies, validation and
+middleware are exactly those of the HTTP deployment; only the network hop, the
+HTTP framing and the server process go away. The frontend mounts it when
+`API_TRANSPORT=embedded` (see `frontend/utils.py`).
+"""
+import asyncio
+import concurrent.futures
+import queue
+import threading
+from http import HTTPStatus
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Base URL the frontend uses in embedded mode; it never resolves to a real host.
+EMBEDDED_URL = "http://flatmates.embedded"
+
+
+class _ResponseBody:
+    """File-like response body fed by the application as it sends chunks.
+
+    `read` returns as soon as some data is available, so streamed responses
+    (Server-Sent Events, exports) are delivered incrementally.
+    """
+
+    def __init__(self, read_timeout: Optional[float]):
+        self._chunks: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._buffer = b""
+        self._done = False
+        self._read_timeout = read_timeout
+        self._on_close = None
+        self.closed = False
+
+    def feed(self, chunk: Optional[bytes]) -> None:
+        """Append a chunk; `None` marks the end of the body."""
+        self._chunks.put(chunk)
+
+    def _pull(self) -> None:
+        try:
+            chunk = self._chunks.get(timeout=self._read_timeout)
+        except queue.Empty:
+            raise requests.exceptions.ReadTimeout("Embedded backend did not send data in time")
+        if chunk is None:
+            self._done = True
+        else:
+            self._buffer += chunk
+
+    def read(self, amt: Optional[int] = None, **_) -> bytes:
+        if amt is None:
+            while not self._done:
+                self._pull()
+            data, self._buffer = self._buffer, b""
+            return data
+        if not self._buffer and not self._done:
+            self._pull()
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            if self._on_close is not None:
+                self._on_close()
+
+
+class EmbeddedAdapter(BaseAdapter):
+    """Serve `requests` calls from an ASGI application in the same process.
+
+    The application's lifespan runs on construction (opening the database) and
+    on `close`. Requests from any thread are scheduled on one background event
+    loop; sync endpoints still run in the application's thread pool.
+    """
+
+    def __init__(self, app=None):
+        super().__init__()
+        if app is None:
+            from .main import create_app
+
+            app = create_app()
+        self.app = app
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="flatmates-embedded", daemon=True)
+        self._thread.start()
+        self._lifespan_messages: Optional[asyncio.Queue] = None
+        self._lifespan_task: Optional[asyncio.Future] = None
+        self._stopped: Optional[asyncio.Future] = None
+        self._call(self._startup())
+
+    def _call(self, coroutine, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    async def _startup(self) -> None:
+        loop = asyncio.get_running_loop()
+        started, self._stopped = loop.create_future(), loop.create_future()
+        self._lifespan_messages = asyncio.Queue()
+        await self._lifespan_messages.put({"type": "lifespan.startup"})
+
+        async def send(message):
+            if message["type"] == "lifespan.startup.complete":
+                started.set_result(None)
+            elif message["type"] == "lifespan.startup.failed":
+                started.set_exception(RuntimeError(message.get("message") or "Backend startup failed"))
+            elif message["type"].startswith("lifespan.shutdown") and not self._stopped.done():
+                self._stopped.set_result(None)
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan_task = asyncio.ensure_future(self.app(scope, self._lifespan_messages.get, send))
+        await started
+
+    async def _shutdown(self) -> None:
+        await self._lifespan_messages.put({"type": "lifespan.shutdown"})
+        await asyncio.wait({self._lifespan_task, self._stopped}, return_when=asyncio.FIRST_COMPLETED)
+
+    async def _serve(self, scope: dict, body: bytes, head: concurrent.futures.Future, response_body: _ResponseBody):
+        disconnected = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        response_body._on_close = lambda: loop.call_soon_threadsafe(disconnected.set)
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                head.set_result(message)
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    response_body.feed(message["body"])
+                if not message.get("more_body"):
+                    response_body.feed(None)
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception as exc:
+            if not head.done():
+                head.set_exception(exc)
+        finally:
+            response_body.feed(None)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Run `request` through the application and wrap its answer in a `requests.Response`."""
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        url = urlsplit(request.url)
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        elif not isinstance(body, bytes):
+            body = b"".join(chunk.encode("utf-8") if isinstance(chunk, str) else chunk for chunk in body)
+        headers = [(b"host", url.netloc.encode("latin-1"))]
+        headers += [(name.lower().encode("latin-1"), str(value).encode("latin-1")) for name, value in request.headers.items()]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": url.scheme,
+            "path": unquote(url.path) or "/",
+            "raw_path": (url.path or "/").encode("latin-1"),
+            "query_string": url.query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": (url.hostname, url.port or 80),
+        }
+
+        head: concurrent.futures.Future = concurrent.futures.Future()
+        response_body = _ResponseBody(read_timeout)
+        asyncio.run_coroutine_threadsafe(self._serve(scope, body, head, response_body), self._loop)
+        try:
+            start = head.result(timeout=read_timeout)
+        except concurrent.futures.TimeoutError:
+            response_body.close()
+            raise requests.exceptions.ReadTimeout("Embedded backend did not answer in time", request=request)
+
+        response = requests.Response()
+        response.status_code = start["status"]
+        response.headers = CaseInsensitiveDict(
+            (name.decode("latin-1"), value.decode("latin-1")) for name, value in start.get("headers", [])
+        )
+        response.encoding = get_encoding_from_headers(response.headers)
+        try:
+            response.reason = HTTPStatus(start["status"]).phrase
+        except ValueError:
+            response.reason = ""
+        response.raw = response_body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        """Run the application's shutdown hook and stop the event loop."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._call(self._shutdown(), timeout=30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
@@ -0,0 +1,258 @@
+"""iCalendar (RFC 5545) serialization of house events.
+
+`iter_ics` renders events as a VCALENDAR one VEVENT at a time, so feeds can be
+streamed. `parse_ics` reads an upload line by line and yields `("events", row)`
+pairs in the shape `Database.import_house_data` expects, so large files are
+never held in memory and rows are inserted in batches.
+
+Times are floating (no time zone), as the house calendar has none. On import,
+UTC and TZID times are converted to the house's local time (`FLATMATES_TIMEZONE`,
+default the server's), and rules outside the supported subset (e.g. YEARLY or
+BYDAY) keep only the first occurrence.
+"""
+import io
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Event
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python 3.8: TZID times are imported as written
+    ZoneInfo = None
+
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+PRODUCT_ID = "-//Flatmates//House Calendar//EN"
+# Lines longer than this many octets are folded (RFC 5545, section 3.1).
+LINE_OCTETS = 75
+RRULE_FREQS = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly"}
+# Zone imported times are converted to; None means the server's local time.
+LOCAL_TIMEZONE = os.environ.get("FLATMATES_TIMEZONE") or None
+# End given to timed events that run past midnight, which are cut at the end of their first day.
+END_OF_DAY = time(23, 59)
+
+
+def _escape(text: str) -> str:
+    for char, escaped in (("\\", "\\\\"), (";", "\\;"), (",", "\\,"), ("\r\n", "\\n"), ("\n", "\\n")):
+        text = text.replace(char, escaped)
+    return text
+
+
+def _split_unescaped(text: str, separator: str = ",") -> List[str]:
+    """Split a TEXT list on separators that are not escaped; parts stay escaped."""
+    parts, current, chars = [], [], iter(text)
+    for char in chars:
+        if char == "\\":
+            current.append(char + next(chars, ""))
+        elif char == separator:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def _unescape(text: str) -> str:
+    result, chars = [], iter(text)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            result.append("\n" if escaped in ("n", "N") else escaped)
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def _fold(line: str) -> str:
+    """Fold a content line into chunks of at most `LINE_OCTETS` octets, ending in CRLF."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= LINE_OCTETS:
+        return line + "\r\n"
+    chunks, start, limit = [], 0, LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:  # Do not split a UTF-8 sequence
+            end -= 1
+        chunks.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, LINE_OCTETS - 1  # Continuation lines start with a space
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def _format_date(value: date) -> str:
+    return value.strftime("%Y%m%d")
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _event_lines(event: Event, stamp: str, domain: str) -> List[str]:
+    uid = f"event-{event.id}"
+    if event.recurrence is not None and event.occurrence is not None:
+        uid += f"-{_format_date(event.occurrence)}"
+    lines = ["BEGIN:VEVENT", f"UID:{uid}@{domain}", f"DTSTAMP:{stamp}", f"SUMMARY:{_escape(event.title)}"]
+    if event.start_time is None:
+        lines.append(f"DTSTART;VALUE=DATE:{_format_date(event.date)}")
+        lines.append(f"DTEND;VALUE=DATE:{_format_date(event.date + timedelta(days=1))}")
+    else:
+        start = datetime.combine(event.date, event.start_time)
+        lines.append(f"DTSTART:{_format_datetime(start)}")
+        if event.end_time is not None and event.end_time > event.start_time:
+            lines.append(f"DTEND:{_format_datetime(datetime.combine(event.date, event.end_time))}")
+    if event.description:
+        lines.append(f"DESCRIPTION:{_escape(event.description)}")
+    if event.assigned_to:
+        lines.append(f"CATEGORIES:{','.join(_escape(person) for person in event.assigned_to)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def iter_ics(
+    events: Iterable[Event], name: str, updated_at: Optional[float] = None, domain: str = "flatmates"
+) -> Iterator[str]:
+    """Serialize events as an iCalendar document, one VEVENT per chunk.
+
+    Args:
+        events: Events as returned by `Database.get_events` (occurrences included).
+        name (str): Calendar name shown by subscribing apps.
+        updated_at (float, optional): Unix time of the last change, used as DTSTAMP.
+        domain (str): Right-hand side of the generated UIDs.
+
+    Yields:
+        str: CRLF-terminated, folded content lines.
+    """
+    stamp = datetime.fromtimestamp(updated_at or 0, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODUCT_ID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    yield "".join(_fold(line) for line in header)
+    for event in events:
+        yield "".join(_fold(line) for line in _event_lines(event, stamp, domain))
+    yield _fold("END:VCALENDAR")
+
+
+def _unfolded_lines(stream: IO[bytes]) -> Iterator[Tuple[int, str]]:
+    """Yield `(line number, logical line)` pairs, joining folded continuation lines."""
+    current: Optional[str] = None
+    current_no = 0
+    for line_no, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""), start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current_no, current
+        current, current_no = line, line_no
+    if current:
+        yield current_no, current
+
+
+def _split_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def _zone(tzid: Optional[str]):
+    if not tzid or ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):  # e.g. Windows zone names: keep the time as written
+        return None
+
+
+def _parse_moment(value: str, tzid: Optional[str] = None) -> Tuple[date, Optional[str]]:
+    """Parse a DATE or DATE-TIME value into its local date and ISO time of day (None for dates).
+
+    UTC times (`Z` suffix) and times in a known `tzid` are converted to `LOCAL_TIMEZONE`;
+    floating times are kept as written.
+    """
+    if "T" not in value:
+        return datetime.strptime(value[:8], "%Y%m%d").date(), None
+    moment = datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    zone = timezone.utc if value.endswith("Z") else _zone(tzid)
+    if zone is not None:
+        local = _zone(LOCAL_TIMEZONE) if LOCAL_TIMEZONE else None
+        moment = moment.replace(tzinfo=zone).astimezone(local).replace(tzinfo=None)
+    return moment.date(), moment.time().isoformat()
+
+
+def _parse_rrule(value: str, exdates: List[date]) -> Optional[Dict[str, Any]]:
+    parts = dict(part.partition("=")[::2] for part in value.upper().split(";") if part)
+    freq = RRULE_FREQS.get(parts.pop("FREQ", ""))
+    parts.pop("WKST", None)
+    if freq is None or set(parts) - {"INTERVAL", "UNTIL", "COUNT"} or ("UNTIL" in parts and "COUNT" in parts):
+        return None
+    rule: Dict[str, Any] = {"freq": freq, "interval": int(parts.get("INTERVAL", 1)), "exdates": exdates}
+    if "UNTIL" in parts:
+        rule["until"] = _parse_moment(parts["UNTIL"])[0].isoformat()
+    if "COUNT" in parts:
+        rule["count"] = int(parts["COUNT"])
+    return rule
+
+
+def parse_ics(stream: IO[bytes]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Parse an iCalendar byte stream into `("events", row)` pairs, one VEVENT at a time.
+
+    Raises:
+        ValueError: If a VEVENT lacks DTSTART or has unparseable values.
+    """
+    properties: Optional[Dict[str, Tuple[Dict[str, str], str]]] = None
+    exdates: List[date] = []
+    begin_no = 0
+    depth = 0  # Nested components (e.g. VALARM) inside the current VEVENT
+    for line_no, line in _unfolded_lines(stream):
+        name, parameters, value = _split_property(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT":
+                properties, exdates, begin_no, depth = {}, [], line_no, 0
+            elif properties is not None:
+                depth += 1
+            continue
+        if properties is None:
+            continue
+        if name == "END":
+            if value.upper() != "VEVENT":
+                depth -= 1
+                continue
+            try:
+                yield "events", _event_row(properties, exdates)
+            except (KeyError, ValueError) as exc:
+                raise ValueError(f"Line {begin_no}: invalid VEVENT ({exc})") from exc
+            properties = None
+        elif depth == 0:
+            if name == "EXDATE":
+                exdates.extend(_parse_moment(part, parameters.get("TZID"))[0] for part in value.split(",") if part)
+            else:
+                properties.setdefault(name, (parameters, value))
+
+
+def _event_row(properties: Dict[str, Tuple[Dict[str, str], str]], exdates: List[date]) -> Dict[str, Any]:
+    day, start_time = _parse_moment(properties["DTSTART"][1], properties["DTSTART"][0].get("TZID"))
+    row: Dict[str, Any] = {
+        "title": _unescape(properties.get("SUMMARY", ({}, "Untitled"))[1]) or "Untitled",
+        "date": day.isoformat(),
+        "start_time": start_time,
+    }
+    if start_time and "DTEND" in properties:
+        end_day, end_time = _parse_moment(properties["DTEND"][1], properties["DTEND"][0].get("TZID"))
+        # Events spilling past midnight are cut at the end of their first day
+        row["end_time"] = end_time if end_day == day else END_OF_DAY.isoformat()
+    if "DESCRIPTION" in properties:
+        row["description"] = _unescape(properties["DESCRIPTION"][1])
+    if "CATEGORIES" in properties:
+        row["assigned_to"] = [_unescape(part) for part in _split_unescaped(properties["CATEGORIES"][1]) if part]
+    if "RRULE" in properties:
+        row["recurrence"] = _parse_rrule(properties["RRULE"][1], [exdate.isoformat() for exdate in exdates])
+    return row
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Set
+
+from starlette.concurrency import run_in_threadpool
+
+from .db import db
+
+HEADER = b"idempotency-key"
+# How long stored responses can be replayed, in seconds.
+IDEMPOTENCY_TTL = float(os.environ.get("FLATMATES_IDEMPOTENCY_TTL", str(24 * 3600)))
+# Responses larger than this are not stored (e.g. background job handles are tiny, exports are GETs).
+MAX_STORED_BODY = 1024 * 1024
+MAX_KEY_LENGTH = 255
+# Responses from these routes carry session tokens, so they are never stored.
+UNSTORED_PREFIXES = ("/auth/",)
+
+
+async def _send_json(send, status_code: int, payload: dict) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for POST requests carrying an `Idempotency-Key` header.
+
+    Keys are scoped by the caller's Authorization header and the request path.
+    The first delivery runs normally and its response (status < 500) is stored
+    for `IDEMPOTENCY_TTL` seconds; later deliveries with the same key and body
+    get the stored response without re-executing the write. Reusing a key with a
+    different body returns 422, and a delivery racing an unfinished one returns 409.
+    Routes under `UNSTORED_PREFIXES` always run normally, so credentials never
+    reach the store.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"].startswith(UNSTORED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(HEADER)
+        if not raw_key:
+            await self.app(scope, receive, send)
+            return
+        if len(raw_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": "Idempotency-Key is too long"})
+            return
+
+        caller = hashlib.sha256(headers.get(b"authorization", b"")).hexdigest()
+        key = f"{caller}:{scope['path']}:{raw_key.decode('latin-1')}"
+        digest = hashlib.sha256()
+
+        stored = await run_in_threadpool(db.get_idempotent_response, key, IDEMPOTENCY_TTL)
+        if stored is not None:
+            while True:
+                message = await receive()
+                digest.update(message.get("body", b""))
+                if not message.get("more_body"):
+                    break
+            if stored["fingerprint"] and digest.hexdigest() != stored["fingerprint"]:
+                await _send_json(send, 422, {"detail": "Idempotency-Key was already used with a different request body"})
+                return
+            body = bytes(stored["body"])
+            response_headers = [(b"content-length", str(len(body)).encode()), (b"idempotent-replayed", b"true")]
+            if stored["content_type"]:
+                response_headers.append((b"content-type", stored["content_type"].encode("latin-1")))
+            await send({"type": "http.response.start", "status": stored["status_code"], "headers": response_headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        with self._lock:
+            if key in self._in_flight:
+                conflict = True
+            else:
+                conflict = False
+                self._in_flight.add(key)
+        if conflict:
+            await _send_json(send, 409, {"detail": "A request with this Idempotency-Key is still in progress"})
+            return
+
+        status_code = 500
+        content_type = None
+        chunks = []
+        size = 0
+        body_complete = False
+
+        async def receive_wrapper():
+            nonlocal body_complete
+            message = await receive()
+            if message["type"] == "http.request":
+                digest.update(message.get("body", b""))
+                body_complete = not message.get("more_body")
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code, content_type, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"").decode("latin-1") or None
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= MAX_STORED_BODY:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+            if status_code < 500 and size <= MAX_STORED_BODY:
+                # Requests rejected before their body was read cannot be fingerprinted.
+                fingerprint = digest.hexdigest() if body_complete else ""
+                await run_in_threadpool(
+                    db.save_idempotent_response,
+                    key, fingerprint, status_code, content_type, b"".join(chunks), IDEMPOTENCY_TTL,
+                )
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept this long (seconds) for clients to read their outcome.
+JOB_RETENTION_SECONDS = float(os.environ.get("FLATMATES_JOB_RETENTION", str(7 * 24 * 3600)))
+
+# A job function receives a `progress(done, total)` callback.
+JobFunction = Callable[[Callable[[int, int], None]], None]
+
+
+class JobRunner:
+    """In-process queue running heavy house operations on a bounded worker pool.
+
+    Job state is persisted in the `jobs` table so clients can poll it through
+    `GET /jobs/{id}`; the pool is created on first use. Finished jobs older
+    than `JOB_RETENTION_SECONDS` are pruned at startup and whenever a job is submitted.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flatmates-job")
+            return self._executor
+
+    def submit(self, database, house_id: int, kind: str, func: JobFunction) -> Job:
+        """Persist a queued job and schedule `func` on the worker pool.
+
+        Args:
+            database: `Database` holding the job record.
+            house_id (int): House the job operates on.
+            kind (str): Short job type, e.g. `reset_house`.
+            func: Callable doing the work; it receives a progress callback.
+
+        Returns:
+            Job: The queued job record.
+        """
+        database.prune_jobs(JOB_RETENTION_SECONDS)
+        job = database.create_job(house_id, kind)
+        self._pool().submit(self._run, database, job.id, func)
+        return job
+
+    def _run(self, database, job_id: str, func: JobFunction) -> None:
+        # Jobs commit on their own schedule, so they never share the requests' connection.
+        with database.dedicated_connection():
+            self._run_job(database, job_id, func)
+
+    def _run_job(self, database, job_id: str, func: JobFunction) -> None:
+        database.update_job(job_id, status="running")
+
+        def progress(done: int, total: int) -> None:
+            database.update_job(job_id, progress=done, total=total)
+
+        try:
+            func(progress)
+        except Exception as exc:
+            logger.exception("Job %s failed", job_id)
+            database.update_job(job_id, status="failed", error=str(exc))
+        else:
+            database.update_job(job_id, status="done")
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+runner = JobRunner(max_workers=int(os.environ.get("FLATMATES_JOB_WORKERS", "2")))
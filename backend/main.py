@@ -1,20 +1,86 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from .routers import auth, calendar, expenses, house, shopping
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
-app = FastAPI(title="Flatmates App API")
+from .db import db
+from .idempotency import IdempotencyMiddleware
+from .jobs import JOB_RETENTION_SECONDS, runner
+from .metrics import MetricsMiddleware, registry
+from .notifications import hub
+from .profiling import ProfilingMiddleware, profiler
+from .routers import auth, calendar, expenses, house, jobs, search, shopping
+from .settings import Settings
 
-app.include_router(auth.router)
-app.include_router(calendar.router)
-app.include_router(shopping.router)
-app.include_router(expenses.router)
-app.include_router(house.router)
 
-@app.get("/")
 def read_root():
     """Return a simple welcome message for the API root endpoint.
 
     Returns:
         dict: Welcome payload with a static message.
     """
-    return {"message": "Welcome to the Flatmates App API"}
\ No newline at end of file
+    return {"message": "Welcome to the Flatmates App API"}
+
+
+def metrics():
+    """Expose request and database metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Current counters and latency histograms.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the API application.
+
+    Nothing touches the database at import or build time: the connection is
+    opened in the lifespan startup hook (once per worker process) and closed,
+    together with the job pool, on shutdown.
+
+    Args:
+        settings (Settings, optional): Configuration; read from the environment when omitted.
+
+    Returns:
+        FastAPI: Configured application.
+    """
+    settings = settings or Settings.from_env()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        db.configure(settings.db_path)
+        if profiler.enabled:
+            db.enable_profiling()
+        # With several workers the launcher does this once, before any worker starts.
+        if settings.workers <= 1:
+            db.fail_interrupted_jobs()
+            db.prune_jobs(JOB_RETENTION_SECONDS)
+        yield
+        runner.shutdown(wait=True)
+        db.close()
+
+    app = FastAPI(title="Flatmates App API", lifespan=lifespan)
+    app.state.settings = settings
+
+    app.add_middleware(IdempotencyMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+
+    # Committed database changes feed the per-house notification hub.
+    db.add_listener(hub.publish)
+
+    app.include_router(auth.router)
+    app.include_router(calendar.router)
+    app.include_router(shopping.router)
+    app.include_router(expenses.router)
+    app.include_router(house.router)
+    app.include_router(jobs.router)
+    app.include_router(search.router)
+
+    app.add_api_route("/", read_root, methods=["GET"])
+    app.add_api_route("/metrics", metrics, methods=["GET"], response_class=PlainTextResponse, include_in_schema=False)
+    return app
+
+
+app = create_app()
@@ -1,7 +1,31 @@
-from datetime import date, time
-from typing import List, Optional
+from datetime import date, datetime, time
+from typing import Dict, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+# Patch models have a field named `date`, which would shadow the type in their class body.
+OptionalDate = Optional[date]
+
+
+def _reject_nulls(patch: BaseModel, fields: Tuple[str, ...]) -> BaseModel:
+    """Refuse an explicit null for fields a patch may change but not clear."""
+    cleared = [name for name in fields if name in patch.model_fields_set and getattr(patch, name) is None]
+    if cleared:
+        raise ValueError(f"{', '.join(cleared)} cannot be null")
+    return patch
+
+class Recurrence(BaseModel):
+    freq: Literal["daily", "weekly", "monthly"]
+    interval: int = Field(default=1, ge=1)
+    until: Optional[date] = None  # Last possible occurrence, inclusive
+    count: Optional[int] = Field(default=None, ge=1)
+    exdates: List[date] = Field(default_factory=list)  # Cancelled or individually edited occurrences
+
+    @model_validator(mode="after")
+    def _check_end(self):
+        if self.until is not None and self.count is not None:
+            raise ValueError("A recurrence ends either on a date (until) or after a count, not both")
+        return self
 
 class Event(BaseModel):
     id: Optional[int] = None
@@ -11,6 +35,44 @@ class Event(BaseModel):
     end_time: Optional[time] = None
     description: Optional[str] = None
     assigned_to: List[str] = Field(default_factory=list)
+    recurrence: Optional[Recurrence] = None
+    # Set by the server: the series an occurrence (or an edited occurrence) belongs to,
+    # and the date it was originally scheduled on.
+    series_id: Optional[int] = None
+    occurrence: Optional[date] = None
+    version: Optional[int] = None  # Set by the server; bumped on every change of the row
+
+
+class EventPatch(BaseModel):
+    """Fields of an event to change; omitted fields keep their stored value."""
+    title: Optional[str] = None
+    date: OptionalDate = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    description: Optional[str] = None
+    assigned_to: Optional[List[str]] = None
+    recurrence: Optional[Recurrence] = None
+    version: Optional[int] = None  # Version the client last read; the patch fails with 409 if it changed since
+
+    @model_validator(mode="after")
+    def _check_nulls(self):
+        return _reject_nulls(self, ("title", "date", "assigned_to"))
+
+class TimeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class Conflict(BaseModel):
+    start: datetime  # Overlap between the two events
+    end: datetime
+    events: List[Event]
+
+
+class Availability(BaseModel):
+    people: List[str] = Field(default_factory=list)
+    conflicts: List[Conflict] = Field(default_factory=list)
+    free_slots: List[TimeSlot] = Field(default_factory=list)
 
 class ShoppingItem(BaseModel):
     id: Optional[int] = None
@@ -18,6 +80,29 @@ class ShoppingItem(BaseModel):
     quantity: int = 1
     added_by: str
     purchased: bool = False
+    version: Optional[int] = None
+
+class ShoppingItemPatch(BaseModel):
+    name: Optional[str] = None
+    quantity: Optional[int] = Field(default=None, ge=1)
+    added_by: Optional[str] = None
+    purchased: Optional[bool] = None
+    version: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _check_nulls(self):
+        return _reject_nulls(self, ("name", "quantity", "added_by", "purchased"))
+
+class ShoppingItemUpdate(BaseModel):
+    id: int
+    quantity: Optional[int] = Field(default=None, ge=1)
+    purchased: Optional[bool] = None
+
+class ShoppingBatch(BaseModel):
+    update: List[ShoppingItemUpdate] = Field(default_factory=list)
+    delete: List[int] = Field(default_factory=list)  # Item IDs to remove
+    # Version the client last read per item ID; the batch fails with 409 if one of them changed since
+    versions: Dict[int, int] = Field(default_factory=dict)
 
 class Expense(BaseModel):
     id: Optional[int] = None
@@ -25,6 +110,18 @@ class Expense(BaseModel):
     amount: float
     payer: str
     involved_people: List[str] = Field(default_factory=list)  # Names of people splitting this expense
+    version: Optional[int] = None
+
+class ExpensePatch(BaseModel):
+    title: Optional[str] = None
+    amount: Optional[float] = None
+    payer: Optional[str] = None
+    involved_people: Optional[List[str]] = None
+    version: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _check_nulls(self):
+        return _reject_nulls(self, ("title", "amount", "payer", "involved_people"))
 
 class Debt(BaseModel):
     debtor: str
@@ -32,6 +129,13 @@ class Debt(BaseModel):
     amount: float
 
 
+class ExpenseSummary(BaseModel):
+    total: float = 0.0
+    count: int = 0
+    by_payer: Dict[str, float] = Field(default_factory=dict)
+    by_debtor: Dict[str, float] = Field(default_factory=dict)
+
+
 class Reimbursement(BaseModel):
     id: Optional[int] = None
     from_person: str
@@ -39,6 +143,33 @@ class Reimbursement(BaseModel):
     amount: float
     note: Optional[str] = None
 
+class ExpensePage(BaseModel):
+    items: List[Expense] = Field(default_factory=list)
+    total: int = 0  # Expenses matching the filters, across all pages
+    offset: int = 0
+    limit: int
+
+
+class ReimbursementPage(BaseModel):
+    items: List[Reimbursement] = Field(default_factory=list)
+    total: int = 0
+    offset: int = 0
+    limit: int
+
+class SearchHit(BaseModel):
+    domain: Literal["events", "shopping", "expenses", "reimbursements"]
+    id: int
+    title: str  # HTML-escaped, with matched words in <mark> tags
+    snippet: Optional[str] = None  # Excerpt of the description or note around the matches, marked the same way
+    score: float  # bm25 relevance, higher is better
+
+
+class SearchResults(BaseModel):
+    query: str
+    hits: List[SearchHit] = Field(default_factory=list)
+    offset: int = 0
+    limit: int
+
 class HouseSettings(BaseModel):
     id: Optional[int] = None
     name: str = ""
@@ -58,6 +189,10 @@ class AuthResponse(BaseModel):
     house: HouseSettings
 
 
+class FeedToken(BaseModel):
+    token: str  # Read-only credential for `/calendar/feed.ics`
+
+
 class RegisterRequest(BaseModel):
     username: str
     password: str
@@ -67,4 +202,19 @@ class RegisterRequest(BaseModel):
 
 class LoginRequest(BaseModel):
     username: str
-    password: str
\ No newline at end of file
+    password: str
+
+class ImportSummary(BaseModel):
+    imported: Dict[str, int] = Field(default_factory=dict)
+    total: int = 0
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued, running, done or failed
+    progress: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional, Set
+
+
+class Subscription:
+    """A single listener on a house's change feed.
+
+    Notifications are coalesced per topic: however many changes happen while the
+    client is busy, at most one pending entry per topic is kept, so a slow client
+    can never make the hub buffer grow.
+    """
+
+    def __init__(self, house_id: int, loop: asyncio.AbstractEventLoop):
+        self.house_id = house_id
+        self._loop = loop
+        self._pending: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+
+    def _push(self, topic: str) -> None:
+        self._pending[topic] = self._pending.get(topic, 0) + 1
+        self._wakeup.set()
+
+    def notify(self, topic: str) -> None:
+        """Queue a change for `topic`; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._push, topic)
+        except RuntimeError:
+            # Event loop already closed: the subscriber is gone.
+            pass
+
+    async def next_changes(self, timeout: float, settle: float = 0.0) -> Optional[Dict[str, int]]:
+        """Wait for changes and return them as `{topic: number_of_changes}`.
+
+        Args:
+            timeout (float): Seconds to wait before giving up and returning None.
+            settle (float): Extra delay after the first change so bursts collapse into one batch.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if settle:
+            await asyncio.sleep(settle)
+        changes, self._pending = self._pending, {}
+        self._wakeup.clear()
+        return changes
+
+
+class HouseHub:
+    """In-process publish/subscribe hub keyed by house id."""
+
+    def __init__(self, max_subscribers_per_house: int = 50):
+        self.max_subscribers_per_house = max_subscribers_per_house
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, house_id: int) -> Subscription:
+        """Register a listener bound to the running event loop.
+
+        Raises:
+            RuntimeError: If the house already has the maximum number of listeners.
+        """
+        subscription = Subscription(house_id, asyncio.get_running_loop())
+        with self._lock:
+            listeners = self._subscribers.setdefault(house_id, set())
+            if len(listeners) >= self.max_subscribers_per_house:
+                raise RuntimeError("Too many listeners for this house")
+            listeners.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            listeners = self._subscribers.get(subscription.house_id)
+            if listeners is None:
+                return
+            listeners.discard(subscription)
+            if not listeners:
+                del self._subscribers[subscription.house_id]
+
+    def publish(self, house_id: int, topics: List[str]) -> None:
+        """Notify every listener of `house_id` that `topics` changed."""
+        with self._lock:
+            listeners = list(self._subscribers.get(house_id, ()))
+        for subscription in listeners:
+            for topic in topics:
+                subscription.notify(topic)
+
+    def subscriber_count(self, house_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(house_id, ()))
+
+
+hub = HouseHub()
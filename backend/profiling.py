@@ -0,0 +1,195 @@
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryRecord:
+    sql: str
+    duration: float
+    rows: int = 0
+
+
+@dataclass
+class RequestProfile:
+    """Statements executed while serving one request."""
+
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def db_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statements executed at least `threshold` times (likely N+1 patterns)."""
+        counts = Counter(query.sql for query in self.queries if query.sql != "COMMIT")
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("flatmates_request_profile", default=None)
+
+
+class SqlProfiler:
+    """Opt-in SQL profiling settings, read from the environment.
+
+    `FLATMATES_SQL_PROFILE=1` enables profiling, `FLATMATES_SLOW_QUERY_MS` sets the
+    slow-query threshold and `FLATMATES_REPEATED_QUERY_THRESHOLD` the number of
+    identical statements per request that is reported as a likely N+1.
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get("FLATMATES_SQL_PROFILE", "0") == "1"
+        self.slow_query_seconds = float(os.environ.get("FLATMATES_SLOW_QUERY_MS", "100")) / 1000
+        self.repeat_threshold = int(os.environ.get("FLATMATES_REPEATED_QUERY_THRESHOLD", "5"))
+
+    def record(self, conn: sqlite3.Connection, sql: str, params: Any, duration: float) -> QueryRecord:
+        statement = " ".join(sql.split())
+        record = QueryRecord(statement, duration)
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.queries.append(record)
+        if duration >= self.slow_query_seconds and statement != "COMMIT":
+            self._log_slow_query(conn, sql, params, statement, duration)
+        return record
+
+    def _log_slow_query(self, conn: sqlite3.Connection, sql: str, params: Any, statement: str, duration: float) -> None:
+        plan = ""
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+            plan = "; ".join(str(row[-1]) for row in rows)
+        except sqlite3.Error:
+            pass
+        logger.warning("Slow query (%.1f ms): %s | plan: %s", duration * 1000, statement, plan or "n/a")
+
+
+profiler = SqlProfiler()
+
+
+class ProfilingCursor:
+    """Cursor proxy that times `execute` calls and counts fetched rows."""
+
+    def __init__(self, cursor: sqlite3.Cursor, conn: sqlite3.Connection):
+        self._cursor = cursor
+        self._conn = conn
+        self._record: Optional[QueryRecord] = None
+
+    def _track(self, method: str, sql: str, params: Any) -> "ProfilingCursor":
+        start = time.perf_counter()
+        getattr(self._cursor, method)(sql, params)
+        self._record = profiler.record(self._conn, sql, params if method == "execute" else None, time.perf_counter() - start)
+        if self._cursor.rowcount > 0:
+            self._record.rows = self._cursor.rowcount
+        return self
+
+    def execute(self, sql: str, params: Any = ()) -> "ProfilingCursor":
+        return self._track("execute", sql, params)
+
+    def executemany(self, sql: str, params: Any) -> "ProfilingCursor":
+        return self._track("executemany", sql, params)
+
+    def _count(self, rows):
+        if self._record is not None:
+            self._record.rows += len(rows)
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count([row])
+        return row
+
+    def fetchmany(self, size: int = 1):
+        return self._count(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._count(self._cursor.fetchall())
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count([row])
+            yield row
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
+
+
+class ProfilingConnection:
+    """Connection proxy recording every statement and commit into the current request profile."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def cursor(self) -> ProfilingCursor:
+        return ProfilingCursor(self._conn.cursor(), self._conn)
+
+    def execute(self, sql: str, params: Any = ()) -> ProfilingCursor:
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, params: Any) -> ProfilingCursor:
+        return self.cursor().executemany(sql, params)
+
+    def commit(self) -> None:
+        start = time.perf_counter()
+        self._conn.commit()
+        profiler.record(self._conn, "COMMIT", None, time.perf_counter() - start)
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "_conn":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware attaching per-request SQL timings as a `Server-Timing` header.
+
+    Adds `db` (total statement time), `app` (everything else) and `total`
+    durations, plus `X-DB-Queries`. Requests that repeat one statement at least
+    `repeat_threshold` times get `X-Repeated-Queries` and a log warning.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                db_ms = profile.db_time * 1000
+                headers = list(message.get("headers", []))
+                timing = (
+                    f'db;dur={db_ms:.2f};desc="{len(profile.queries)} statements", '
+                    f"app;dur={max(total_ms - db_ms, 0):.2f}, total;dur={total_ms:.2f}"
+                )
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                headers.append((b"x-db-queries", str(len(profile.queries)).encode("latin-1")))
+                repeated = profile.repeated(profiler.repeat_threshold)
+                if repeated:
+                    headers.append((b"x-repeated-queries", str(sum(repeated.values())).encode("latin-1")))
+                    for sql, count in repeated.items():
+                        logger.warning("%s %s ran %d times: %s", scope["method"], scope["path"], count, sql)
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
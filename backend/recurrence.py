@@ -0,0 +1,82 @@
+"""Expansion of recurring events (an RRULE subset) into occurrence dates.
+
+A rule repeats daily, weekly or monthly every `interval` periods from the
+event's date, optionally stopping at `until` (inclusive) or after `count`
+occurrences, and skips the dates listed in `exdates`. As in RFC 5545, `count`
+includes skipped dates, and monthly rules skip months without the start day
+(a rule starting on the 31st only fires in 31-day months).
+
+Expansion is lazy: iteration jumps straight to the first occurrence of the
+requested window, so its cost depends on the window, not on the series' age.
+"""
+import calendar
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+from .models import Recurrence
+
+# Distinct (rule, start date, window) expansions kept in memory per process.
+EXPANSION_CACHE_SIZE = int(os.environ.get("FLATMATES_EXPANSION_CACHE_SIZE", "4096"))
+
+
+def _add_months(start: date, months: int) -> Optional[date]:
+    """Return `start` moved by `months`, or None if that month lacks the day."""
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    if start.day > calendar.monthrange(year, month + 1)[1]:
+        return None
+    return start.replace(year=year, month=month + 1)
+
+
+def iter_occurrences(rule: Recurrence, dtstart: date, start: Optional[date] = None) -> Iterator[date]:
+    """Yield the occurrence dates of `rule` on or after `start`, in order.
+
+    Args:
+        rule (Recurrence): Recurrence rule of the series.
+        dtstart (date): Date of the series' first occurrence.
+        start (date, optional): First day of interest; defaults to `dtstart`.
+
+    Yields:
+        date: Occurrence dates, skipping `rule.exdates`. Unbounded rules yield forever.
+    """
+    start = max(start or dtstart, dtstart)
+    skipped = set(rule.exdates)
+    if rule.freq == "monthly":
+        months_between = (start.year - dtstart.year) * 12 + start.month - dtstart.month
+        # Only days every month has can jump ahead; later days must count the months they skip.
+        index = max(months_between // rule.interval, 0) if dtstart.day <= 28 else 0
+    else:
+        step_days = rule.interval * (7 if rule.freq == "weekly" else 1)
+        index = max(-(-(start - dtstart).days // step_days), 0)  # ceiling division
+    generated = index  # Each period jumped over held exactly one occurrence
+    while rule.count is None or generated < rule.count:
+        if rule.freq == "monthly":
+            current = _add_months(dtstart, index * rule.interval)
+        else:
+            current = dtstart + timedelta(days=index * step_days)
+        index += 1
+        if current is None:
+            continue
+        generated += 1
+        if rule.until is not None and current > rule.until:
+            return
+        if current >= start and current not in skipped:
+            yield current
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def occurrences_between(rule_json: str, dtstart: date, start: date, end: date) -> Tuple[date, ...]:
+    """Return the occurrences of a stored rule between `start` and `end` (inclusive).
+
+    Keyed on the rule's stored JSON, so editing a series (or adding an
+    exception to it) naturally misses the cache instead of needing invalidation.
+    """
+    rule = Recurrence.model_validate_json(rule_json)
+    dates = []
+    for current in iter_occurrences(rule, dtstart, start):
+        if current > end:
+            break
+        dates.append(current)
+    return tuple(dates)
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from typing import Optional
 
 from ..db import db
-from ..models import AuthResponse, LoginRequest, RegisterRequest, User
+from ..models import AuthResponse, FeedToken, LoginRequest, RegisterRequest, User
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -11,13 +11,28 @@ class UserContext(User):
     """Lightweight context returned by the auth dependency."""
 
 
+def _user_from_token(token: str) -> UserContext:
+    user = db.get_user_by_token(token)
+    if not user or user.house_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    return UserContext(**user.model_dump())
+
+
 def get_current_user(authorization: Optional[str] = Header(None)) -> UserContext:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
-    token = authorization.split(" ", 1)[1]
-    user = db.get_user_by_token(token)
+    return _user_from_token(authorization.split(" ", 1)[1])
+
+
+def get_subscriber(token: Optional[str] = Query(None)) -> UserContext:
+    """Authenticate calendar subscriptions by the feed token in `?token=`.
+
+    Calendar apps cannot set headers and store the URL, so it carries a
+    read-only feed token (see `/auth/feed-token`), never a session token.
+    """
+    user = db.get_user_by_feed_token(token) if token else None
     if not user or user.house_id is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid feed token")
     return UserContext(**user.model_dump())
 
 
@@ -54,6 +69,18 @@ def login(request: LoginRequest):
     return AuthResponse(token=token, user=user, house=house_settings)
 
 
+@router.get("/feed-token", response_model=FeedToken)
+def get_feed_token(current_user: UserContext = Depends(get_current_user)):
+    """Return the caller's read-only calendar feed token."""
+    return FeedToken(token=db.get_feed_token(current_user.id))
+
+
+@router.post("/feed-token", response_model=FeedToken)
+def rotate_feed_token(current_user: UserContext = Depends(get_current_user)):
+    """Replace the caller's calendar feed token, revoking subscription URLs using the old one."""
+    return FeedToken(token=db.get_feed_token(current_user.id, rotate=True))
+
+
 @router.get("/me", response_model=AuthResponse)
 def me(current_user: UserContext = Depends(get_current_user)):
     house_settings = db.get_house_settings(current_user.house_id)
@@ -1,17 +1,216 @@
-from typing import List
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date, time, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
+from ..availability import IntervalIndex, involves
 from ..db import db
-from ..models import Event
-from .auth import UserContext, get_current_user
+from ..db.database import VersionConflict
+from ..ics import MEDIA_TYPE, iter_ics, parse_ics
+from ..models import Availability, Conflict, Event, EventPatch, ImportSummary, TimeSlot
+from .auth import UserContext, get_current_user, get_subscriber
+from .house import IMPORT_SPOOL_BYTES
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
+# Longest window /calendar/availability accepts, in days.
+MAX_AVAILABILITY_DAYS = 92
+# Topics whose changes alter the ICS feed (events, and the house name used as calendar name).
+FEED_TOPICS = ("events", "house")
+# Last rendered feed per house, with the versions of FEED_TOPICS (and change time) it was rendered at.
+# Least recently polled houses (including deleted ones) are evicted beyond FEED_CACHE_HOUSES.
+FEED_CACHE_HOUSES = 128
+_feed_cache: "OrderedDict[int, Tuple[tuple, bytes]]" = OrderedDict()
+_feed_cache_lock = threading.Lock()
+
 @router.get("/", response_model=List[Event])
-def get_events(current_user: UserContext = Depends(get_current_user)):
-    """Return all scheduled events for the authenticated user's house."""
-    return db.get_events(current_user.house_id)
+def get_events(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Return the scheduled events for the authenticated user's house.
+
+    Recurring events are expanded into one entry per occurrence within the window.
+
+    Args:
+        start (date, optional): First day to include.
+        end (date, optional): Last day to include; without it recurring events
+            are expanded up to a year ahead.
+
+    Returns:
+        List[Event]: Events in chronological order.
+
+    Raises:
+        HTTPException: If `end` is before `start`.
+    """
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    return db.get_events(current_user.house_id, start, end)
+
+@router.get("/upcoming", response_model=List[Event])
+def get_upcoming_events(
+    limit: int = Query(5, ge=1, le=100),
+    assignee: Optional[str] = None,
+    start: Optional[date] = None,
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Return the next events from `start` onwards, in chronological order.
+
+    Args:
+        limit (int): Maximum number of events to return.
+        assignee (str, optional): Only return events assigned to this flatmate.
+        start (date, optional): First day to include; defaults to today on the server.
+
+    Returns:
+        List[Event]: At most `limit` events.
+    """
+    return db.get_upcoming_events(current_user.house_id, start or date.today(), limit, assignee)
+
+@router.get("/availability", response_model=Availability)
+def get_availability(
+    start: date,
+    end: date,
+    people: List[str] = Query(default_factory=list),
+    min_minutes: int = Query(30, ge=1, le=24 * 60),
+    day_start: time = time(8, 0),
+    day_end: time = time(22, 0),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Return the overlapping events and the shared free time of some flatmates.
+
+    Args:
+        start (date): First day of the window.
+        end (date): Last day of the window, inclusive.
+        people (List[str], optional): Flatmates to consider; defaults to the whole house.
+            Unassigned events concern everyone.
+        min_minutes (int): Shortest free slot to report.
+        day_start (time): Earliest time of day a free slot may start.
+        day_end (time): Latest time of day a free slot may end.
+
+    Returns:
+        Availability: Conflicts between the considered events and the free slots they leave.
+
+    Raises:
+        HTTPException: If the window or the day bounds are invalid.
+    """
+    if end < start or (end - start).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"The window must span 1 to {MAX_AVAILABILITY_DAYS} days")
+    if day_end <= day_start:
+        raise HTTPException(status_code=400, detail="day_end must be after day_start")
+    events = db.get_events(current_user.house_id, start, end)
+    if people:
+        events = [event for event in events if involves(event, people)]
+    index = IntervalIndex(events)
+    return Availability(
+        people=people or db.get_house_members(current_user.house_id),
+        conflicts=[
+            Conflict(start=second.start, end=min(first.end, second.end), events=[first.event, second.event])
+            for first, second in index.conflicts()
+        ],
+        free_slots=[
+            TimeSlot(start=slot_start, end=slot_end)
+            for slot_start, slot_end in index.free_slots(start, end, day_start, day_end, timedelta(minutes=min_minutes))
+        ],
+    )
+
+def _not_modified(request: Request, etag: str, updated_at: Optional[float]) -> bool:
+    """Evaluate the request's conditional headers (If-None-Match wins over If-Modified-Since)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and updated_at is not None:
+        try:
+            return int(updated_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _cache_feed(house_id: int, stamp: tuple, chunks: Iterator[str]) -> Iterator[bytes]:
+    """Stream the feed while keeping a copy; the copy is cached once the whole feed was sent."""
+    body = []
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        body.append(data)
+        yield data
+    with _feed_cache_lock:
+        _feed_cache[house_id] = (stamp, b"".join(body))
+        _feed_cache.move_to_end(house_id)
+        while len(_feed_cache) > FEED_CACHE_HOUSES:
+            _feed_cache.popitem(last=False)
+
+@router.get("/feed.ics")
+def get_calendar_feed(request: Request, current_user: UserContext = Depends(get_subscriber)):
+    """Serve the house calendar as an iCalendar subscription feed.
+
+    Calendar apps cannot send headers, so the caller's read-only feed token is
+    passed as `?token=`. The feed is identified by the house's data version: polls with a
+    matching `If-None-Match`/`If-Modified-Since` get `304 Not Modified`, and
+    other polls get the cached body until the events or the house change.
+
+    Returns:
+        Response: `text/calendar` body, streamed when it has to be rendered.
+    """
+    house_id = current_user.house_id
+    versions, updated_at = db.get_topics_stamp(house_id, FEED_TOPICS)
+    etag = f'"{house_id}-{"-".join(map(str, versions))}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = formatdate(updated_at, usegmt=True)
+    if _not_modified(request, etag, updated_at):
+        return Response(status_code=304, headers=headers)
+    stamp = (versions, updated_at)
+    with _feed_cache_lock:
+        cached = _feed_cache.get(house_id)
+        if cached:
+            _feed_cache.move_to_end(house_id)
+    if cached and cached[0] == stamp:
+        return Response(cached[1], media_type=MEDIA_TYPE, headers=headers)
+    name = db.get_house_settings(house_id).name or "House calendar"
+    chunks = iter_ics(db.get_events(house_id), name, updated_at, domain=f"house-{house_id}.flatmates")
+    return StreamingResponse(_cache_feed(house_id, stamp, chunks), media_type=MEDIA_TYPE, headers=headers)
+
+@router.post("/import", response_model=ImportSummary)
+async def import_calendar(request: Request, current_user: UserContext = Depends(get_current_user)):
+    """Import the events of an iCalendar (.ics) file into the house calendar.
+
+    The body is read in chunks and spooled, then parsed one VEVENT at a time
+    and inserted with batched `executemany` calls inside a single transaction.
+
+    Returns:
+        ImportSummary: Number of imported events.
+
+    Raises:
+        HTTPException: If the file is malformed; nothing is imported in that case.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            counts = await run_in_threadpool(db.import_house_data, current_user.house_id, parse_ics(spool))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return ImportSummary(imported={"events": counts["events"]}, total=counts["events"])
+
+@router.get("/day/{day}", response_model=List[Event])
+def get_day_events(day: date, current_user: UserContext = Depends(get_current_user)):
+    """Return the events scheduled on one day.
+
+    Args:
+        day (date): Day in ISO format (YYYY-MM-DD).
+
+    Returns:
+        List[Event]: Events of that day, all-day events first.
+    """
+    return db.get_events_on(current_user.house_id, day)
 
 @router.post("/", response_model=Event)
 def create_event(event: Event, current_user: UserContext = Depends(get_current_user)):
@@ -31,15 +230,86 @@ def update_event(event_id: int, event: Event, current_user: UserContext = Depend
 
     Args:
         event_id (int): Event ID to update.
-        event (Event): New event values.
+        event (Event): New event values. Without a `recurrence` key a
+            recurring event stays a series; send `"recurrence": null` to
+            turn it into a single event.
 
     Returns:
         Event: Updated event if found.
 
     Raises:
-        HTTPException: If the event does not exist.
+        HTTPException: If the event does not exist, or `event.version` is set
+            and the event was changed since.
+    """
+    try:
+        updated_event = db.update_event(event_id, event, current_user.house_id)
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if updated_event:
+        return updated_event
+    raise HTTPException(status_code=404, detail="Event not found")
+
+@router.patch("/{event_id}", response_model=Event)
+def patch_event(event_id: int, patch: EventPatch, current_user: UserContext = Depends(get_current_user)):
+    """Change some fields of an event, leaving the others as stored.
+
+    Args:
+        event_id (int): Event ID to update.
+        patch (EventPatch): Fields to change, and optionally the version the client last read.
+
+    Returns:
+        Event: The event after the change.
+
+    Raises:
+        HTTPException: If the event does not exist, or was changed since `patch.version`.
     """
-    updated_event = db.update_event(event_id, event, current_user.house_id)
+    try:
+        updated_event = db.patch_event(event_id, patch, current_user.house_id)
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     if updated_event:
         return updated_event
-    raise HTTPException(status_code=404, detail="Event not found")
\ No newline at end of file
+    raise HTTPException(status_code=404, detail="Event not found")
+
+@router.put("/{event_id}/occurrences/{occurrence}", response_model=Event)
+def update_occurrence(
+    event_id: int, occurrence: date, event: Event, current_user: UserContext = Depends(get_current_user)
+):
+    """Edit a single occurrence of a recurring event, leaving the rest of the series untouched.
+
+    Args:
+        event_id (int): ID of the recurring event.
+        occurrence (date): Original date of the occurrence to edit.
+        event (Event): New values for that occurrence (its date may move).
+
+    Returns:
+        Event: The edited occurrence, stored as an exception to the series.
+
+    Raises:
+        HTTPException: If the series does not exist or has no occurrence on that date.
+    """
+    try:
+        updated_event = db.override_occurrence(event_id, occurrence, event, current_user.house_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if updated_event:
+        return updated_event
+    raise HTTPException(status_code=404, detail="Recurring event not found")
+
+@router.delete("/{event_id}/occurrences/{occurrence}")
+def cancel_occurrence(event_id: int, occurrence: date, current_user: UserContext = Depends(get_current_user)):
+    """Skip a single occurrence of a recurring event.
+
+    Args:
+        event_id (int): ID of the recurring event.
+        occurrence (date): Original date of the occurrence to skip.
+
+    Returns:
+        dict: Confirmation message.
+
+    Raises:
+        HTTPException: If the series does not exist.
+    """
+    if db.cancel_occurrence(event_id, occurrence, current_user.house_id):
+        return {"message": "Occurrence cancelled"}
+    raise HTTPException(status_code=404, detail="Recurring event not found")
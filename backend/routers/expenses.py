@@ -1,9 +1,10 @@
-from typing import Dict, List
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from ..db import db
-from ..models import Debt, Expense, Reimbursement
+from ..db.database import VersionConflict
+from ..models import Debt, Expense, ExpensePage, ExpensePatch, ExpenseSummary, Reimbursement, ReimbursementPage
 from .auth import UserContext, get_current_user
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
@@ -13,6 +14,34 @@ def get_expenses(current_user: UserContext = Depends(get_current_user)):
     """Retrieve all expenses for the user's house."""
     return db.get_expenses(current_user.house_id)
 
+@router.get("/page", response_model=ExpensePage)
+def get_expenses_page(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    sort: Literal["id", "title", "amount", "payer"] = "id",
+    order: Literal["asc", "desc"] = "desc",
+    q: Optional[str] = None,
+    person: Optional[str] = None,
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Return one sorted, filtered page of the house's expenses.
+
+    Args:
+        offset (int): Number of matching expenses to skip.
+        limit (int): Page size.
+        sort (str): Column to sort by; ties are broken by id.
+        order (str): `asc` or `desc`.
+        q (str, optional): Case-insensitive substring of the title.
+        person (str, optional): Only expenses this person paid or shares.
+
+    Returns:
+        ExpensePage: The page and the number of matching expenses.
+    """
+    items, total = db.get_expenses_page(
+        current_user.house_id, offset, limit, sort, order == "desc", q, person
+    )
+    return ExpensePage(items=items, total=total, offset=offset, limit=limit)
+
 @router.post("/", response_model=Expense)
 def add_expense(expense: Expense, current_user: UserContext = Depends(get_current_user)):
     """Create a new expense entry.
@@ -25,42 +54,30 @@ def add_expense(expense: Expense, current_user: UserContext = Depends(get_curren
     """
     return db.add_expense(expense, current_user.house_id)
 
-@router.get("/debts", response_model=List[Debt])
-def get_debts(current_user: UserContext = Depends(get_current_user)):
-    """Compute simplified debt settlements from expenses and reimbursements."""
-    expenses = db.get_expenses(current_user.house_id)
-    balances: Dict[str, float] = {}
-
-    # Calculate net balances
-    for expense in expenses:
-        amount = expense.amount
-        payer = expense.payer
-        involved = expense.involved_people
-        
-        if not involved:
-            continue
-            
-        split_amount = amount / len(involved)
-        
-        # Payer paid the full amount, so they are effectively "up" by that amount initially
-        # But we can just think in terms of net flow.
-        # Payer gets +amount
-        balances[payer] = balances.get(payer, 0) + amount
-        
-        # Everyone involved (including payer if they are in the list) "pays" the split amount
-        for person in involved:
-            balances[person] = balances.get(person, 0) - split_amount
-
-    reimbursements = db.get_reimbursements(current_user.house_id)
-    for reimbursement in reimbursements:
-        amount = max(reimbursement.amount, 0)
-        if amount <= 0:
-            continue
-        payer = reimbursement.from_person
-        receiver = reimbursement.to_person
-        balances[payer] = balances.get(payer, 0) + amount
-        balances[receiver] = balances.get(receiver, 0) - amount
+@router.patch("/{expense_id}", response_model=Expense)
+def patch_expense(expense_id: int, patch: ExpensePatch, current_user: UserContext = Depends(get_current_user)):
+    """Change some fields of an expense, leaving the others as stored.
 
+    Args:
+        expense_id (int): Identifier of the expense to change.
+        patch (ExpensePatch): Fields to change, and optionally the version the client last read.
+
+    Returns:
+        Expense: The expense after the change.
+
+    Raises:
+        HTTPException: If the expense does not exist, or was changed since `patch.version`.
+    """
+    try:
+        expense = db.patch_expense(expense_id, patch, current_user.house_id)
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if expense:
+        return expense
+    raise HTTPException(status_code=404, detail="Expense not found")
+
+def _settle(balances: Dict[str, float]) -> List[Debt]:
+    """Turn net balances into a short list of settlements (greedy, largest amounts first)."""
     # Separate into debtors and creditors
     debtors = []
     creditors = []
@@ -104,12 +121,68 @@ def get_debts(current_user: UserContext = Depends(get_current_user)):
     return debts
 
 
+@router.get("/debts", response_model=List[Debt])
+def get_debts(current_user: UserContext = Depends(get_current_user)):
+    """Compute simplified debt settlements from expenses and reimbursements.
+
+    Net balances are summed in SQL, so only one row per person reaches Python.
+    """
+    return _settle(db.get_balances(current_user.house_id))
+
+
+@router.get("/summary", response_model=ExpenseSummary)
+def get_expense_summary(current_user: UserContext = Depends(get_current_user)):
+    """Aggregate the house's expenses for the snapshot metrics and charts.
+
+    Totals per payer are summed in SQL; totals per debtor add up the
+    simplified settlements, so they match `GET /expenses/debts`.
+
+    Returns:
+        ExpenseSummary: Total amount, expense count and per-person totals.
+    """
+    total, count, by_payer = db.get_expense_totals(current_user.house_id)
+    by_debtor: Dict[str, float] = {}
+    for debt in _settle(db.get_balances(current_user.house_id)):
+        by_debtor[debt.debtor] = round(by_debtor.get(debt.debtor, 0) + debt.amount, 2)
+    return ExpenseSummary(
+        total=round(total, 2),
+        count=count,
+        by_payer={payer: round(amount, 2) for payer, amount in by_payer.items()},
+        by_debtor=by_debtor,
+    )
+
+
 @router.get("/reimbursements", response_model=List[Reimbursement])
 def get_reimbursements(current_user: UserContext = Depends(get_current_user)):
     """Fetch all recorded reimbursements."""
     return db.get_reimbursements(current_user.house_id)
 
 
+@router.get("/reimbursements/page", response_model=ReimbursementPage)
+def get_reimbursements_page(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    sort: Literal["id", "amount", "from_person", "to_person"] = "id",
+    order: Literal["asc", "desc"] = "desc",
+    person: Optional[str] = None,
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Return one sorted page of reimbursements, optionally only those involving `person`.
+
+    Args:
+        offset (int): Number of matching reimbursements to skip.
+        limit (int): Page size.
+        sort (str): Column to sort by; ties are broken by id.
+        order (str): `asc` or `desc`.
+        person (str, optional): Only transfers this person sent or received.
+
+    Returns:
+        ReimbursementPage: The page and the number of matching reimbursements.
+    """
+    items, total = db.get_reimbursements_page(current_user.house_id, offset, limit, sort, order == "desc", person)
+    return ReimbursementPage(items=items, total=total, offset=offset, limit=limit)
+
+
 @router.post("/reimbursements", response_model=Reimbursement)
 def add_reimbursement(reimbursement: Reimbursement, current_user: UserContext = Depends(get_current_user)):
     """Record a reimbursement transaction.
@@ -1,10 +1,31 @@
-from fastapi import APIRouter, Depends
+import json
+import logging
+import os
+import tempfile
+from typing import Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..db import db
-from ..models import HouseSettings
+from ..jobs import runner
+from ..models import HouseSettings, ImportSummary, Job
+from ..notifications import hub
+from ..transfer import FORMATS, PARSERS, iter_csv, iter_ndjson
 from .auth import UserContext, get_current_user
 
 router = APIRouter(prefix="/house", tags=["house"])
+logger = logging.getLogger(__name__)
+
+# Uploads larger than this are spooled to a temporary file instead of memory.
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+# Idle seconds between keep-alive comments on the change stream.
+CHANGES_KEEPALIVE_SECONDS = 15.0
+# Delay after a change so that bursts are delivered as a single notification.
+CHANGES_SETTLE_SECONDS = 0.25
+# Rows removed per committed chunk by background purge jobs.
+PURGE_CHUNK_SIZE = 500
 
 @router.get("/", response_model=HouseSettings)
 def get_house_settings(current_user: UserContext = Depends(get_current_user)):
@@ -18,6 +39,19 @@ def update_house_settings(settings: HouseSettings, current_user: UserContext = D
     return db.update_house_settings(current_user.house_id, settings)
 
 
+@router.get("/versions", response_model=Dict[str, int])
+def get_house_versions(current_user: UserContext = Depends(get_current_user)):
+    """Return per-topic change counters for the current house.
+
+    Clients cache list responses together with the counters they were fetched
+    at and revalidate them all with this single cheap request.
+
+    Returns:
+        dict: Counter per topic (`house`, `events`, `shopping`, `expenses`, `reimbursements`).
+    """
+    return db.get_house_versions(current_user.house_id)
+
+
 @router.delete("/reset")
 def reset_house_data(current_user: UserContext = Depends(get_current_user)):
     """Delete all data for the current house (events, shopping, expenses, reimbursements)."""
@@ -29,4 +63,154 @@ def reset_house_data(current_user: UserContext = Depends(get_current_user)):
 def delete_house(current_user: UserContext = Depends(get_current_user)):
     """Delete the current house, its users, sessions, and all related data."""
     db.delete_house(current_user.house_id)
-    return {"message": "House deleted"}
\ No newline at end of file
+    return {"message": "House deleted"}
+
+
+@router.post("/reset", response_model=Job, status_code=202)
+def reset_house_data_job(current_user: UserContext = Depends(get_current_user)):
+    """Start a background job clearing all data of the current house.
+
+    Rows are deleted in small committed chunks so other houses stay responsive.
+
+    Returns:
+        Job: Queued job; poll `GET /jobs/{id}` for progress.
+    """
+    house_id = current_user.house_id
+    return runner.submit(
+        db, house_id, "reset_house",
+        lambda progress: db.purge_house_data(house_id, chunk_size=PURGE_CHUNK_SIZE, progress=progress),
+    )
+
+
+@router.post("/delete", response_model=Job, status_code=202)
+def delete_house_job(current_user: UserContext = Depends(get_current_user)):
+    """Start a background job deleting the current house, its users and all data.
+
+    Returns:
+        Job: Queued job; poll `GET /jobs/{id}` for progress.
+    """
+    house_id = current_user.house_id
+    return runner.submit(
+        db, house_id, "delete_house",
+        lambda progress: db.purge_house_data(
+            house_id, delete_house=True, chunk_size=PURGE_CHUNK_SIZE, progress=progress
+        ),
+    )
+
+
+@router.get("/export")
+def export_house(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Stream every event, shopping item, expense and reimbursement of the house.
+
+    Args:
+        format (str): `ndjson` (one JSON object per line) or `csv`.
+
+    Returns:
+        StreamingResponse: Rows read from the database cursor in bounded batches.
+    """
+    rows = db.iter_house_rows(current_user.house_id)
+    body = iter_ndjson(rows) if format == "ndjson" else iter_csv(rows)
+    return StreamingResponse(
+        body,
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="house-{current_user.house_id}.{format}"'},
+    )
+
+
+def _run_import_job(house_id: int, path: str, format: str, progress) -> None:
+    try:
+        with open(path, "rb") as source:
+            db.import_house_data(house_id, PARSERS[format](source), progress=lambda done: progress(done, done))
+    finally:
+        os.unlink(path)
+
+
+@router.post("/import", response_model=ImportSummary)
+async def import_house(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    background: bool = False,
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Import rows produced by `/house/export` into the current house.
+
+    The body is read in chunks and spooled, then inserted with batched
+    `executemany` calls inside a single transaction.
+
+    Args:
+        format (str): Format of the request body, `ndjson` or `csv`.
+        background (bool): Run the import as a job and return `202` with the job record.
+
+    Returns:
+        ImportSummary: Number of imported rows per table (or the Job when `background`).
+
+    Raises:
+        HTTPException: If the payload is malformed; nothing is imported in that case.
+    """
+    house_id = current_user.house_id
+    if background:
+        with tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False) as upload:
+            async for chunk in request.stream():
+                upload.write(chunk)
+        job = await run_in_threadpool(
+            runner.submit, db, house_id, "import_house",
+            lambda progress: _run_import_job(house_id, upload.name, format, progress),
+        )
+        return JSONResponse(job.model_dump(), status_code=202)
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        def report(done: int) -> None:
+            logger.info("House %s import: %d rows written", house_id, done)
+
+        try:
+            counts = await run_in_threadpool(
+                db.import_house_data, house_id, PARSERS[format](spool), progress=report
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return ImportSummary(imported=counts, total=sum(counts.values()))
+
+
+@router.get("/changes")
+async def stream_changes(request: Request, current_user: UserContext = Depends(get_current_user)):
+    """Push change notifications for the current house as Server-Sent Events.
+
+    Each `change` event carries the topics that changed (`events`, `shopping`,
+    `expenses`, `reimbursements`, `house`) so clients can refresh only what is affected.
+    Changes are coalesced per topic while the client is not reading.
+
+    Returns:
+        StreamingResponse: `text/event-stream` that stays open until the client disconnects.
+    """
+    try:
+        subscription = hub.subscribe(current_user.house_id)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    async def events():
+        sequence = 0
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                changes = await subscription.next_changes(CHANGES_KEEPALIVE_SECONDS, CHANGES_SETTLE_SECONDS)
+                if changes is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                sequence += 1
+                payload = json.dumps({"topics": sorted(changes), "counts": changes})
+                yield f"id: {sequence}\nevent: change\ndata: {payload}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..db import db
+from ..models import Job
+from .auth import UserContext, get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(job_id: str, current_user: UserContext = Depends(get_current_user)):
+    """Report the status and progress of a background job of the caller's house.
+
+    A finished `delete_house` job has removed the caller's session, so polling
+    it then answers 401.
+
+    Args:
+        job_id (str): Identifier returned when the job was started.
+
+    Returns:
+        Job: Current job record.
+
+    Raises:
+        HTTPException: If the job does not exist or belongs to another house.
+    """
+    job = db.get_job(job_id, current_user.house_id)
+    if job:
+        return job
+    raise HTTPException(status_code=404, detail="Job not found")
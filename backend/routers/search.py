@@ -0,0 +1,45 @@
+import html
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from ..db import db
+from ..db.database import SEARCH_MARKS
+from ..models import SearchHit, SearchResults
+from .auth import UserContext, get_current_user
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+def _marked_html(text: Optional[str]) -> Optional[str]:
+    """Escape `text` for HTML and turn the search marks around matched words into <mark> tags."""
+    if text is None:
+        return None
+    return html.escape(text).replace(SEARCH_MARKS[0], "<mark>").replace(SEARCH_MARKS[1], "</mark>")
+
+def _render(hit: SearchHit) -> SearchHit:
+    return hit.model_copy(update={"title": _marked_html(hit.title), "snippet": _marked_html(hit.snippet)})
+
+@router.get("/", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    domains: List[Literal["events", "shopping", "expenses", "reimbursements"]] = Query(default_factory=list),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Search event titles and descriptions, shopping items, expense titles and reimbursement notes.
+
+    Every word of `q` must match; the last one may also be the start of a word
+    (`kitchen cle` finds "Kitchen cleaning"). Case and accents are ignored.
+
+    Args:
+        q (str): Words to look for.
+        domains (List[str], optional): Only search these domains; all of them by default.
+        limit (int): Maximum number of hits.
+        offset (int): Hits to skip, for paging.
+
+    Returns:
+        SearchResults: Hits ranked by relevance, with matched words in `<mark>` tags.
+    """
+    hits = db.search(current_user.house_id, q, domains, limit, offset)
+    return SearchResults(query=q, hits=[_render(hit) for hit in hits], offset=offset, limit=limit)
@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
 from ..db import db
-from ..models import ShoppingItem
+from ..db.database import VersionConflict
+from ..models import ShoppingBatch, ShoppingItem, ShoppingItemPatch
 from .auth import UserContext, get_current_user
 
 router = APIRouter(prefix="/shopping", tags=["shopping"])
@@ -25,6 +26,50 @@ def add_item(item: ShoppingItem, current_user: UserContext = Depends(get_current
     """
     return db.add_shopping_item(item, current_user.house_id)
 
+@router.post("/batch", response_model=List[ShoppingItem])
+def apply_batch(batch: ShoppingBatch, current_user: UserContext = Depends(get_current_user)):
+    """Apply a set of edits from the shopping list grid in a single transaction.
+
+    Args:
+        batch (ShoppingBatch): Quantity/purchased updates, IDs to delete, and
+            the versions the client last read.
+
+    Returns:
+        List[ShoppingItem]: The shopping list after the changes.
+
+    Raises:
+        HTTPException: If an item was changed since the version sent for it;
+            nothing is applied then.
+    """
+    if batch.update or batch.delete:
+        try:
+            db.apply_shopping_batch(current_user.house_id, batch.update, batch.delete, batch.versions)
+        except VersionConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+    return db.get_shopping_list(current_user.house_id)
+
+@router.patch("/{item_id}", response_model=ShoppingItem)
+def patch_item(item_id: int, patch: ShoppingItemPatch, current_user: UserContext = Depends(get_current_user)):
+    """Change some fields of a shopping item, e.g. mark it as purchased.
+
+    Args:
+        item_id (int): Identifier of the item to change.
+        patch (ShoppingItemPatch): Fields to change, and optionally the version the client last read.
+
+    Returns:
+        ShoppingItem: The item after the change.
+
+    Raises:
+        HTTPException: If the item does not exist, or was changed since `patch.version`.
+    """
+    try:
+        item = db.patch_shopping_item(item_id, patch, current_user.house_id)
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if item:
+        return item
+    raise HTTPException(status_code=404, detail="Item not found")
+
 @router.delete("/{item_id}")
 def remove_item(item_id: int, current_user: UserContext = Depends(get_current_user)):
     """Delete a shopping item by ID.
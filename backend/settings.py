@@ -0,0 +1,37 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent / "db" / "flatmates.db"
+
+
+@dataclass
+class Settings:
+    """Backend configuration, usually built from environment variables.
+
+    Attributes:
+        db_path: SQLite file (`FLATMATES_DB_PATH`).
+        host: Interface the launcher binds to (`HOST`).
+        port: Port the launcher listens on (`PORT`, as set by Railway).
+        workers: Number of worker processes (`WEB_CONCURRENCY`, default 1). Live updates,
+            request deduplication, `/metrics` and the ICS feed cache keep their state
+            in the process, so more than one worker is opt-in.
+        graceful_timeout: Seconds to let in-flight requests finish on shutdown (`FLATMATES_GRACEFUL_TIMEOUT`).
+    """
+
+    db_path: Path = DEFAULT_DB_PATH
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    graceful_timeout: int = 30
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        env = os.environ
+        return cls(
+            db_path=Path(env.get("FLATMATES_DB_PATH", str(DEFAULT_DB_PATH))),
+            host=env.get("HOST", "0.0.0.0"),
+            port=int(env.get("PORT", "8000")),
+            workers=int(env.get("WEB_CONCURRENCY") or 1),
+            graceful_timeout=int(env.get("FLATMATES_GRACEFUL_TIMEOUT", "30")),
+        )
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+from .db.database import EXPORT_COLUMNS, JSON_COLUMNS, LIST_COLUMNS
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# CSV exports share a single header: the entity name followed by the union of all columns.
+CSV_COLUMNS: List[str] = ["entity"]
+for _columns in EXPORT_COLUMNS.values():
+    CSV_COLUMNS.extend(column for column in _columns if column not in CSV_COLUMNS)
+
+
+def iter_ndjson(rows: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[str]:
+    """Serialize `(entity, row)` pairs as newline-delimited JSON."""
+    for entity, row in rows:
+        yield json.dumps({"entity": entity, **row}) + "\n"
+
+
+def iter_csv(rows: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[str]:
+    """Serialize `(entity, row)` pairs as CSV, one line at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for entity, row in rows:
+        record = {"entity": entity, **row}
+        for column in LIST_COLUMNS:
+            if column in record:
+                record[column] = json.dumps(record[column])
+        for column in JSON_COLUMNS:
+            if record.get(column) is not None:
+                record[column] = json.dumps(record[column])
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _text_lines(stream: IO[bytes]) -> IO[str]:
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def parse_ndjson(stream: IO[bytes]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Parse an NDJSON byte stream into `(entity, row)` pairs, skipping blank lines."""
+    for line_no, line in enumerate(_text_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Line {line_no}: invalid JSON ({exc.msg})") from exc
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_no}: expected a JSON object")
+        yield record.pop("entity", None), record
+
+
+def parse_csv(stream: IO[bytes]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Parse a CSV byte stream (as written by `iter_csv`) into `(entity, row)` pairs."""
+    reader = csv.DictReader(_text_lines(stream))
+    for record in reader:
+        entity = record.pop("entity", None)
+        columns = EXPORT_COLUMNS.get(entity, ())
+        row: Dict[str, Any] = {}
+        for column in columns:
+            value = record.get(column)
+            if value in (None, ""):
+                continue
+            if column in LIST_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    value = [part.strip() for part in value.split(",") if part.strip()]
+            elif column in JSON_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError as exc:
+                    raise ValueError(f"Row {reader.line_num}: invalid JSON in '{column}' ({exc.msg})") from exc
+            row[column] = value
+        yield entity, row
+
+
+PARSERS = {"ndjson": parse_ndjson, "csv": parse_csv}
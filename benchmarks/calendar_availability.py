@@ -0,0 +1,108 @@
+"""Compare conflict and free-slot search with the interval index against pairwise checks.
+
+Builds dense calendars (`--per-day` timed events a day over a 30-day window)
+and times, per calendar size, the all-pairs overlap check the frontend would
+otherwise run, the sweep over `IntervalIndex`, and the full
+`/calendar/availability` query path (window read from SQLite included).
+
+    python benchmarks/calendar_availability.py --sizes 500 2000 8000 --runs 5
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, time as time_of_day, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.availability import IntervalIndex, event_interval  # noqa: E402
+from backend.db.database import Database  # noqa: E402
+from backend.models import Event  # noqa: E402
+
+FLATMATES = ["alice", "bob", "carol", "dave"]
+WINDOW_DAYS = 30
+START = date(2026, 1, 1)
+
+
+def make_events(count: int, rng: random.Random):
+    """Return `count` timed events spread over the window, 15 minutes to 3 hours long."""
+    events = []
+    for index in range(count):
+        minute = rng.randrange(6 * 60, 22 * 60, 15)
+        length = rng.randrange(15, 180, 15)
+        end = min(minute + length, 24 * 60 - 1)
+        events.append(
+            Event(
+                title=f"Event {index}",
+                date=START + timedelta(days=rng.randrange(WINDOW_DAYS)),
+                start_time=time_of_day(minute // 60, minute % 60),
+                end_time=time_of_day(end // 60, end % 60),
+                assigned_to=[rng.choice(FLATMATES)],
+            )
+        )
+    return events
+
+
+def pairwise_conflicts(events):
+    """Overlapping pairs by comparing every pair of events."""
+    intervals = [interval for interval in map(event_interval, events) if interval]
+    return [
+        (first, second)
+        for position, first in enumerate(intervals)
+        for second in intervals[position + 1:]
+        if first.start < second.end and second.start < first.end
+    ]
+
+
+def indexed(events):
+    index = IntervalIndex(events)
+    end = START + timedelta(days=WINDOW_DAYS - 1)
+    return index.conflicts(), index.free_slots(START, end, time_of_day(8), time_of_day(22), timedelta(minutes=30))
+
+
+def _median_ms(function, runs: int):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000], help="Events per calendar")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per case (median reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'events':>8}{'conflicts':>11}{'pairwise ms':>13}{'index ms':>10}{'speedup':>9}{'query ms':>10}")
+    for size in args.sizes:
+        events = make_events(size, rng)
+        pairwise_ms, pairs = _median_ms(lambda: pairwise_conflicts(events), args.runs)
+        index_ms, (conflicts, _) = _median_ms(lambda: indexed(events), args.runs)
+        assert len(pairs) == len(conflicts)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            database = Database(Path(tmp) / "benchmark.db")
+            house = database.create_house("Benchmark House")
+            for event in events:
+                database.add_event(event, house.id)
+            end = START + timedelta(days=WINDOW_DAYS - 1)
+            query_ms, _ = _median_ms(lambda: indexed(database.get_events(house.id, START, end)), args.runs)
+            database.close()
+
+        print(
+            f"{size:>8}{len(conflicts):>11}{pairwise_ms:>13.1f}{index_ms:>10.1f}"
+            f"{pairwise_ms / index_ms:>8.1f}x{query_ms:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Compare full-text search through the FTS5 index with LIKE scans.
+
+Fills a throwaway database with `--rows` events, shopping items, expenses and
+reimbursements spread over `--houses` houses (the index is maintained by the
+same triggers as in production), then times `Database.search` (top 20 by
+bm25) against `LIKE '%word%'` scans of the same house's four tables: one
+stopping at the first 20 matches in table order, and one collecting every
+match, which is what ranking them would need.
+
+    python benchmarks/search_fts.py --rows 2000000 --houses 20
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.db.database import Database  # noqa: E402
+
+# Zipf-like vocabulary: a few frequent words and a long tail of rare ones.
+COMMON = ["clean", "kitchen", "milk", "rent", "party", "bins", "bathroom", "groceries", "pizza", "bills"]
+QUERIES = {
+    "common word": "kitchen",
+    "rare word": "w4711",
+    "prefix": "groc",
+    "two words": "clean bathroom",
+}
+LIKE_SQL = """
+    SELECT id FROM events WHERE house_id = :house AND (title LIKE :p1 OR description LIKE :p1) {and_events}
+    UNION ALL SELECT id FROM shopping_items WHERE house_id = :house AND name LIKE :p1 {and_items}
+    UNION ALL SELECT id FROM expenses WHERE house_id = :house AND title LIKE :p1 {and_expenses}
+    UNION ALL SELECT id FROM reimbursements WHERE house_id = :house AND note LIKE :p1 {and_notes}
+"""
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(
+        rng.choice(COMMON) if rng.random() < 0.3 else f"w{int(rng.paretovariate(1.2) * 10) % 50000}"
+        for _ in range(words)
+    )
+
+
+def seed(database: Database, rows: int, houses: int, rng: random.Random) -> None:
+    """Insert `rows` rows split over the four tables, in batches."""
+    house_ids = [database.create_house(f"House {index}").id for index in range(houses)]
+    batch = 10000
+    per_table = rows // 4
+    for start in range(0, per_table, batch):
+        size = min(batch, per_table - start)
+        database.conn.executemany(
+            "INSERT INTO events (title, date, description, assigned_to, house_id) VALUES (?, '2026-01-01', ?, '[]', ?)",
+            [(_text(rng, 3), _text(rng, 12), rng.choice(house_ids)) for _ in range(size)],
+        )
+        database.conn.executemany(
+            "INSERT INTO shopping_items (name, quantity, added_by, purchased, house_id) VALUES (?, 1, 'a', 0, ?)",
+            [(_text(rng, 2), rng.choice(house_ids)) for _ in range(size)],
+        )
+        database.conn.executemany(
+            "INSERT INTO expenses (title, amount, payer, involved_people, house_id) VALUES (?, 1, 'a', '[]', ?)",
+            [(_text(rng, 3), rng.choice(house_ids)) for _ in range(size)],
+        )
+        database.conn.executemany(
+            "INSERT INTO reimbursements (from_person, to_person, amount, note, house_id) VALUES ('a', 'b', 1, ?, ?)",
+            [(_text(rng, 8), rng.choice(house_ids)) for _ in range(size)],
+        )
+        database.conn.commit()
+        print(f"\r  seeded {(start + size) * 4:,} rows", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+
+def like_search(database: Database, house_id: int, query: str, limit: int = -1):
+    words = query.split()
+    params = {"house": house_id, **{f"p{index}": f"%{word}%" for index, word in enumerate(words, start=1)}}
+    extra = {name: "" for name in ("and_events", "and_items", "and_expenses", "and_notes")}
+    for index in range(2, len(words) + 1):
+        extra["and_events"] += f" AND (title LIKE :p{index} OR description LIKE :p{index})"
+        extra["and_items"] += f" AND name LIKE :p{index}"
+        extra["and_expenses"] += f" AND title LIKE :p{index}"
+        extra["and_notes"] += f" AND note LIKE :p{index}"
+    return database.conn.execute(f"{LIKE_SQL.format(**extra)} LIMIT {limit}", params).fetchall()
+
+
+def _median_ms(function, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows over all tables and houses")
+    parser.add_argument("--houses", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per query (median reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(Path(tmp) / "benchmark.db")
+        start = time.perf_counter()
+        seed(database, args.rows, args.houses, rng)
+        print(f"Seeded {args.rows:,} rows (indexed by triggers) in {time.perf_counter() - start:.1f} s")
+        house_id = 1
+        print(f"{'query':<14}{'matches':>9}{'LIKE first 20':>15}{'LIKE all':>10}{'FTS5 ranked':>13}")
+        for name, query in QUERIES.items():
+            matches = len(like_search(database, house_id, query))
+            first_ms = _median_ms(lambda: like_search(database, house_id, query, 20), args.runs)
+            all_ms = _median_ms(lambda: like_search(database, house_id, query), args.runs)
+            fts_ms = _median_ms(lambda: database.search(house_id, query), args.runs)
+            print(f"{name:<14}{matches:>9,}{first_ms:>15.2f}{all_ms:>10.2f}{fts_ms:>13.2f}")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
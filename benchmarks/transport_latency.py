@@ -0,0 +1,178 @@
+"""Compare page latency with the HTTP and the embedded API transport.
+
+Seeds a throwaway database, starts uvicorn on it for the HTTP runs, then
+renders every page with Streamlit's AppTest in a fresh process per transport
+(`API_TRANSPORT` is read at import time) and prints the median and p95 script
+time per page, plus the latency of two single API calls. The response cache is cleared before each run, so every run
+pays for all of the page's API calls.
+
+    python benchmarks/transport_latency.py --runs 20 --rows 200
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+FRONTEND = ROOT / "frontend"
+PAGES = ("app.py", "pages/1_Calendar.py", "pages/2_Shopping_List.py", "pages/3_Expenses.py")
+# Single helper calls, timed without Streamlit around them: a tiny and a large response.
+CALLS = {
+    "call: house versions": lambda utils, token: utils.RESPONSE_CACHE.versions(token),
+    "call: all expenses": lambda utils, token: utils.get_expenses(),
+}
+FLATMATES = ["alice", "bob", "carol"]
+
+
+def seed(db_path: Path, rows: int) -> str:
+    """Create a house with `rows` records per table and return a session token for it."""
+    sys.path.insert(0, str(ROOT))
+    from backend.db.database import Database
+    from backend.models import Event, Expense, Reimbursement, ShoppingItem
+
+    database = Database(db_path)
+    house = database.create_house("Benchmark House")
+    # Flatmates are the house's members.
+    user, *_ = [database.create_user(name, "secret", house.id) for name in FLATMATES]
+    for index in range(rows):
+        person = FLATMATES[index % len(FLATMATES)]
+        database.add_event(
+            Event(title=f"Event {index}", date=date.today() + timedelta(days=index % 60), assigned_to=[person]),
+            house.id,
+        )
+        database.add_shopping_item(ShoppingItem(name=f"Item {index}", added_by=person), house.id)
+        database.add_expense(
+            Expense(title=f"Expense {index}", amount=10 + index % 50, payer=person, involved_people=FLATMATES),
+            house.id,
+        )
+        if index % 10 == 0:
+            database.add_reimbursement(
+                Reimbursement(from_person=FLATMATES[1], to_person=person, amount=5.0), house.id
+            )
+    token = database.create_session_token(user.id)
+    database.close()
+    return token
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def worker(token: str, runs: int, warmup: int) -> None:
+    """Render each page `warmup + runs` times and print the timings (ms) as JSON."""
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, str(FRONTEND))
+    import utils
+
+    profile = utils.fetch_profile(token)
+    timings = {}
+    for page in PAGES:
+        samples = []
+        for attempt in range(warmup + runs):
+            utils.RESPONSE_CACHE.clear()
+            app = AppTest.from_file(str(FRONTEND / "app.py"), default_timeout=60)
+            if page != "app.py":
+                app.switch_page(page)
+            app.session_state["auth_token"] = token
+            app.session_state["profile"] = profile
+            start = time.perf_counter()
+            app.run()
+            elapsed = (time.perf_counter() - start) * 1000
+            if app.exception:
+                raise RuntimeError(f"{page} failed: {app.exception[0].message}")
+            if attempt >= warmup:
+                samples.append(elapsed)
+        timings[page] = samples
+
+    utils.st.session_state["auth_token"] = token
+    for name, call in CALLS.items():
+        samples = []
+        for attempt in range(warmup + runs):
+            utils.RESPONSE_CACHE.clear()
+            start = time.perf_counter()
+            call(utils, token)
+            if attempt >= warmup:
+                samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = samples
+    print(json.dumps(timings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Measured renders per page and transport")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured renders per page first")
+    parser.add_argument("--rows", type=int, default=100, help="Records seeded per table")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.runs, args.warmup)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "benchmark.db"
+        token = seed(db_path, args.rows)
+        port = _free_port()
+        env = {
+            **os.environ,
+            "FLATMATES_DB_PATH": str(db_path),
+            "API_URL": f"http://127.0.0.1:{port}",
+            "LIVE_UPDATES": "0",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT,
+            env=env,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    requests.get(env["API_URL"], timeout=1)
+                    break
+                except requests.ConnectionError:
+                    time.sleep(0.1)
+            results = {}
+            for transport in ("http", "embedded"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", token, "--runs", str(args.runs), "--warmup", str(args.warmup)],
+                    cwd=FRONTEND,
+                    env={**env, "API_TRANSPORT": transport},
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                results[transport] = json.loads(output.strip().splitlines()[-1])
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'page':<28}{'http p50':>10}{'p95':>9}{'embedded p50':>15}{'p95':>9}{'speedup':>9}")
+    for page in (*PAGES, *CALLS):
+        http, embedded = results["http"][page], results["embedded"][page]
+        http_median, embedded_median = statistics.median(http), statistics.median(embedded)
+        print(
+            f"{page:<28}{http_median:>10.1f}{_percentile(http, 0.95):>9.1f}"
+            f"{embedded_median:>15.1f}{_percentile(embedded, 0.95):>9.1f}"
+            f"{http_median / embedded_median:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import fetch_profile, login_user, register_user, render_sidebar
+from utils import fetch_profile, login_user, register_user, render_perf_panel, render_sidebar, search_house
 
 st.set_page_config(
     page_title="Flatmates App",
@@ -114,6 +114,30 @@ st.markdown("""
 st.title("Welcome to the Flatmates app! 🏠")
 st.markdown("Manage your shared living space with ease.")
 
+SEARCH_DOMAINS = {"events": "📅", "shopping": "🛒", "expenses": "💸", "reimbursements": "🤝"}
+
+@st.fragment
+def house_search():
+    """Search box over the whole house; typing reruns only this fragment."""
+    query_col, domain_col = st.columns([3, 2])
+    with query_col:
+        query = st.text_input("🔎 Search the house", placeholder="e.g. kitchen, oat milk, rent")
+    with domain_col:
+        domains = st.multiselect("In", list(SEARCH_DOMAINS), placeholder="Everywhere")
+    if not query.strip():
+        return
+    hits = search_house(query, domains)
+    if not hits:
+        st.caption("No matches.")
+    for hit in hits:
+        # The backend escapes the text and only adds <mark> tags around matches
+        line = f"{SEARCH_DOMAINS[hit['domain']]} {hit['title']}"
+        if hit.get("snippet"):
+            line += f" — <small>{hit['snippet']}</small>"
+        st.markdown(line, unsafe_allow_html=True)
+
+house_search()
+
 col1, col2 = st.columns(2)
 
 with col1:
@@ -140,4 +164,6 @@ with col4:
     with st.container(border=True):
         st.subheader("💸 Expenses")
         st.write("Split bills and see who owes what.")
-        st.page_link("pages/3_Expenses.py", label="Go to Expenses", icon="💸")
\ No newline at end of file
+        st.page_link("pages/3_Expenses.py", label="Go to Expenses", icon="💸")
+
+render_perf_panel()
@@ -5,7 +5,18 @@ import streamlit as st
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils import get_house_settings, render_sidebar, require_auth, reset_house_data, update_house_settings
+from utils import (
+    calendar_feed_url,
+    export_house_data,
+    get_house_settings,
+    import_calendar,
+    import_house_data,
+    render_perf_panel,
+    render_sidebar,
+    require_auth,
+    run_house_job,
+    update_house_settings,
+)
 
 st.set_page_config(page_title="Settings", page_icon="⚙️")
 render_sidebar()
@@ -13,13 +24,36 @@ render_sidebar()
 st.title("⚙️ Settings")
 
 profile = require_auth()
-house = profile.get("house", get_house_settings())
+# Only ask the backend when the profile lacks the house (a default argument would always fetch it).
+house = profile["house"] if "house" in profile else get_house_settings()
 user = profile.get("user", {})
 
 house_name = house.get("name", "My Flat")
 join_code = house.get("join_code")
 current_flatmates = house.get("flatmates", [])
 
+
+
+def _run_with_progress(kind, label):
+    """Run a background house job while showing its progress.
+
+    Args:
+        kind (str): Job kind passed to `run_house_job`.
+        label (str): Text shown next to the progress bar.
+
+    Returns:
+        bool: True if the job finished successfully.
+    """
+    bar = st.progress(0.0, text=label)
+
+    def update(done, total):
+        bar.progress(min(done / total, 1.0) if total else 0.0, text=f"{label} ({done}/{total})")
+
+    ok = run_house_job(kind, on_progress=update)
+    bar.empty()
+    return ok
+
+
 info_col, house_col = st.columns([1, 2], gap="large")
 
 with info_col:
@@ -55,6 +89,63 @@ with house_col:
             st.session_state.pop("profile", None)
             st.rerun()
 
+with st.container(border=True):
+    st.subheader("💾 Backup & Restore")
+    export_col, import_col = st.columns(2)
+
+    with export_col:
+        st.markdown("**Export house data**")
+        export_format = st.radio("Format", ["ndjson", "csv"], horizontal=True, key="export_format")
+        if st.button("Prepare export", use_container_width=True):
+            content = export_house_data(export_format)
+            if content is None:
+                st.error("Unable to export right now. Please try again.")
+            else:
+                st.download_button(
+                    "⬇️ Download",
+                    data=content,
+                    file_name=f"{house_name}.{export_format}",
+                    mime="text/csv" if export_format == "csv" else "application/x-ndjson",
+                    use_container_width=True,
+                )
+
+    with import_col:
+        st.markdown("**Import house data**")
+        upload = st.file_uploader("Export file", type=["ndjson", "csv"], key="import_file")
+        if st.button("Import", use_container_width=True, disabled=upload is None):
+            import_format = "csv" if upload.name.endswith(".csv") else "ndjson"
+            with st.spinner("Importing..."):
+                summary = import_house_data(upload.getvalue(), import_format)
+            if summary:
+                st.success(f"Imported {summary['total']} records.")
+            else:
+                st.error("Import failed. Check that the file is a valid export.")
+
+with st.container(border=True):
+    st.subheader("📆 Calendar Apps")
+    feed_col, ics_col = st.columns(2)
+
+    with feed_col:
+        st.markdown("**Subscribe from your phone**")
+        reset_feed = st.button("🔄 Reset link", help="Stop the current link from working and get a new one")
+        feed_url = calendar_feed_url(rotate=reset_feed)
+        if feed_url:
+            st.code(feed_url, language=None)
+            st.caption("Add this URL as a calendar subscription. It can only read the house calendar; reset it if it leaks.")
+        else:
+            st.info("Calendar subscriptions need the backend to be reachable over HTTP.")
+
+    with ics_col:
+        st.markdown("**Import a calendar file**")
+        ics_upload = st.file_uploader("iCalendar file", type=["ics"], key="import_ics")
+        if st.button("Import events", use_container_width=True, disabled=ics_upload is None):
+            with st.spinner("Importing..."):
+                summary = import_calendar(ics_upload.getvalue())
+            if summary:
+                st.success(f"Imported {summary['total']} events.")
+            else:
+                st.error("Import failed. Check that the file is a valid .ics calendar.")
+
 with st.container(border=True):
     st.subheader("🗑️ Danger Zone")
     st.warning(
@@ -76,7 +167,7 @@ with st.container(border=True):
             use_container_width=True,
             disabled=not confirm_reset,
         ):
-            if reset_house_data():
+            if _run_with_progress("reset", "Clearing house data"):
                 st.success("House data cleared. Start fresh!")
                 st.rerun()
             else:
@@ -95,12 +186,12 @@ with st.container(border=True):
             use_container_width=True,
             disabled=not confirm_delete,
         ):
-            from utils import delete_house
-
-            if delete_house():
+            if _run_with_progress("delete", "Deleting house"):
                 st.success("House deleted. You will need to register or join a house again.")
                 for key in ("auth_token", "profile"):
                     st.session_state.pop(key, None)
                 st.rerun()
             else:
                 st.error("Unable to delete the house right now. Please try again.")
+
+render_perf_panel()
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
 import sys
 import os
 from streamlit_calendar import calendar
@@ -8,12 +8,24 @@ from streamlit_calendar import calendar
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import (
+    EditConflict,
+    calendar_view,
+    calendar_window,
+    cancel_occurrence,
     create_event,
+    fetch_all,
+    get_availability,
+    get_day_events,
     get_events,
     get_house_settings,
+    get_upcoming_events,
+    patch_event,
+    render_perf_panel,
     render_sidebar,
+    rerun_fragment,
     require_auth,
-    update_event,
+    update_occurrence,
+    watch_changes,
 )
 
 st.set_page_config(page_title="Calendar", page_icon="📅", layout="wide")
@@ -30,15 +42,19 @@ if "selected_date" not in st.session_state:
 if "view_mode" not in st.session_state:
     st.session_state.view_mode = "list" # list, day, details, create, edit
 
-if "selected_event" not in st.session_state:
-    st.session_state.selected_event = None
 if "selected_event_id" not in st.session_state:
     st.session_state.selected_event_id = None
 if "skip_event_id" not in st.session_state:
     st.session_state.skip_event_id = None
 
 # --- DATA LOADING ---
-settings = profile.get("house", get_house_settings())
+# Only the months around the one in focus; recurring events are expanded per window.
+window_start, window_end = calendar_window(st.session_state.selected_date)
+page_fetches = {"events": lambda: get_events(window_start, window_end)}
+if "house" not in profile:
+    page_fetches["settings"] = get_house_settings
+page_data = fetch_all(page_fetches, defaults={"events": [], "settings": {}})
+settings = profile.get("house") or page_data.get("settings", {})
 USERS = settings.get("flatmates", [])
 
 if not USERS:
@@ -47,7 +63,16 @@ if not USERS:
         st.switch_page("pages/0_Settings.py")
     st.stop()
 
-events = get_events()
+events = page_data["events"]
+watch_changes("events", "house")
+
+
+def rerun_for_focus():
+    """Rerun the page if `selected_date` left the loaded window, otherwise only the current fragment."""
+    if calendar_window(st.session_state.selected_date) != (window_start, window_end):
+        st.rerun(scope="app")
+    rerun_fragment()
+
 
 def _extract_date(value):
     """Normalize a date-like value into a `date` object.
@@ -79,6 +104,24 @@ def _extract_date(value):
                 return None
     return None
 
+REPEAT_UNITS = {"daily": "day(s)", "weekly": "week(s)", "monthly": "month(s)"}
+
+def _describe_recurrence(rule):
+    """Summarize a recurrence rule for display, e.g. "Every 2 week(s) until 2025-06-30".
+
+    Args:
+        rule (dict): Recurrence rule as returned by the backend.
+
+    Returns:
+        str: Human-readable summary.
+    """
+    text = f"Every {rule.get('interval', 1)} {REPEAT_UNITS[rule['freq']]}"
+    if rule.get("until"):
+        text += f" until {rule['until']}"
+    elif rule.get("count"):
+        text += f", {rule['count']} times"
+    return text
+
 def _parse_calendar_payload(payload, keys):
     """Pull the first valid date from a calendar callback payload.
 
@@ -98,56 +141,21 @@ def _parse_calendar_payload(payload, keys):
                 return parsed
     return None
 
-# Prepare Calendar Events
-calendar_events = []
-for event in events:
-    start_str = event['date']
-    if event.get('start_time'):
-        start_str += f"T{event['start_time']}"
-    
-    end_str = None
-    if event.get('end_time'):
-        end_str = event['date'] + f"T{event['end_time']}"
-    
-    # Color logic
-    color = "#3788d8"
-    assignees = event.get('assigned_to', [])
-    if isinstance(assignees, str): assignees = [assignees]
-    elif assignees is None: assignees = []
-    
-    if assignees:
-        first_person = assignees[0]
-        if first_person in USERS:
-            colors = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEEAD"]
-            try:
-                idx = USERS.index(first_person)
-                color = colors[idx % len(colors)]
-            except: pass
-
-    assignee_str = ", ".join(assignees) if assignees else "Everyone"
-
-    calendar_events.append({
-        "id": str(event['id']), # Ensure ID is string for FullCalendar
-        "title": f"{event['title']} ({assignee_str})",
-        "start": start_str,
-        "end": end_str,
-        "backgroundColor": color,
-        "borderColor": color,
-        "extendedProps": {
-            "description": event.get('description'),
-            "assigned_to": assignees,
-            "full_title": event['title'],
-            "original_event": event # Store full event object for editing
-        }
-    })
+# Prepare Calendar Events (memoized until the events change)
+calendar_events, _ = calendar_view(events, USERS, window_start, window_end)
 
+# streamlit-calendar does not report FullCalendar's datesSet, so month navigation
+# happens through the buttons below, and validRange keeps the built-in views
+# inside the window whose events are loaded.
 calendar_options = {
     "headerToolbar": {
-        "left": "prev,next today",
+        "left": "",
         "center": "title",
         "right": "dayGridMonth,timeGridWeek,listMonth",
     },
     "initialView": "dayGridMonth",
+    "initialDate": st.session_state.selected_date.isoformat(),
+    "validRange": {"start": window_start.isoformat(), "end": (window_end + timedelta(days=1)).isoformat()},
     "selectable": True,
     "editable": False,
     "height": 650,
@@ -158,12 +166,28 @@ col_cal, col_panel = st.columns([2, 1], gap="medium")
 
 with col_cal:
     st.markdown("### Schedule")
+    nav_prev, nav_today, nav_next = st.columns(3)
+    focus_month = st.session_state.selected_date.replace(day=1)
+    new_focus = None
+    if nav_prev.button("◀ Previous month", use_container_width=True):
+        new_focus = (focus_month - timedelta(days=1)).replace(day=1)
+    if nav_today.button("Today", use_container_width=True):
+        new_focus = date.today()
+    if nav_next.button("Next month ▶", use_container_width=True):
+        new_focus = (focus_month + timedelta(days=32)).replace(day=1)
+    if new_focus is not None and new_focus != st.session_state.selected_date:
+        st.session_state.selected_date = new_focus
+        st.session_state.view_mode = "list"
+        st.rerun(scope="app")
+
     cal_state = calendar(
         events=calendar_events, 
         options=calendar_options, 
-        key="calendar_widget",
+        # A new window remounts the calendar at the new initialDate.
+        key=f"calendar_widget_{window_start.isoformat()}",
         callbacks=['dateClick', 'select', 'eventClick']
     )
+    st.caption(f"Showing events from {window_start:%d %b %Y} to {window_end:%d %b %Y}.")
 
 # --- INTERACTION LOGIC ---
 # Check for Event Click
@@ -175,7 +199,6 @@ if cal_state.get("eventClick"):
         st.session_state.skip_event_id = None
     else:
         if st.session_state.selected_event_id != event_id or st.session_state.view_mode != "details":
-            st.session_state.selected_event = clicked_event
             st.session_state.selected_event_id = event_id
             st.session_state.view_mode = "details"
             st.rerun()
@@ -198,8 +221,16 @@ if new_date and new_date != st.session_state.selected_date:
 
 
 # --- SIDE PANEL ---
-with col_panel:
-    
+# A fragment: switching between its views re-executes only the panel, while the
+# calendar component (and its payload) is left alone. Writes rerun the whole page.
+@st.fragment
+def side_panel():
+    """Render the details, edit, day or upcoming view next to the calendar."""
+    selected = None
+    if st.session_state.view_mode in ("details", "edit"):
+        _, events_by_id = calendar_view(get_events(window_start, window_end), USERS, window_start, window_end)
+        selected = events_by_id.get(str(st.session_state.selected_event_id))
+
     # Helper function to reset view
     def go_home(reset_skip=True):
         """Return to list view and optionally clear the skip flag.
@@ -212,34 +243,35 @@ with col_panel:
         """
         st.session_state.view_mode = "list"
         st.session_state.selected_date = date.today()
-        st.session_state.selected_event = None
         st.session_state.selected_event_id = None
         if reset_skip:
             st.session_state.skip_event_id = None
-        st.rerun()
+        rerun_for_focus()
 
     # 1. DETAILS VIEW
-    if st.session_state.view_mode == "details" and st.session_state.selected_event:
-        evt = st.session_state.selected_event
-        props = evt.get("extendedProps", {})
+    if st.session_state.view_mode == "details" and selected:
+        evt = selected
         
         with st.container(border=True):
-            st.subheader(f"📌 {props.get('full_title', evt['title'])}")
+            st.subheader(f"📌 {evt['title']}")
             
             # Date formatting
             try:
-                d = datetime.fromisoformat(evt['start'].split("T")[0]).strftime("%A, %d %B")
+                d = datetime.fromisoformat(evt['date']).strftime("%A, %d %B")
                 st.caption(f"📅 {d}")
             except: pass
 
+            if evt.get("recurrence"):
+                st.caption(f"🔁 {_describe_recurrence(evt['recurrence'])}")
+
             st.divider()
             
-            if props.get("description"):
+            if evt.get("description"):
                 st.markdown("**Description**")
-                st.write(props["description"])
+                st.write(evt["description"])
             
             st.markdown("**Assigned To**")
-            assignees = props.get("assigned_to", [])
+            assignees = evt.get("assigned_to") or []
             if assignees:
                 for person in assignees:
                     st.info(person, icon="👤")
@@ -252,26 +284,33 @@ with col_panel:
             with c1:
                 if st.button("✏️ Edit", use_container_width=True):
                     st.session_state.view_mode = "edit"
-                    st.rerun()
+                    rerun_fragment()
             with c2:
                 if st.button("❌ Close", use_container_width=True):
                     st.session_state.skip_event_id = st.session_state.selected_event_id
                     go_home(reset_skip=False)
+            if evt.get("recurrence") and st.button("🗑️ Skip this date", use_container_width=True):
+                cancel_occurrence(evt["id"], evt["occurrence"])
+                st.session_state.view_mode = "list"
+                st.session_state.selected_event_id = None
+                st.rerun()
 
     # 2. EDIT VIEW
-    elif st.session_state.view_mode == "edit" and st.session_state.selected_event:
-        evt = st.session_state.selected_event
-        props = evt.get("extendedProps", {})
-        original = props.get("original_event", {})
+    elif st.session_state.view_mode == "edit" and selected:
+        original = selected
         
         with st.container(border=True):
             st.subheader("✏️ Edit Event")
+            # Occurrences of a recurring event are edited one at a time; the rest of the series stays as is.
+            editing_occurrence = bool(original.get("recurrence"))
+            if editing_occurrence:
+                st.caption(f"Only the occurrence of {original['occurrence']} changes.")
             
             # Parse times for default values
             use_time_default = bool(original.get('start_time'))
             
             # Move checkbox OUTSIDE form for interactivity
-            event_identifier = original.get('id') or evt.get('id')
+            event_identifier = original['id']
             use_time = st.checkbox(
                 "Add Time", 
                 value=use_time_default, 
@@ -279,7 +318,7 @@ with col_panel:
             )
             
             with st.form("edit_event_form"):
-                title = st.text_input("Title", value=props.get('full_title', evt['title']))
+                title = st.text_input("Title", value=original['title'])
                 
                 # Parse date
                 try:
@@ -317,17 +356,17 @@ with col_panel:
                         key=f"edit_end_{event_identifier}"
                     )
                 
-                assigned_default = props.get("assigned_to", [])
+                assigned_default = original.get("assigned_to") or []
                 assigned_to = st.multiselect("Assign To", USERS, default=assigned_default)
                 
-                desc = st.text_area("Description", value=props.get("description", ""))
+                desc = st.text_area("Description", value=original.get("description") or "")
                 
                 st.markdown("---")
                 submitted = st.form_submit_button("Update", type="primary", use_container_width=True)
                 
             if st.button("Cancel", use_container_width=True):
                 st.session_state.view_mode = "details"
-                st.rerun()
+                rerun_fragment()
                 
             if submitted:
                 if not title:
@@ -347,10 +386,23 @@ with col_panel:
                         payload["start_time"] = None
                         payload["end_time"] = None
                     
-                    update_event(original['id'], payload)
-                    st.success("Updated!")
-                    st.session_state.view_mode = "details"
-                    st.rerun()
+                    try:
+                        if editing_occurrence:
+                            saved = update_occurrence(original["id"], original["occurrence"], payload)
+                        else:
+                            # Send only what changed, so edits by flatmates to other fields survive.
+                            changes = {key: value for key, value in payload.items() if original.get(key) != value}
+                            saved = patch_event(original["id"], changes, original.get("version"))
+                    except EditConflict:
+                        st.warning("A flatmate changed this event while you were editing it. Review it and try again.")
+                    else:
+                        if saved is None:
+                            st.error("Could not save the event. Please try again.")
+                        else:
+                            st.success("Updated!")
+                            st.session_state.view_mode = "details"
+                            # The calendar shows the changed event too, so rerun the whole page.
+                            st.rerun()
 
     # 3. DAY VIEW (List of events + Create Form)
     elif st.session_state.view_mode == "day" or st.session_state.view_mode == "create":
@@ -359,7 +411,7 @@ with col_panel:
             st.subheader(f"📅 {d_str}")
             
             # Filter events for this day
-            day_events = [e for e in events if e['date'] == str(st.session_state.selected_date)]
+            day_events = get_day_events(st.session_state.selected_date)
             
             if day_events:
                 st.caption("Events on this day:")
@@ -382,6 +434,7 @@ with col_panel:
                 key=f"create_use_time_{st.session_state.selected_date.isoformat()}"
             )
             
+            date_key = st.session_state.selected_date.isoformat()
             with st.form("create_event_form_day"):
                 title = st.text_input("Title", placeholder="e.g. Dinner Party")
                 
@@ -414,6 +467,14 @@ with col_panel:
                     )
                 
                 desc = st.text_area("Description", height=80, placeholder="Add details...")
+
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    repeat = st.selectbox("Repeat", ["never", *REPEAT_UNITS], key=f"create_repeat_{date_key}")
+                with c2:
+                    interval = st.number_input("Every", min_value=1, value=1, key=f"create_interval_{date_key}")
+                with c3:
+                    until = st.date_input("Until", value=None, key=f"create_until_{date_key}")
                 
                 submitted = st.form_submit_button("Create Event", type="primary", use_container_width=True)
                 
@@ -430,6 +491,12 @@ with col_panel:
                         if use_time:
                             payload["start_time"] = str(start_t)
                             payload["end_time"] = str(end_t)
+                        if repeat != "never":
+                            payload["recurrence"] = {
+                                "freq": repeat,
+                                "interval": int(interval),
+                                "until": str(until) if until else None,
+                            }
                         
                         create_event(payload)
                         st.success("Event Created!")
@@ -443,13 +510,10 @@ with col_panel:
         with st.container(border=True):
             st.subheader("🗓️ Upcoming Events")
             
-            # Filter for future events
-            today_str = str(date.today())
-            upcoming = [e for e in events if e['date'] >= today_str]
-            upcoming.sort(key=lambda x: x['date'])
+            upcoming = get_upcoming_events(limit=5)
             
             if upcoming:
-                for e in upcoming[:5]: # Show next 5
+                for e in upcoming:
                     with st.container():
                         d_obj = datetime.fromisoformat(e['date']).date()
                         st.write(f"**{e['title']}**")
@@ -462,4 +526,29 @@ with col_panel:
             if st.button("➕ Create New Event", type="primary", use_container_width=True):
                 st.session_state.selected_date = date.today()
                 st.session_state.view_mode = "day"
-                st.rerun()
+                rerun_for_focus()
+
+        with st.expander("🤝 Find a common time"):
+            with st.form("availability_form"):
+                people = st.multiselect("Flatmates", USERS, default=USERS)
+                window = st.date_input("Between", value=(date.today(), date.today() + timedelta(days=6)))
+                minutes = st.number_input("Minutes needed", min_value=15, max_value=480, value=60, step=15)
+                searched = st.form_submit_button("Search", use_container_width=True)
+            if searched and len(window) == 2:
+                result = get_availability(window[0], window[1], people, int(minutes))
+                if result["free_slots"]:
+                    st.caption("Free for everyone selected:")
+                    for slot in result["free_slots"][:10]:
+                        slot_start, slot_end = datetime.fromisoformat(slot["start"]), datetime.fromisoformat(slot["end"])
+                        st.write(f"• {slot_start.strftime('%a %d %b, %H:%M')}–{slot_end.strftime('%H:%M')}")
+                else:
+                    st.info("No shared free time in this window.")
+                for conflict in result["conflicts"]:
+                    first, second = conflict["events"]
+                    st.warning(f"{first['title']} overlaps {second['title']} on {first['date']}", icon="⚠️")
+
+
+with col_panel:
+    side_panel()
+
+render_perf_panel()
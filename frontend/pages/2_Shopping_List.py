@@ -1,16 +1,27 @@
 import streamlit as st
+import pandas as pd
+import json
 import sys
 import os
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import (
+    EditConflict,
+    LIVE_FALLBACK_INTERVAL,
+    LIVE_UPDATES,
     add_shopping_item,
+    apply_shopping_changes,
+    diff_shopping_list,
+    fetch_all,
     get_house_settings,
     get_shopping_list,
+    live_data,
+    render_perf_panel,
     render_sidebar,
-    remove_shopping_item,
+    rerun_fragment,
     require_auth,
+    watch_changes,
 )
 
 st.set_page_config(page_title="Shopping List", page_icon="🛒")
@@ -20,8 +31,12 @@ st.title("🛒 Shopping List")
 
 require_auth()
 
-# Get users
-settings = get_house_settings()
+# Get users, warming the list for the panel below in the same round
+page_data = fetch_all(
+    {"settings": get_house_settings, "items": lambda: live_data("shopping", get_shopping_list)},
+    defaults={"settings": {}},
+)
+settings = page_data["settings"]
 USERS = settings.get("flatmates", [])
 
 if not USERS:
@@ -30,6 +45,27 @@ if not USERS:
         st.switch_page("pages/0_Settings.py")
     st.stop()
 
+
+
+def _grid_key():
+    """Widget key of the list grid; a new key drops its unsaved edits."""
+    return f"shopping_grid_{st.session_state.get('shopping_grid_rev', 0)}"
+
+
+def has_unsaved_edits():
+    """Whether the grid holds edits that reloading the list would discard."""
+    state = st.session_state.get(_grid_key()) or {}
+    return bool(state.get("edited_rows"))
+
+
+def discard_edits():
+    """Reset the grid and let it load the current list."""
+    st.session_state.shopping_grid_rev = st.session_state.get("shopping_grid_rev", 0) + 1
+    st.session_state.pop("shopping_snapshot", None)
+
+
+watch_changes("shopping", "house", hold=has_unsaved_edits)
+
 # Add item
 with st.container(border=True):
     st.subheader("Add New Item")
@@ -48,31 +84,79 @@ with st.container(border=True):
         submitted = st.form_submit_button("Add to List", use_container_width=True, type="primary")
         
         if submitted and new_item:
-            add_shopping_item({
+            # The new item is added to the cached list, so the rerun does not refetch it.
+            if add_shopping_item({
                 "name": new_item,
                 "quantity": quantity,
                 "added_by": added_by
-            })
-            st.rerun()
+            }):
+                st.rerun()
+            else:
+                st.error("Could not add the item. Please try again.")
 
 st.markdown("### Your List")
 
-# List items
-items = get_shopping_list()
-
-if items:
-    for item in items:
-        with st.container(border=True):
-            col1, col2, col3, col4 = st.columns([4, 3, 2, 1])
-            with col1:
-                st.markdown(f"##### {item['name']}")
-            with col2:
-                st.caption(f"Added by: {item['added_by']}")
-            with col3:
-                st.markdown(f"**Qty:** {item['quantity']}")
-            with col4:
-                if st.button("🗑️", key=f"del_{item['id']}", help="Remove item"):
-                    remove_shopping_item(item['id'])
-                    st.rerun()
-else:
-    st.info("The shopping list is empty! 🎉")
\ No newline at end of file
+
+# watch_changes reruns the page when a flatmate changes the list (unless the grid
+# has unsaved edits); the slow fallback only catches missed events and is served
+# from live_data's cache. Edits stay in the grid until saved, then go to the
+# backend as one batch that fails if a flatmate changed the same items.
+@st.fragment(run_every=LIVE_FALLBACK_INTERVAL if LIVE_UPDATES else None)
+def shopping_list_panel():
+    """Render the shopping list as one editable grid, refetching only when it changed."""
+    # While the grid has unsaved edits it keeps showing the list they were made on.
+    if has_unsaved_edits() and "shopping_snapshot" in st.session_state:
+        items = st.session_state.shopping_snapshot
+    else:
+        items = live_data("shopping", get_shopping_list)
+        st.session_state.shopping_snapshot = items
+
+    if not items:
+        st.info("The shopping list is empty! 🎉")
+        return
+
+    grid = pd.DataFrame(items, columns=["id", "name", "quantity", "added_by", "purchased"])
+    grid["remove"] = False
+    # Outside a form, so that pending edits are known before a flatmate's change reloads the list.
+    edited = st.data_editor(
+        grid,
+        key=_grid_key(),
+        hide_index=True,
+        use_container_width=True,
+        disabled=["id", "name", "added_by"],
+        column_order=["name", "quantity", "added_by", "purchased", "remove"],
+        column_config={
+            "name": st.column_config.TextColumn("Item"),
+            "quantity": st.column_config.NumberColumn("Qty", min_value=1, step=1),
+            "added_by": st.column_config.TextColumn("Added by"),
+            "purchased": st.column_config.CheckboxColumn("Bought"),
+            "remove": st.column_config.CheckboxColumn("Remove", help="Delete the item when saving"),
+        },
+    )
+    col_save, col_discard = st.columns(2)
+    saved = col_save.button("Save changes", type="primary", use_container_width=True)
+    col_discard.button(
+        "Discard changes", on_click=discard_edits, disabled=not has_unsaved_edits(), use_container_width=True
+    )
+
+    if saved:
+        # to_json turns numpy values (and cleared cells) into plain JSON types
+        batch = diff_shopping_list(items, json.loads(edited.to_json(orient="records")))
+        if not batch["update"] and not batch["delete"]:
+            st.info("No changes to save.")
+            return
+        try:
+            applied = apply_shopping_changes(batch)
+        except EditConflict:
+            st.warning("A flatmate changed some of these items meanwhile. Discard your changes to load the current list.")
+            return
+        if applied:
+            discard_edits()
+            rerun_fragment()
+        else:
+            st.error("Could not save your changes. Please try again.")
+
+
+shopping_list_panel()
+
+render_perf_panel()
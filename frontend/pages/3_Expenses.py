@@ -7,14 +7,19 @@ import os
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import (
-    get_expenses,
+    get_expenses_page,
     add_expense,
     get_debts,
+    get_expense_summary,
     get_house_settings,
-    get_reimbursements,
+    get_reimbursements_page,
     add_reimbursement,
+    fetch_all,
+    render_perf_panel,
     render_sidebar,
+    rerun_fragment,
     require_auth,
+    watch_changes,
 )
 
 st.set_page_config(page_title="Expenses", page_icon="💸", layout="wide")
@@ -44,8 +49,72 @@ def _rerun_page() -> None:
         st.experimental_rerun()
 
 
-# Get users from settings
-settings = get_house_settings()
+PAGE_SIZE = 20
+EVERYONE = "Everyone"
+EXPENSE_SORTS = {
+    "Newest first": ("id", True),
+    "Oldest first": ("id", False),
+    "Amount (high → low)": ("amount", True),
+    "Amount (low → high)": ("amount", False),
+    "Description (A → Z)": ("title", False),
+    "Paid by (A → Z)": ("payer", False),
+}
+HISTORY_SORTS = {
+    "Newest first": ("id", True),
+    "Oldest first": ("id", False),
+    "Amount (high → low)": ("amount", True),
+}
+
+
+def _expense_log_query() -> dict:
+    """Read the expense log's filters, sort order and page from session state.
+
+    Returns:
+        dict: Keyword arguments for `get_expenses_page`.
+    """
+    sort, descending = EXPENSE_SORTS[st.session_state.get("_expense_sort", "Newest first")]
+    person = st.session_state.get("_expense_person", EVERYONE)
+    return {
+        "offset": st.session_state.get("_expense_log_page", 0) * PAGE_SIZE,
+        "limit": PAGE_SIZE,
+        "sort": sort,
+        "descending": descending,
+        "search": st.session_state.get("_expense_search", "").strip() or None,
+        "person": None if person == EVERYONE else person,
+    }
+
+
+def _history_query() -> dict:
+    """Read the reimbursement history's filter, sort order and page from session state.
+
+    Returns:
+        dict: Keyword arguments for `get_reimbursements_page`.
+    """
+    sort, descending = HISTORY_SORTS[st.session_state.get("_history_sort", "Newest first")]
+    person = st.session_state.get("_history_person", EVERYONE)
+    return {
+        "offset": st.session_state.get("_history_page", 0) * PAGE_SIZE,
+        "limit": PAGE_SIZE,
+        "sort": sort,
+        "descending": descending,
+        "person": None if person == EVERYONE else person,
+    }
+
+
+# Load everything the page needs in parallel. The snapshot only needs the
+# summary; the debt tab also warms the cache its settlements and table pages read from.
+page_fetches = {
+    "settings": get_house_settings,
+    "summary": get_expense_summary,
+}
+if st.session_state.get("_active_expense_tab") == "debt":
+    page_fetches.update(
+        debts=get_debts,
+        expense_log=lambda: get_expenses_page(**_expense_log_query()),
+        history=lambda: get_reimbursements_page(**_history_query()),
+    )
+page_data = fetch_all(page_fetches, defaults={"settings": {}, "summary": {}})
+settings = page_data["settings"]
 USERS = settings.get("flatmates", [])
 
 if not USERS:
@@ -54,9 +123,8 @@ if not USERS:
         st.switch_page("pages/0_Settings.py")
     st.stop()
 
-expenses_data = get_expenses()
-debts_data = get_debts()
-reimbursements_data = get_reimbursements()
+summary = page_data["summary"]
+watch_changes("expenses", "reimbursements", "house")
 
 if len(st.session_state.get("_expense_default_split", [])) != len(USERS):
     st.session_state["_expense_default_split"] = USERS.copy()
@@ -66,15 +134,6 @@ st.session_state.setdefault("_reimbursement_selection_idx", 0)
 st.session_state.setdefault("_reimbursement_note", "")
 st.session_state.setdefault("_active_expense_tab", "add")
 
-if st.session_state.pop("_reset_reimbursement_state", False):
-    st.session_state["_show_reimbursement_form"] = False
-    st.session_state["_reimbursement_note"] = ""
-    st.session_state["_reimbursement_selection_idx"] = 0
-
-if st.session_state.pop("_open_reimbursement_now", False):
-    st.session_state["_show_reimbursement_form"] = True
-    st.session_state["_active_expense_tab"] = "debt"
-
 if st.session_state.get("_show_reimbursement_form"):
     st.session_state["_active_expense_tab"] = "debt"
 
@@ -82,11 +141,442 @@ for notice_key in ("_expense_notice", "_reimbursement_notice"):
     if message := st.session_state.pop(notice_key, None):
         st.success(message)
 
-expenses_df = pd.DataFrame(expenses_data) if expenses_data else pd.DataFrame(
-    columns=["id", "title", "amount", "payer", "involved_people"]
-)
-if not expenses_df.empty:
-    expenses_df["amount"] = pd.to_numeric(expenses_df["amount"], errors="coerce").fillna(0.0)
+
+def _expenses_frame(expenses_data) -> pd.DataFrame:
+    """Build the expenses table with numeric amounts.
+
+    Args:
+        expenses_data (list): Expense records from the backend.
+
+    Returns:
+        pd.DataFrame: One row per expense, empty with the expected columns if there are none.
+    """
+    expenses_df = pd.DataFrame(expenses_data) if expenses_data else pd.DataFrame(
+        columns=["id", "title", "amount", "payer", "involved_people"]
+    )
+    if not expenses_df.empty:
+        expenses_df["amount"] = pd.to_numeric(expenses_df["amount"], errors="coerce").fillna(0.0)
+    return expenses_df
+
+
+def _totals_frame(totals, key: str) -> pd.DataFrame:
+    """Turn a `{person: amount}` mapping from the expense summary into a chart table.
+
+    Args:
+        totals (dict): Per-person totals.
+        key (str): Name of the person column, e.g. `payer`.
+
+    Returns:
+        pd.DataFrame: Columns `key` and `amount`, one row per person.
+    """
+    return pd.DataFrame(
+        [(person, float(amount)) for person, amount in (totals or {}).items()],
+        columns=[key, "amount"],
+    )
+
+
+def _debts_frame(debts_data) -> pd.DataFrame:
+    """Build the settlements table sorted by amount, largest first.
+
+    Args:
+        debts_data (list): Debt records from the backend.
+
+    Returns:
+        pd.DataFrame: One row per suggested settlement.
+    """
+    if not debts_data:
+        return pd.DataFrame(columns=["debtor", "creditor", "amount"])
+    debts_df = pd.DataFrame(debts_data).sort_values(by="amount", ascending=False)
+    debts_df["amount"] = debts_df["amount"].astype(float)
+    return debts_df
+
+
+# The forms, the settlements panel and the charts are fragments: their widgets
+# rerun only the fragment, which reads its own data (served by the response cache).
+# Saving something reruns the whole page so every section reflects the change.
+@st.fragment
+def expense_form():
+    """Render the new-expense form."""
+    with st.form("expense_form", clear_on_submit=True):
+        title = st.text_input("Description", placeholder="e.g., Electricity Bill")
+        amount = st.number_input("Amount ($)", min_value=0.01, step=0.01)
+        payer = st.selectbox("Paid By", USERS)
+        default_split = st.session_state.get("_expense_default_split", USERS)
+        involved = st.multiselect(
+            "Split With",
+            USERS,
+            default=default_split,
+            help="Everyone selected shares the cost equally.",
+        )
+
+        submitted = st.form_submit_button("Add Expense")
+
+        if submitted:
+            if title and amount > 0 and involved:
+                payload = {
+                    "title": title.strip(),
+                    "amount": float(amount),
+                    "payer": payer,
+                    "involved_people": involved,
+                }
+                if add_expense(payload):
+                    st.session_state["_expense_notice"] = "Expense added successfully."
+                    st.session_state["_expense_default_split"] = involved.copy()
+                    _rerun_page()
+                else:
+                    st.error("Could not save the expense. Please try again.")
+            else:
+                st.error("Please provide a description, amount, and at least one person to split with.")
+
+
+@st.fragment
+def settlements_panel():
+    """Render suggested settlements and the reimbursement form."""
+    # Widget-backed state can only be reset before its widgets are created.
+    if st.session_state.pop("_reset_reimbursement_state", False):
+        st.session_state["_show_reimbursement_form"] = False
+        st.session_state["_reimbursement_note"] = ""
+        st.session_state["_reimbursement_selection_idx"] = 0
+
+    debts_df = _debts_frame(get_debts())
+
+    with st.container(border=True):
+        st.markdown("### ⚖️ Settlements")
+        if debts_df.empty:
+            st.info("No debts detected. You're all square!")
+
+        st.markdown("**Suggested Settlements**")
+        if debts_df.empty:
+            st.caption("Add a reimbursement once new settlements appear.")
+        else:
+            settlements_table = debts_df.copy()
+            settlements_table["amount"] = settlements_table["amount"].map(_format_currency)
+            st.dataframe(
+                settlements_table.rename(
+                    columns={"debtor": "Debtor", "creditor": "Creditor", "amount": "Amount"}
+                ),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        st.divider()
+        with st.container(border=True):
+            st.markdown("#### Record a Reimbursement")
+            if debts_df.empty:
+                st.info("No outstanding settlements available to reimburse.")
+                st.session_state["_reset_reimbursement_state"] = True
+            else:
+                debt_records = debts_df.to_dict("records")
+                option_labels = [
+                    f"{record['debtor']} → {record['creditor']} ({_format_currency(record['amount'])})"
+                    for record in debt_records
+                ]
+                if not st.session_state["_show_reimbursement_form"]:
+                    if st.button("Record reimbursement", key="open_reimbursement"):
+                        st.session_state["_show_reimbursement_form"] = True
+                        st.session_state["_reimbursement_selection_idx"] = 0
+                        st.session_state["_reimbursement_note"] = ""
+                        rerun_fragment()
+
+                if st.session_state["_show_reimbursement_form"]:
+                    max_index = max(len(debt_records) - 1, 0)
+                    default_index = min(st.session_state["_reimbursement_selection_idx"], max_index)
+
+                    selected_index = st.selectbox(
+                        "Choose a settlement to reimburse",
+                        list(range(len(debt_records))),
+                        index=default_index,
+                        format_func=lambda idx: option_labels[idx],
+                    )
+                    st.session_state["_reimbursement_selection_idx"] = selected_index
+
+                    chosen_debt = debt_records[selected_index]
+                    amount_due = float(chosen_debt["amount"])
+                    st.info(
+                        f"{chosen_debt['debtor']} will reimburse {chosen_debt['creditor']} "
+                        f"{_format_currency(amount_due)}"
+                    )
+
+                    note_input = st.text_input(
+                        "Note (optional)",
+                        key="_reimbursement_note",
+                        placeholder="e.g., Bank transfer",
+                    )
+
+                    confirm_col, cancel_col = st.columns(2)
+                    if confirm_col.button(
+                        "Confirm reimbursement", type="primary", key="confirm_reimbursement"
+                    ):
+                        note_value = note_input.strip()
+                        payload = {
+                            "from_person": chosen_debt["debtor"],
+                            "to_person": chosen_debt["creditor"],
+                            "amount": amount_due,
+                            "note": note_value or None,
+                        }
+                        try:
+                            add_reimbursement(payload)
+                            st.session_state["_reimbursement_notice"] = (
+                                "Reimbursement recorded. Debts updated."
+                            )
+                            st.session_state["_reset_reimbursement_state"] = True
+                            st.session_state["_active_expense_tab"] = "debt"
+                            _rerun_page()
+                        except Exception:
+                            st.error("Unable to record the reimbursement. Please retry in a moment.")
+
+                    if cancel_col.button("Cancel", key="cancel_reimbursement"):
+                        st.session_state["_reset_reimbursement_state"] = True
+                        rerun_fragment()
+
+
+@st.fragment
+def expense_charts():
+    """Render contributions by payer and outstanding debts by debtor."""
+    chart_summary = get_expense_summary()
+    if not chart_summary.get("count"):
+        return
+
+    st.markdown("### 📊 Visual Snapshot")
+    chart_cols = st.columns(2)
+
+    with chart_cols[0]:
+        with st.container(border=True):
+            payer_totals = _totals_frame(chart_summary.get("by_payer"), "payer")
+            if not payer_totals.empty:
+                payer_base = alt.Chart(payer_totals)
+                payer_bars = (
+                    payer_base.mark_bar(cornerRadiusTopRight=10, cornerRadiusBottomRight=10)
+                    .encode(
+                        y=alt.Y("payer:N", sort="-x", title=""),
+                        x=alt.X(
+                            "amount:Q",
+                            title="Total Paid ($)",
+                            axis=alt.Axis(format="$,.2f"),
+                        ),
+                        color=alt.value("#4F8EF7"),
+                        tooltip=[
+                            alt.Tooltip("payer:N", title="Payer"),
+                            alt.Tooltip("amount:Q", title="Total Paid", format="$,.2f"),
+                        ],
+                    )
+                    .properties(height=280, title="Contributions by Payer")
+                )
+                payer_text = (
+                    payer_base.mark_text(
+                        align="left",
+                        baseline="middle",
+                        dx=6,
+                        color="#1f2a44",
+                        fontWeight="bold",
+                    )
+                    .encode(
+                        y=alt.Y("payer:N", sort="-x"),
+                        x=alt.X("amount:Q"),
+                        text=alt.Text("amount:Q", format="$,.2f"),
+                    )
+                )
+                payer_chart = (payer_bars + payer_text).configure_axis(
+                    labelColor="#4a4a4a", titleColor="#4a4a4a"
+                ).configure_view(strokeOpacity=0)
+                st.altair_chart(payer_chart, use_container_width=True)
+            else:
+                st.caption("Expenses by payer will appear here once recorded.")
+
+    with chart_cols[1]:
+        with st.container(border=True):
+            debtor_totals = _totals_frame(chart_summary.get("by_debtor"), "debtor")
+            if not debtor_totals.empty:
+                debtor_base = alt.Chart(debtor_totals)
+                debtor_bars = (
+                    debtor_base.mark_bar(cornerRadiusTopRight=10, cornerRadiusBottomRight=10)
+                    .encode(
+                        y=alt.Y("debtor:N", sort="-x", title=""),
+                        x=alt.X(
+                            "amount:Q",
+                            title="Amount Owed ($)",
+                            axis=alt.Axis(format="$,.2f"),
+                        ),
+                        color=alt.value("#F76F6F"),
+                        tooltip=[
+                            alt.Tooltip("debtor:N", title="Debtor"),
+                            alt.Tooltip("amount:Q", title="Owes", format="$,.2f"),
+                        ],
+                    )
+                    .properties(height=280, title="Outstanding Debts by Debtor")
+                )
+                debtor_text = (
+                    debtor_base.mark_text(
+                        align="left",
+                        baseline="middle",
+                        dx=6,
+                        color="#401818",
+                        fontWeight="bold",
+                    )
+                    .encode(
+                        y=alt.Y("debtor:N", sort="-x"),
+                        x=alt.X("amount:Q"),
+                        text=alt.Text("amount:Q", format="$,.2f"),
+                    )
+                )
+                debtor_chart = (debtor_bars + debtor_text).configure_axis(
+                    labelColor="#4a4a4a", titleColor="#4a4a4a"
+                ).configure_view(strokeOpacity=0)
+                st.altair_chart(debtor_chart, use_container_width=True)
+            else:
+                st.caption("Outstanding debts chart will populate when someone owes money.")
+
+
+def _turn_page(state_key: str, step: int) -> None:
+    """Move a paged table `step` pages forward (or back when negative)."""
+    st.session_state[state_key] = max(st.session_state.get(state_key, 0) + step, 0)
+
+
+def _reset_page(state_key: str) -> None:
+    """Go back to the first page after a filter or sort change."""
+    st.session_state[state_key] = 0
+
+
+def _load_page(state_key: str, fetch, query) -> dict:
+    """Fetch the current page, stepping back to the last page if the table shrank.
+
+    Args:
+        state_key (str): Session key holding the page index.
+        fetch (callable): `get_expenses_page` or `get_reimbursements_page`.
+        query (callable): Returns the keyword arguments for `fetch`.
+
+    Returns:
+        dict: The page's `items` and the matching `total`.
+    """
+    page = fetch(**query())
+    if not page["items"] and page["total"] and st.session_state.get(state_key, 0):
+        st.session_state[state_key] = (page["total"] - 1) // PAGE_SIZE
+        page = fetch(**query())
+    return page
+
+
+def _page_controls(state_key: str, total: int) -> None:
+    """Render previous/next buttons and the position within a paged table.
+
+    Args:
+        state_key (str): Session key holding the page index.
+        total (int): Number of rows matching the current filters.
+    """
+    page_index = st.session_state.get(state_key, 0)
+    last_page = max((total - 1) // PAGE_SIZE, 0)
+    if last_page == 0:
+        return
+    prev_col, position_col, next_col = st.columns((1, 2, 1))
+    prev_col.button(
+        "← Previous",
+        key=f"{state_key}_prev",
+        disabled=page_index == 0,
+        on_click=_turn_page,
+        args=(state_key, -1),
+    )
+    position_col.caption(f"Page {page_index + 1} of {last_page + 1} · {total} entries")
+    next_col.button(
+        "Next →",
+        key=f"{state_key}_next",
+        disabled=page_index >= last_page,
+        on_click=_turn_page,
+        args=(state_key, 1),
+    )
+
+
+# Both tables are sorted, filtered and paged by the backend, so each run only
+# downloads and renders PAGE_SIZE rows however long the history gets.
+@st.fragment
+def expense_log():
+    """Render one page of the expense log with its search, flatmate and sort controls."""
+    with st.container(border=True):
+        st.markdown("### 📜 Expense Log")
+        search_col, person_col, sort_col = st.columns((1.2, 1, 1))
+        search_col.text_input(
+            "Search",
+            key="_expense_search",
+            placeholder="Description",
+            on_change=_reset_page,
+            args=("_expense_log_page",),
+        )
+        person_col.selectbox(
+            "Flatmate",
+            [EVERYONE, *USERS],
+            key="_expense_person",
+            on_change=_reset_page,
+            args=("_expense_log_page",),
+        )
+        sort_col.selectbox(
+            "Sort by",
+            list(EXPENSE_SORTS),
+            key="_expense_sort",
+            on_change=_reset_page,
+            args=("_expense_log_page",),
+        )
+
+        query = _expense_log_query()
+        page = _load_page("_expense_log_page", get_expenses_page, _expense_log_query)
+        if not page["items"]:
+            if query["search"] or query["person"]:
+                st.info("No expenses match these filters.")
+            else:
+                st.info("No expenses yet. Record the first one to populate this view.")
+            return
+
+        expense_table = _expenses_frame(page["items"])
+        expense_table["Split With"] = expense_table["involved_people"].apply(lambda p: ", ".join(p))
+        display_expenses = expense_table[
+            ["title", "payer", "amount", "Split With"]
+        ].rename(columns={"title": "Description", "payer": "Paid By", "amount": "Amount ($)"})
+        display_expenses["Amount ($)"] = display_expenses["Amount ($)"].map(_format_currency)
+        st.dataframe(display_expenses, use_container_width=True, hide_index=True)
+        _page_controls("_expense_log_page", page["total"])
+
+
+@st.fragment
+def reimbursement_history():
+    """Render one page of the reimbursement history with its flatmate and sort controls."""
+    page = _load_page("_history_page", get_reimbursements_page, _history_query)
+    if not page["total"] and not _history_query()["person"]:
+        st.caption("Record a reimbursement to see the history here.")
+        return
+
+    with st.container(border=True):
+        st.markdown("### 🕰️ Reimbursement History")
+        person_col, sort_col = st.columns(2)
+        person_col.selectbox(
+            "Flatmate",
+            [EVERYONE, *USERS],
+            key="_history_person",
+            on_change=_reset_page,
+            args=("_history_page",),
+        )
+        sort_col.selectbox(
+            "Sort by",
+            list(HISTORY_SORTS),
+            key="_history_sort",
+            on_change=_reset_page,
+            args=("_history_page",),
+        )
+
+        if not page["items"]:
+            st.info("No reimbursements involve this flatmate.")
+            return
+
+        history_df = pd.DataFrame(page["items"])
+        history_df["Amount"] = history_df["amount"].apply(_format_currency)
+        history_df = history_df.rename(
+            columns={
+                "from_person": "From",
+                "to_person": "To",
+                "note": "Details",
+            }
+        )
+        history_df["Details"] = history_df["Details"].fillna("")
+        display_history = history_df[["From", "To", "Amount", "Details"]]
+        st.dataframe(display_history, use_container_width=True, hide_index=True)
+        _page_controls("_history_page", page["total"])
+
 
 TAB_LABELS = {
     "add": "➕ Add Expense",
@@ -111,45 +601,15 @@ if st.session_state["_active_expense_tab"] == "add":
     form_col, info_col = st.columns((1.1, 0.9))
 
     with form_col:
-        with st.form("expense_form", clear_on_submit=True):
-            title = st.text_input("Description", placeholder="e.g., Electricity Bill")
-            amount = st.number_input("Amount ($)", min_value=0.01, step=0.01)
-            payer = st.selectbox("Paid By", USERS)
-            default_split = st.session_state.get("_expense_default_split", USERS)
-            involved = st.multiselect(
-                "Split With",
-                USERS,
-                default=default_split,
-                help="Everyone selected shares the cost equally.",
-            )
-
-            submitted = st.form_submit_button("Add Expense")
-
-            if submitted:
-                if title and amount > 0 and involved:
-                    payload = {
-                        "title": title.strip(),
-                        "amount": float(amount),
-                        "payer": payer,
-                        "involved_people": involved,
-                    }
-                    try:
-                        add_expense(payload)
-                        st.session_state["_expense_notice"] = "Expense added successfully."
-                        st.session_state["_expense_default_split"] = involved.copy()
-                        _rerun_page()
-                    except Exception:
-                        st.error("Could not save the expense. Please try again.")
-                else:
-                    st.error("Please provide a description, amount, and at least one person to split with.")
+        expense_form()
 
     with info_col:
         st.subheader("Household Snapshot")
-        if expenses_df.empty:
+        if not summary.get("count"):
             st.info("No expenses recorded yet. Add the first expense to unlock the summary.")
         else:
-            total_spent = float(expenses_df["amount"].sum())
-            total_expenses = len(expenses_df)
+            total_spent = float(summary["total"])
+            total_expenses = summary["count"]
             metric_col1, metric_col2 = st.columns(2)
             metric_col1.metric("Total Recorded", _format_currency(total_spent))
             metric_col2.metric("Number of Expenses", f"{total_expenses}")
@@ -161,228 +621,15 @@ else:
     expenses_section, settlements_section = st.columns((1.1, 0.9))
 
     with expenses_section:
-        with st.container(border=True):
-            st.markdown("### 📜 Expense Log")
-            if expenses_df.empty:
-                st.info("No expenses yet. Record the first one to populate this view.")
-            else:
-                expense_table = expenses_df.sort_values(by="id", ascending=False).copy()
-                expense_table["Split With"] = expense_table["involved_people"].apply(lambda p: ", ".join(p))
-                display_expenses = expense_table[
-                    ["title", "payer", "amount", "Split With"]
-                ].rename(columns={"title": "Description", "payer": "Paid By", "amount": "Amount ($)"})
-                display_expenses["Amount ($)"] = display_expenses["Amount ($)"].map(_format_currency)
-                st.dataframe(display_expenses, use_container_width=True, hide_index=True)
+        expense_log()
 
     with settlements_section:
-        with st.container(border=True):
-            st.markdown("### ⚖️ Settlements")
-            if not debts_data:
-                st.info("No debts detected. You're all square!")
-                debts_df = pd.DataFrame(columns=["debtor", "creditor", "amount"])
-            else:
-                debts_df = pd.DataFrame(debts_data).sort_values(by="amount", ascending=False)
-                debts_df["amount"] = debts_df["amount"].astype(float)
-
-            st.markdown("**Suggested Settlements**")
-            if debts_df.empty:
-                st.caption("Add a reimbursement once new settlements appear.")
-            else:
-                settlements_table = debts_df.copy()
-                settlements_table["amount"] = settlements_table["amount"].map(_format_currency)
-                st.dataframe(
-                    settlements_table.rename(
-                        columns={"debtor": "Debtor", "creditor": "Creditor", "amount": "Amount"}
-                    ),
-                    use_container_width=True,
-                    hide_index=True,
-                )
-
-            st.divider()
-            with st.container(border=True):
-                st.markdown("#### Record a Reimbursement")
-                if debts_df.empty:
-                    st.info("No outstanding settlements available to reimburse.")
-                    st.session_state["_reset_reimbursement_state"] = True
-                else:
-                    debt_records = debts_df.to_dict("records")
-                    option_labels = [
-                        f"{record['debtor']} → {record['creditor']} ({_format_currency(record['amount'])})"
-                        for record in debt_records
-                    ]
-                    if not st.session_state["_show_reimbursement_form"]:
-                        if st.button("Record reimbursement", key="open_reimbursement"):
-                            st.session_state["_show_reimbursement_form"] = True
-                            st.session_state["_reimbursement_selection_idx"] = 0
-                            st.session_state["_reimbursement_note"] = ""
-                            st.session_state["_open_reimbursement_now"] = True
-                            _rerun_page()
-
-                    if st.session_state["_show_reimbursement_form"]:
-                        max_index = max(len(debt_records) - 1, 0)
-                        default_index = min(st.session_state["_reimbursement_selection_idx"], max_index)
-
-                        selected_index = st.selectbox(
-                            "Choose a settlement to reimburse",
-                            list(range(len(debt_records))),
-                            index=default_index,
-                            format_func=lambda idx: option_labels[idx],
-                        )
-                        st.session_state["_reimbursement_selection_idx"] = selected_index
-
-                        chosen_debt = debt_records[selected_index]
-                        amount_due = float(chosen_debt["amount"])
-                        st.info(
-                            f"{chosen_debt['debtor']} will reimburse {chosen_debt['creditor']} "
-                            f"{_format_currency(amount_due)}"
-                        )
-
-                        note_input = st.text_input(
-                            "Note (optional)",
-                            key="_reimbursement_note",
-                            placeholder="e.g., Bank transfer",
-                        )
-
-                        confirm_col, cancel_col = st.columns(2)
-                        if confirm_col.button(
-                            "Confirm reimbursement", type="primary", key="confirm_reimbursement"
-                        ):
-                            note_value = note_input.strip()
-                            payload = {
-                                "from_person": chosen_debt["debtor"],
-                                "to_person": chosen_debt["creditor"],
-                                "amount": amount_due,
-                                "note": note_value or None,
-                            }
-                            try:
-                                add_reimbursement(payload)
-                                st.session_state["_reimbursement_notice"] = (
-                                    "Reimbursement recorded. Debts updated."
-                                )
-                                st.session_state["_reset_reimbursement_state"] = True
-                                st.session_state["_active_expense_tab"] = "debt"
-                                _rerun_page()
-                            except Exception:
-                                st.error("Unable to record the reimbursement. Please retry in a moment.")
-
-                        if cancel_col.button("Cancel", key="cancel_reimbursement"):
-                            st.session_state["_reset_reimbursement_state"] = True
-                            st.session_state["_active_expense_tab"] = "debt"
-                            _rerun_page()
+        settlements_panel()
 
     st.divider()
 
-    if not expenses_df.empty:
-        st.markdown("### 📊 Visual Snapshot")
-        chart_cols = st.columns(2)
-
-        with chart_cols[0]:
-            with st.container(border=True):
-                payer_totals = (
-                    expenses_df.groupby("payer", dropna=True)["amount"].sum().reset_index()
-                )
-                if not payer_totals.empty:
-                    payer_totals["amount"] = payer_totals["amount"].astype(float)
-                    payer_base = alt.Chart(payer_totals)
-                    payer_bars = (
-                        payer_base.mark_bar(cornerRadiusTopRight=10, cornerRadiusBottomRight=10)
-                        .encode(
-                            y=alt.Y("payer:N", sort="-x", title=""),
-                            x=alt.X(
-                                "amount:Q",
-                                title="Total Paid ($)",
-                                axis=alt.Axis(format="$,.2f"),
-                            ),
-                            color=alt.value("#4F8EF7"),
-                            tooltip=[
-                                alt.Tooltip("payer:N", title="Payer"),
-                                alt.Tooltip("amount:Q", title="Total Paid", format="$,.2f"),
-                            ],
-                        )
-                        .properties(height=280, title="Contributions by Payer")
-                    )
-                    payer_text = (
-                        payer_base.mark_text(
-                            align="left",
-                            baseline="middle",
-                            dx=6,
-                            color="#1f2a44",
-                            fontWeight="bold",
-                        )
-                        .encode(
-                            y=alt.Y("payer:N", sort="-x"),
-                            x=alt.X("amount:Q"),
-                            text=alt.Text("amount:Q", format="$,.2f"),
-                        )
-                    )
-                    payer_chart = (payer_bars + payer_text).configure_axis(
-                        labelColor="#4a4a4a", titleColor="#4a4a4a"
-                    ).configure_view(strokeOpacity=0)
-                    st.altair_chart(payer_chart, use_container_width=True)
-                else:
-                    st.caption("Expenses by payer will appear here once recorded.")
+    expense_charts()
 
-        with chart_cols[1]:
-            with st.container(border=True):
-                if not debts_df.empty:
-                    debtor_totals = (
-                        debts_df.groupby("debtor", dropna=True)["amount"].sum().reset_index()
-                    )
-                    debtor_totals["amount"] = debtor_totals["amount"].astype(float)
-                    debtor_base = alt.Chart(debtor_totals)
-                    debtor_bars = (
-                        debtor_base.mark_bar(cornerRadiusTopRight=10, cornerRadiusBottomRight=10)
-                        .encode(
-                            y=alt.Y("debtor:N", sort="-x", title=""),
-                            x=alt.X(
-                                "amount:Q",
-                                title="Amount Owed ($)",
-                                axis=alt.Axis(format="$,.2f"),
-                            ),
-                            color=alt.value("#F76F6F"),
-                            tooltip=[
-                                alt.Tooltip("debtor:N", title="Debtor"),
-                                alt.Tooltip("amount:Q", title="Owes", format="$,.2f"),
-                            ],
-                        )
-                        .properties(height=280, title="Outstanding Debts by Debtor")
-                    )
-                    debtor_text = (
-                        debtor_base.mark_text(
-                            align="left",
-                            baseline="middle",
-                            dx=6,
-                            color="#401818",
-                            fontWeight="bold",
-                        )
-                        .encode(
-                            y=alt.Y("debtor:N", sort="-x"),
-                            x=alt.X("amount:Q"),
-                            text=alt.Text("amount:Q", format="$,.2f"),
-                        )
-                    )
-                    debtor_chart = (debtor_bars + debtor_text).configure_axis(
-                        labelColor="#4a4a4a", titleColor="#4a4a4a"
-                    ).configure_view(strokeOpacity=0)
-                    st.altair_chart(debtor_chart, use_container_width=True)
-                else:
-                    st.caption("Outstanding debts chart will populate when someone owes money.")
+    reimbursement_history()
 
-    if reimbursements_data:
-        with st.container(border=True):
-            st.markdown("### 🕰️ Reimbursement History")
-            history_df = pd.DataFrame(reimbursements_data)
-            if not history_df.empty:
-                history_df["Amount"] = history_df["amount"].apply(_format_currency)
-                history_df = history_df.rename(
-                    columns={
-                        "from_person": "From",
-                        "to_person": "To",
-                        "note": "Details",
-                    }
-                )
-                history_df["Details"] = history_df["Details"].fillna("")
-                display_history = history_df[["From", "To", "Amount", "Details"]]
-                st.dataframe(display_history, use_container_width=True, hide_index=True)
-    else:
-        st.caption("Record a reimbursement to see the history here.")
\ No newline at end of file
+render_perf_panel()
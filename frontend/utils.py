@@ -1,7 +1,24 @@
+import atexit
+import copy
+import json
 import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
 import requests
 import streamlit as st
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from urllib3.util.retry import Retry
 
 try:
     # Raised when no secrets file is present; makes imports crash under pytest.
@@ -26,8 +43,22 @@ def _resolve_api_url():
         return None
 
 
-# Allow configuring the backend URL via secrets or environment variables while staying test-friendly.
-API_URL = _resolve_api_url() or "http://localhost:8000"
+# "http" (default) calls the backend at API_URL over the network. "embedded" runs
+# the backend application inside this process (single-node deployments) and
+# serves every call in memory, with the same routes and auth checks.
+API_TRANSPORT = os.environ.get("API_TRANSPORT", "http").strip().lower()
+if API_TRANSPORT not in ("http", "embedded"):
+    raise ValueError(f"Unknown API_TRANSPORT {API_TRANSPORT!r}; expected 'http' or 'embedded'")
+
+if API_TRANSPORT == "embedded":
+    # The backend package lives next to the frontend directory.
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from backend.embedded import EMBEDDED_URL, EmbeddedAdapter
+
+    API_URL = EMBEDDED_URL
+else:
+    # Allow configuring the backend URL via secrets or environment variables while staying test-friendly.
+    API_URL = _resolve_api_url() or "http://localhost:8000"
 
 def _auth_headers(token: Optional[str] = None) -> Dict[str, str]:
     """Build authorization headers from the provided token or session state."""
@@ -35,10 +66,728 @@ def _auth_headers(token: Optional[str] = None) -> Dict[str, str]:
     return {"Authorization": f"Bearer {active_token}"} if active_token else {}
 
 
+# --- HTTP client ---
+# (connect, read) timeouts in seconds; a slow backend must never hang the script thread.
+API_TIMEOUT = (
+    float(os.environ.get("API_CONNECT_TIMEOUT", "3.05")),
+    float(os.environ.get("API_READ_TIMEOUT", "15")),
+)
+# Exports and imports of a whole house may legitimately take minutes.
+TRANSFER_READ_TIMEOUT = 300.0
+API_RETRIES = int(os.environ.get("API_RETRIES", "2"))
+RETRY_BACKOFF = 0.25
+# 409 detail the backend sends when a POST retry overtakes the first delivery (backend/idempotency.py).
+IDEMPOTENCY_IN_PROGRESS = "A request with this Idempotency-Key is still in progress"
+
+
+def _build_session() -> requests.Session:
+    """Create the pooled keep-alive session shared by every script run in this process.
+
+    Idempotent methods are retried by urllib3 on connection errors and 502/503/504
+    with jittered exponential backoff. POSTs are retried by `_post` instead, which
+    pins an `Idempotency-Key` so retries cannot duplicate writes.
+    """
+    retry = Retry(
+        total=API_RETRIES,
+        connect=API_RETRIES,
+        read=API_RETRIES,
+        status=API_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        backoff_jitter=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if API_TRANSPORT == "embedded":
+        embedded = EmbeddedAdapter()
+        session.mount(EMBEDDED_URL, embedded)
+        # No proxies in between: skip requests' per-call scan of the environment.
+        session.trust_env = False
+        # Run the backend's shutdown hook (jobs, database) when Streamlit exits.
+        atexit.register(embedded.close)
+    return session
+
+
+SESSION = _build_session()
+
+# Latency of recent API calls, newest last: {"method", "path", "status", "ms", "at"}.
+CALL_LOG: deque = deque(maxlen=1000)
+
+
+def _server_time_ms(response: requests.Response) -> Optional[float]:
+    """Read the backend's own `total` duration from `Server-Timing`, when it sends one."""
+    for metric in response.headers.get("server-timing", "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "total" and params.startswith("dur="):
+            try:
+                return float(params[4:])
+            except ValueError:
+                return None
+    return None
+
+
+def _record_call(method: str, url: str, status: Optional[int], elapsed: float, server_ms: Optional[float] = None) -> None:
+    call = {
+        "method": method,
+        "path": urlsplit(url).path,
+        "status": status,
+        "ms": round(elapsed * 1000, 2),
+        "at": time.time(),
+    }
+    if server_ms is not None:
+        call["server_ms"] = server_ms
+    CALL_LOG.append(call)
+    run = _current_perf_run()
+    if run is not None:
+        run.calls.append(call)
+
+
+def _request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the shared session with default timeouts, recording its latency."""
+    kwargs.setdefault("timeout", API_TIMEOUT)
+    status = None
+    server_ms = None
+    start = time.perf_counter()
+    try:
+        response = getattr(SESSION, method.lower())(url, **kwargs)
+        status = response.status_code
+        server_ms = _server_time_ms(response) if PERF_PANEL else None
+        return response
+    finally:
+        _record_call(method, url, status, time.perf_counter() - start, server_ms)
+        if method != "GET":
+            _forget_run_memo()
+
+
+# --- Per-run request coalescing ---
+MEMO_MAX_SESSIONS = 512
+# session id -> (marker of the script run, {request key: Future})
+_RUN_MEMOS: "OrderedDict[str, tuple]" = OrderedDict()
+_RUN_MEMO_LOCK = threading.Lock()
+# Totals since start: GETs that could be coalesced and those answered by an in-flight or earlier call.
+MEMO_STATS: Dict[str, int] = {"requests": 0, "saved": 0}
+
+
+def _run_memo() -> Optional[Dict[tuple, Future]]:
+    """Return the GET memo of the current script run, or None outside a Streamlit run.
+
+    Streamlit replaces `widget_ids_this_run` with a fresh set at the start of every
+    run (fragment reruns included), so that set identifies the run.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    marker = ctx.widget_ids_this_run
+    with _RUN_MEMO_LOCK:
+        current = _RUN_MEMOS.get(ctx.session_id)
+        if current is None or current[0] is not marker:
+            current = (marker, {})
+            _RUN_MEMOS[ctx.session_id] = current
+        _RUN_MEMOS.move_to_end(ctx.session_id)
+        while len(_RUN_MEMOS) > MEMO_MAX_SESSIONS:
+            _RUN_MEMOS.popitem(last=False)
+        return current[1]
+
+
+def _forget_run_memo() -> None:
+    """Drop the current run's memo so reads after a write see the new state."""
+    memo = _run_memo()
+    if memo is not None:
+        with _RUN_MEMO_LOCK:
+            memo.clear()
+
+
+def get_dedup_stats() -> Dict[str, int]:
+    """Return how many GETs went through the per-run memo and how many were saved."""
+    with _RUN_MEMO_LOCK:
+        return dict(MEMO_STATS)
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    return _request("GET", url, **kwargs)
+
+
+def _memo_get(url: str, **kwargs) -> requests.Response:
+    """GET through the per-run memo: identical requests in one script run share one call.
+
+    Only for page data reads; anything polled within a run (job status) must use `_get`.
+    """
+    memo = _run_memo()
+    if memo is None or kwargs.get("stream"):
+        return _request("GET", url, **kwargs)
+    key = (
+        url,
+        json.dumps(kwargs.get("params"), sort_keys=True, default=str),
+        (kwargs.get("headers") or {}).get("Authorization"),
+    )
+    with _RUN_MEMO_LOCK:
+        MEMO_STATS["requests"] += 1
+        future = memo.get(key)
+        owner = future is None
+        if owner:
+            future = memo[key] = Future()
+        else:
+            MEMO_STATS["saved"] += 1
+    if not owner:
+        return future.result()
+    try:
+        response = _request("GET", url, **kwargs)
+    except BaseException as exc:
+        with _RUN_MEMO_LOCK:
+            memo.pop(key, None)
+        future.set_exception(exc)
+        raise
+    future.set_result(response)
+    return response
+
+
+def _put(url: str, **kwargs) -> requests.Response:
+    return _request("PUT", url, **kwargs)
+
+
+def _patch(url: str, **kwargs) -> requests.Response:
+    return _request("PATCH", url, **kwargs)
+
+
+def _delete(url: str, **kwargs) -> requests.Response:
+    return _request("DELETE", url, **kwargs)
+
+
+def _in_progress(response: requests.Response) -> bool:
+    """Whether the backend rejected a retry because the first delivery is still running."""
+    if response.status_code != 409:
+        return False
+    try:
+        return response.json().get("detail") == IDEMPOTENCY_IN_PROGRESS
+    except (ValueError, AttributeError):
+        return False
+
+
+def _post(url: str, **kwargs) -> requests.Response:
+    """POST with a fresh `Idempotency-Key`, retrying connection errors, timeouts and in-progress 409s.
+
+    The backend answers retries from its stored response, so a write that
+    already went through is never applied twice; a retry arriving while the
+    first delivery still runs gets a 409 and is sent again after a backoff.
+    The backend stores nothing for `/auth/` routes, so those are sent once with
+    `_request` instead.
+    """
+    headers = {**kwargs.pop("headers", {}), "Idempotency-Key": uuid.uuid4().hex}
+    for attempt in range(API_RETRIES + 1):
+        try:
+            response = _request("POST", url, headers=headers, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == API_RETRIES:
+                raise
+        else:
+            if attempt == API_RETRIES or not _in_progress(response):
+                return response
+        time.sleep(RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, RETRY_BACKOFF))
+
+
+def get_call_stats() -> List[Dict[str, Any]]:
+    """Summarize recent API call latency per endpoint.
+
+    Returns:
+        list: One dict per `(method, path)` with `calls`, `errors`, `avg_ms`, `p95_ms` and `max_ms`.
+    """
+    grouped: Dict[tuple, List[Dict[str, Any]]] = {}
+    for call in list(CALL_LOG):
+        grouped.setdefault((call["method"], call["path"]), []).append(call)
+    stats = []
+    for (method, path), calls in sorted(grouped.items()):
+        durations = sorted(call["ms"] for call in calls)
+        stats.append({
+            "method": method,
+            "path": path,
+            "calls": len(calls),
+            "errors": sum(1 for call in calls if call["status"] is None or call["status"] >= 400),
+            "avg_ms": round(sum(durations) / len(durations), 2),
+            "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+            "max_ms": durations[-1],
+        })
+    return stats
+
+
+# --- Performance instrumentation ---
+# Set PERF_PANEL=1 to show per-run timings in the sidebar and append them to PERF_LOG_PATH.
+PERF_PANEL = os.environ.get("PERF_PANEL", "0") == "1"
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH", "flatmates_perf.jsonl")
+_PERF_RUNS: Dict[str, "PerfRun"] = {}
+_PERF_LOG_LOCK = threading.Lock()
+
+
+class PerfRun:
+    """Timings of one script run of a page: API calls and total script time."""
+
+    def __init__(self, session_id: str, marker: Any, page: str, rerun: int):
+        self.session_id = session_id
+        self.marker = marker
+        self.page = page
+        self.rerun = rerun
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.calls: List[Dict[str, Any]] = []
+        # Page-specific measurements recorded with `perf_metric`.
+        self.metrics: Dict[str, Any] = {}
+        self.panel = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Close the run and return it as a JSON-serializable record."""
+        script_ms = (time.perf_counter() - self._start) * 1000
+        api_ms = sum(call["ms"] for call in self.calls)
+        server_ms = [call["server_ms"] for call in self.calls if "server_ms" in call]
+        return {
+            "at": self.started_at,
+            "session": self.session_id,
+            "page": self.page,
+            "rerun": self.rerun,
+            "script_ms": round(script_ms, 2),
+            "api_calls": len(self.calls),
+            "api_ms": round(api_ms, 2),
+            # Calls made by fetch_all overlap, so api_ms may exceed the wall time they took.
+            "server_ms": round(sum(server_ms), 2) if server_ms else None,
+            "metrics": self.metrics,
+            "calls": self.calls,
+        }
+
+
+def _current_perf_run() -> Optional[PerfRun]:
+    if not PERF_PANEL:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    run = _PERF_RUNS.get(ctx.session_id)
+    # Fragment reruns get a new marker (see `_run_memo`) and are not attributed to the page run.
+    return run if run is not None and run.marker is ctx.widget_ids_this_run else None
+
+
+def perf_metric(name: str, value: Any) -> None:
+    """Attach a measurement to the current run's performance record (no-op when disabled)."""
+    run = _current_perf_run()
+    if run is not None:
+        run.metrics[name] = value
+
+
+def _start_perf_run(page: str) -> None:
+    """Start timing the current script run of `page` (called by `render_sidebar`)."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if not PERF_PANEL or ctx is None:
+        return
+    reruns = st.session_state.setdefault("_perf_reruns", {})
+    reruns[page] = reruns.get(page, 0) + 1
+    run = PerfRun(ctx.session_id, ctx.widget_ids_this_run, page, reruns[page])
+    run.panel = st.sidebar.container()
+    _PERF_RUNS[ctx.session_id] = run
+
+
+def _write_perf_log(record: Dict[str, Any]) -> None:
+    try:
+        with _PERF_LOG_LOCK, open(PERF_LOG_PATH, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
+
+
+def render_perf_panel() -> None:
+    """Finish the current run's timings, log them and show them in the sidebar.
+
+    Call at the very end of a page so the script time covers all rendering.
+    Does nothing unless `PERF_PANEL` is enabled.
+    """
+    run = _current_perf_run()
+    if run is None:
+        return
+    _PERF_RUNS.pop(run.session_id, None)
+    record = run.summary()
+    _write_perf_log(record)
+    with run.panel:
+        with st.expander("⏱️ Performance", expanded=False):
+            st.caption(f"{record['page']} · run #{record['rerun']} in this session")
+            st.markdown(f"**Script run:** {record['script_ms']:.0f} ms")
+            st.markdown(f"**API calls:** {record['api_calls']} ({record['api_ms']:.0f} ms)")
+            if record["server_ms"] is not None:
+                st.markdown(f"**Backend time:** {record['server_ms']:.0f} ms")
+            dedup = get_dedup_stats()
+            st.markdown(f"**Coalesced GETs (all sessions):** {dedup['saved']} of {dedup['requests']}")
+            for name, value in record["metrics"].items():
+                st.markdown(f"**{name}:** {value}")
+            if run.calls:
+                st.dataframe(
+                    [{key: call.get(key) for key in ("method", "path", "status", "ms", "server_ms")} for call in run.calls],
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+
+# --- Concurrent fetches ---
+# Seconds `fetch_all` waits before falling back to defaults for unfinished calls.
+FETCH_DEADLINE = float(os.environ.get("FETCH_DEADLINE", "10"))
+FETCH_WORKERS = 8
+_FETCH_POOL = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="flatmates-fetch")
+
+
+def _run_in_script_context(ctx, fetch: Callable[[], Any]):
+    # Pool threads need the session's script context to read st.session_state.
+    thread = threading.current_thread()
+    add_script_run_ctx(thread, ctx)
+    try:
+        return fetch()
+    finally:
+        # Do not keep the finished session's context alive on a shared worker.
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+
+def fetch_all(
+    fetches: Dict[str, Callable[[], Any]],
+    defaults: Optional[Dict[str, Any]] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Run independent page fetches concurrently on a shared thread pool.
+
+    Page latency becomes that of the slowest call instead of the sum of all of them.
+
+    Args:
+        fetches (dict): Name -> zero-argument callable, e.g. `{"events": get_events}`.
+        defaults (dict, optional): Name -> value used when that call fails or misses the deadline.
+        deadline (float, optional): Seconds to wait for all calls; `FETCH_DEADLINE` by default.
+
+    Returns:
+        dict: Name -> result, with the default (or None) for failed or unfinished calls.
+    """
+    defaults = defaults or {}
+    ctx = get_script_run_ctx(suppress_warning=True)
+    futures = {
+        name: _FETCH_POOL.submit(_run_in_script_context, ctx, fetch)
+        for name, fetch in fetches.items()
+    }
+    wait(futures.values(), timeout=FETCH_DEADLINE if deadline is None else deadline)
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=0) if future.done() else defaults.get(name)
+        except Exception:
+            results[name] = defaults.get(name)
+    return results
+
+
+# --- Response cache ---
+# Set API_CACHE=0 to always refetch lists.
+API_CACHE = os.environ.get("API_CACHE", "1") != "0"
+# A `/house/versions` answer is trusted for this many seconds, so one rerun validates once.
+CACHE_REVALIDATE_SECONDS = float(os.environ.get("CACHE_REVALIDATE_SECONDS", "1"))
+CACHE_MAX_TOKENS = 256
+# Change topics reported by the backend, one per kind of house data.
+HOUSE_TOPICS = ("house", "events", "shopping", "expenses", "reimbursements")
+SEARCH_TOPICS = ("events", "shopping", "expenses", "reimbursements")
+
+
+class ResponseCache:
+    """Per-token cache of list responses, revalidated against the backend's topic versions.
+
+    Each entry remembers the versions of the topics it depends on; it is served
+    until `GET /house/versions` reports one of them changed or a local mutation
+    drops it. Entries are shared by every session using the same token.
+    """
+
+    def __init__(self, max_tokens: int = CACHE_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self._entries: "OrderedDict[str, Dict[str, tuple]]" = OrderedDict()
+        self._versions: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, token: str) -> Optional[Dict[str, int]]:
+        """Return the house's topic versions, asking the backend at most once per revalidation window."""
+        with self._lock:
+            checked = self._versions.get(token)
+        if checked and time.monotonic() - checked[0] < CACHE_REVALIDATE_SECONDS:
+            return checked[1]
+        try:
+            response = _memo_get(f"{API_URL}/house/versions", headers=_auth_headers(token))
+            versions = response.json() if response.status_code == 200 else None
+        except Exception:
+            versions = None
+        if not isinstance(versions, dict):
+            return None
+        with self._lock:
+            self._versions[token] = (time.monotonic(), versions)
+        return versions
+
+    def stamp(self, token: str, key: str) -> Optional[tuple]:
+        """Return the topic versions the cached `key` response was stored at, if cached."""
+        with self._lock:
+            entry = self._entries.get(token, {}).get(key)
+        return entry[0] if entry else None
+
+    def get(self, token: str, key: str, stamp: tuple):
+        with self._lock:
+            entries = self._entries.get(token)
+            if entries is None:
+                return None
+            self._entries.move_to_end(token)
+            entry = entries.get(key)
+        if entry is None or entry[0] != stamp:
+            return None
+        return copy.deepcopy(entry[2])
+
+    def put(self, token: str, key: str, stamp: tuple, topics: tuple, data) -> None:
+        with self._lock:
+            self._entries.setdefault(token, {})[key] = (stamp, topics, copy.deepcopy(data))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_tokens:
+                evicted, _ = self._entries.popitem(last=False)
+                self._versions.pop(evicted, None)
+
+    def invalidate(self, token: str, topics) -> None:
+        """Drop the token's entries depending on any of `topics` and force a revalidation."""
+        topics = set(topics)
+        with self._lock:
+            self._versions.pop(token, None)
+            entries = self._entries.get(token, {})
+            for key in [key for key, entry in entries.items() if topics & set(entry[1])]:
+                del entries[key]
+
+    def revalidate(self, token: str) -> None:
+        """Forget the token's version snapshot so the next read asks the backend again."""
+        with self._lock:
+            self._versions.pop(token, None)
+
+    def patch(self, token: str, topic: str, key: str, update: Callable[[Any], Any]) -> None:
+        """Apply a confirmed local write to the cached `key` list without refetching it.
+
+        The entry is stamped as if `topic` had moved by exactly one version, which is
+        what our own write does on the backend: if nobody else wrote meanwhile the
+        next revalidation keeps the patched list, otherwise it is refetched. Other
+        entries depending on `topic` (e.g. debts for expenses) are dropped.
+        """
+        with self._lock:
+            entries = self._entries.get(token, {})
+            for cached_key, (stamp, topics, data) in list(entries.items()):
+                if topic not in topics:
+                    continue
+                if cached_key == key:
+                    bumped = tuple(version + 1 if name == topic else version for name, version in zip(topics, stamp))
+                    entries[cached_key] = (bumped, topics, update(data))
+                else:
+                    del entries[cached_key]
+            checked = self._versions.get(token)
+            if checked:
+                self._versions[token] = (checked[0], {**checked[1], topic: checked[1].get(topic, 0) + 1})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def _cached_get(path: str, topics: tuple, default):
+    """GET `path` as JSON, served from `RESPONSE_CACHE` while `topics` are unchanged.
+
+    Args:
+        path (str): API path, e.g. `/calendar/`.
+        topics (tuple): Change topics the response depends on.
+        default: Value returned when the request fails.
+    """
+    token = st.session_state.get("auth_token")
+    versions = RESPONSE_CACHE.versions(token) if API_CACHE and token else None
+    stamp = tuple(versions.get(topic, 0) for topic in topics) if versions is not None else None
+    if stamp is not None:
+        cached = RESPONSE_CACHE.get(token, path, stamp)
+        if cached is not None:
+            return cached
+    try:
+        response = _memo_get(f"{API_URL}{path}", headers=_auth_headers())
+        if response.status_code != 200:
+            return default
+        data = response.json()
+    except Exception:
+        return default
+    if stamp is not None:
+        RESPONSE_CACHE.put(token, path, stamp, topics, data)
+    return data
+
+
+def _apply_local(topic: str, key: str, update: Callable[[Any], Any]) -> None:
+    """Patch the cached `key` list after a successful write (see `ResponseCache.patch`)."""
+    token = st.session_state.get("auth_token")
+    if token:
+        RESPONSE_CACHE.patch(token, topic, key, update)
+    invalidate_live(topic)
+
+
+def invalidate_cache(*topics: str) -> None:
+    """Drop cached responses depending on `topics` after a local mutation."""
+    token = st.session_state.get("auth_token")
+    if token:
+        RESPONSE_CACHE.invalidate(token, topics)
+    invalidate_live(*topics)
+
+
+# Live updates: set LIVE_UPDATES=0 to disable the backend change feed.
+LIVE_UPDATES = os.environ.get("LIVE_UPDATES", "1") != "0"
+LIVE_REFRESH_INTERVAL = float(os.environ.get("LIVE_REFRESH_INTERVAL", "2"))
+# Safety-net refresh for live panels, in case a change event was missed.
+LIVE_FALLBACK_INTERVAL = float(os.environ.get("LIVE_FALLBACK_INTERVAL", "60"))
+# A feed nobody has looked at for this long disconnects and exits.
+LIVE_FEED_IDLE_SECONDS = 600
+
+
+class ChangeFeed(threading.Thread):
+    """Background listener on `/house/changes` for one auth token.
+
+    Keeps a per-topic version counter that pages compare against to decide
+    whether their data is stale. Shared by every session using the same token.
+    """
+
+    def __init__(self, token: str):
+        super().__init__(daemon=True, name="flatmates-change-feed")
+        self.token = token
+        self.versions: Dict[str, int] = {}
+        self.connected = False
+        self.last_access = time.monotonic()
+
+    def snapshot(self, topics) -> tuple:
+        """Return the current versions of `topics`, marking the feed as in use."""
+        self.last_access = time.monotonic()
+        return tuple(self.versions.get(topic, 0) for topic in topics)
+
+    def apply(self, data: str) -> None:
+        """Record a `change` event payload received from the backend."""
+        try:
+            topics = json.loads(data).get("topics", [])
+        except (json.JSONDecodeError, AttributeError):
+            return
+        for topic in topics:
+            self.versions[topic] = self.versions.get(topic, 0) + 1
+
+    def idle(self) -> bool:
+        return time.monotonic() - self.last_access > LIVE_FEED_IDLE_SECONDS
+
+    def run(self) -> None:
+        delay = 1.0
+        while not self.idle():
+            try:
+                with SESSION.get(
+                    f"{API_URL}/house/changes",
+                    headers=_auth_headers(self.token),
+                    stream=True,
+                    timeout=(5, 60),
+                ) as resp:
+                    if resp.status_code in (401, 403):
+                        break
+                    if resp.status_code != 200:
+                        raise requests.RequestException(f"status {resp.status_code}")
+                    self.connected = True
+                    delay = 1.0
+                    for line in resp.iter_lines(decode_unicode=True):
+                        if line and line.startswith("data:"):
+                            self.apply(line[5:].strip())
+                        if self.idle():
+                            break
+            except Exception:
+                pass
+            # Anything may have changed while disconnected: invalidate every topic.
+            if self.connected:
+                self.connected = False
+                for topic in list(self.versions) or HOUSE_TOPICS:
+                    self.versions[topic] = self.versions.get(topic, 0) + 1
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+        _FEEDS.pop(self.token, None)
+
+
+_FEEDS: Dict[str, ChangeFeed] = {}
+_FEEDS_LOCK = threading.Lock()
+
+
+def watch_house_changes(token: Optional[str] = None) -> Optional[ChangeFeed]:
+    """Return the running change feed for the token, starting it if needed."""
+    active_token = token or st.session_state.get("auth_token")
+    if not LIVE_UPDATES or not active_token:
+        return None
+    with _FEEDS_LOCK:
+        feed = _FEEDS.get(active_token)
+        if feed is None or not feed.is_alive():
+            feed = ChangeFeed(active_token)
+            _FEEDS[active_token] = feed
+            feed.start()
+    return feed
+
+
+def live_data(topic: str, fetch, key: Optional[str] = None):
+    """Return `fetch()`, reusing the previous result until the change feed reports `topic` changed.
+
+    Falls back to calling `fetch()` every time while the feed is disconnected.
+    """
+    feed = watch_house_changes()
+    cache_key = f"_live_{key or topic}"
+    if feed is not None and feed.connected:
+        version = feed.snapshot((topic,))
+        cached = st.session_state.get(cache_key)
+        if cached and cached[0] == version:
+            return cached[1]
+        # The feed saw a change the response cache may not have revalidated yet.
+        RESPONSE_CACHE.revalidate(feed.token)
+        data = fetch()
+        st.session_state[cache_key] = (version, data)
+        return data
+    st.session_state.pop(cache_key, None)
+    return fetch()
+
+
+def invalidate_live(*topics: str) -> None:
+    """Drop `live_data` results for `topics` after a local mutation."""
+    for topic in topics:
+        st.session_state.pop(f"_live_{topic}", None)
+
+
+def rerun_fragment() -> None:
+    """Rerun only the current fragment, falling back to a full rerun outside fragment reruns.
+
+    Streamlit rejects `scope="fragment"` while a fragment executes as part of a full run.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    st.rerun(scope="fragment" if ctx is not None and ctx.fragment_ids_this_run else "app")
+
+
+def watch_changes(*topics: str, hold: Optional[Callable[[], bool]] = None) -> None:
+    """Rerun the page as soon as the change feed reports updates to any of `topics`.
+
+    Args:
+        topics: Change topics to watch.
+        hold (callable, optional): Returns True while the page has unsaved input
+            a rerun would discard; changes are then announced instead.
+    """
+    feed = watch_house_changes()
+    if feed is None:
+        return
+    baseline = feed.snapshot(topics)
+
+    @st.fragment(run_every=LIVE_REFRESH_INTERVAL)
+    def _watch():
+        if feed.snapshot(topics) == baseline:
+            return
+        if hold is not None and hold():
+            st.info("A flatmate made changes. Save or discard your edits to see them.", icon="🔄")
+        else:
+            st.rerun()
+
+    _watch()
+
+
 def register_user(username: str, password: str, house_name: Optional[str] = None, house_code: Optional[str] = None) -> Optional[Dict[str, Any]]:
     payload = {"username": username, "password": password, "house_name": house_name, "house_code": house_code}
     try:
-        resp = requests.post(f"{API_URL}/auth/register", json=payload)
+        # Sent once: a retry after a lost response would fail with "Username already exists".
+        resp = _request("POST", f"{API_URL}/auth/register", json=payload)
         if resp.status_code == 200:
             return resp.json()
     except Exception:
@@ -49,7 +798,7 @@ def register_user(username: str, password: str, house_name: Optional[str] = None
 def login_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     payload = {"username": username, "password": password}
     try:
-        resp = requests.post(f"{API_URL}/auth/login", json=payload)
+        resp = _request("POST", f"{API_URL}/auth/login", json=payload)
         if resp.status_code == 200:
             return resp.json()
     except Exception:
@@ -59,7 +808,7 @@ def login_user(username: str, password: str) -> Optional[Dict[str, Any]]:
 
 def fetch_profile(token: Optional[str] = None) -> Optional[Dict[str, Any]]:
     try:
-        resp = requests.get(f"{API_URL}/auth/me", headers=_auth_headers(token))
+        resp = _memo_get(f"{API_URL}/auth/me", headers=_auth_headers(token))
         if resp.status_code == 200:
             return resp.json()
     except Exception:
@@ -129,6 +878,10 @@ def render_sidebar():
         
         # Display version
         st.markdown(f"**Version:** {app_version}")
+
+    # Pages are executed as scripts, so the caller's __file__ names the page.
+    page_file = sys._getframe(1).f_globals.get("__file__") or "app.py"
+    _start_perf_run(os.path.splitext(os.path.basename(page_file))[0])
         
     # Hide default navigation
     st.markdown("""
@@ -139,19 +892,193 @@ def render_sidebar():
         </style>
     """, unsafe_allow_html=True)
 
-def get_events():
-    """Fetch calendar events from the backend.
+# Calendar colors, assigned to flatmates in house order.
+CALENDAR_COLORS = ("#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEEAD")
+DEFAULT_EVENT_COLOR = "#3788d8"
+
+
+def event_key(event):
+    """Return the string id FullCalendar uses for `event`.
+
+    Occurrences of a recurring event share the series id, so they are told
+    apart by their date: `"<series id>:<YYYY-MM-DD>"`.
+
+    Args:
+        event (dict): Event as returned by `get_events`.
+
+    Returns:
+        str: Unique id within one `get_events` result.
+    """
+    if event.get("recurrence") and event.get("occurrence"):
+        return f"{event['id']}:{event['occurrence']}"
+    return str(event["id"])
+
+
+def build_calendar_events(events, users):
+    """Convert backend events into compact FullCalendar event dicts.
+
+    Only what the calendar draws is shipped to the browser; views needing more
+    look the event up by id (see `calendar_view`).
+
+    Args:
+        events (list): Events as returned by `get_events`.
+        users (list): House members, whose order decides their color.
+
+    Returns:
+        list: FullCalendar events with `id`, `title`, `start`, optional `end` and `color`.
+    """
+    colors = {user: CALENDAR_COLORS[idx % len(CALENDAR_COLORS)] for idx, user in enumerate(users)}
+    calendar_events = []
+    for event in events:
+        assignees = event.get("assigned_to") or []
+        if isinstance(assignees, str):
+            assignees = [assignees]
+        start = f"{event['date']}T{event['start_time']}" if event.get("start_time") else event["date"]
+        item = {
+            "id": event_key(event),
+            "title": f"{event['title']} ({', '.join(assignees) if assignees else 'Everyone'})",
+            "start": start,
+            "color": colors.get(assignees[0], DEFAULT_EVENT_COLOR) if assignees else DEFAULT_EVENT_COLOR,
+        }
+        if event.get("end_time"):
+            item["end"] = f"{event['date']}T{event['end_time']}"
+        calendar_events.append(item)
+    return calendar_events
+
+
+def calendar_view(events, users, start=None, end=None):
+    """Return the FullCalendar payload and an id -> event index for `events`.
+
+    The result is memoized per session on the version the events were cached at,
+    so reruns with unchanged events skip the transform. Transform time and payload
+    size are reported to the performance panel.
+
+    Args:
+        events (list): Events as returned by `get_events(start, end)`.
+        users (list): House members.
+        start (date, optional): First day `events` were fetched for.
+        end (date, optional): Last day `events` were fetched for.
+
+    Returns:
+        tuple: `(calendar_events, events_by_id)`, with string ids as keys.
+    """
+    token = st.session_state.get("auth_token")
+    path = _events_path(start, end)
+    stamp = RESPONSE_CACHE.stamp(token, path) if token else None
+    key = (path, stamp, tuple(users), len(events))
+    memo = st.session_state.get("_calendar_view")
+    if stamp is not None and memo and memo[0] == key:
+        perf_metric("calendar transform", "memoized")
+        return memo[1], memo[2]
+    start = time.perf_counter()
+    calendar_events = build_calendar_events(events, users)
+    events_by_id = {event_key(event): event for event in events}
+    perf_metric("calendar transform", f"{(time.perf_counter() - start) * 1000:.2f} ms")
+    if PERF_PANEL:
+        perf_metric("calendar payload", f"{len(json.dumps(calendar_events)):,} bytes")
+    st.session_state["_calendar_view"] = (key, calendar_events, events_by_id)
+    return calendar_events, events_by_id
+
+
+# Whole months of events the calendar loads before and after the month in focus.
+CALENDAR_MONTHS_BEFORE = 1
+CALENDAR_MONTHS_AFTER = 3
+
+
+def _month_start(day: date, months: int) -> date:
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def calendar_window(focus: date) -> Tuple[date, date]:
+    """Return the first and last day of the events to load for a calendar focused on `focus`.
+
+    The window covers whole months, so moving the focus within a month reuses
+    the cached response.
+    """
+    start = _month_start(focus, -CALENDAR_MONTHS_BEFORE)
+    end = _month_start(focus, CALENDAR_MONTHS_AFTER + 1) - timedelta(days=1)
+    return start, end
+
+
+def _events_path(start=None, end=None) -> str:
+    params = {name: day.isoformat() for name, day in (("start", start), ("end", end)) if day}
+    return f"/calendar/?{urlencode(params)}" if params else "/calendar/"
+
+
+def get_events(start=None, end=None):
+    """Fetch calendar events from the backend, with recurring ones expanded.
+
+    Args:
+        start (date, optional): First day to include.
+        end (date, optional): Last day to include. Without bounds the server
+            expands recurring events up to a year ahead.
 
     Returns:
         list: List of event dictionaries, empty on failure.
     """
-    try:
-        response = requests.get(f"{API_URL}/calendar/", headers=_auth_headers())
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return []
-    return []
+    return _cached_get(_events_path(start, end), ("events",), [])
+
+def get_upcoming_events(limit=5, assignee=None):
+    """Fetch the next events from today onwards.
+
+    Args:
+        limit (int): Maximum number of events.
+        assignee (str, optional): Only events assigned to this flatmate.
+
+    Returns:
+        list: Events in chronological order, empty on error.
+    """
+    # The client's date goes into the URL so cached answers expire at midnight.
+    params = {"start": date.today().isoformat(), "limit": limit}
+    if assignee:
+        params["assignee"] = assignee
+    return _cached_get(f"/calendar/upcoming?{urlencode(params)}", ("events",), [])
+
+def get_availability(start, end, people, min_minutes=30):
+    """Fetch the conflicts and shared free slots of some flatmates.
+
+    Args:
+        start (date): First day of the window.
+        end (date): Last day of the window, inclusive.
+        people (list): Flatmates to consider; empty means the whole house.
+        min_minutes (int): Shortest free slot to report.
+
+    Returns:
+        dict: `conflicts` and `free_slots` lists, empty on error.
+    """
+    params = [("start", start.isoformat()), ("end", end.isoformat()), ("min_minutes", min_minutes)]
+    params += [("people", person) for person in people]
+    default = {"people": people, "conflicts": [], "free_slots": []}
+    return _cached_get(f"/calendar/availability?{urlencode(params)}", ("events",), default)
+
+def get_day_events(day):
+    """Fetch the events scheduled on one day.
+
+    Args:
+        day (date): Day to list.
+
+    Returns:
+        list: Events of that day, empty on error.
+    """
+    return _cached_get(f"/calendar/day/{day.isoformat()}", ("events",), [])
+
+def search_house(query, domains=(), limit=20):
+    """Full-text search across events, shopping items, expenses and reimbursement notes.
+
+    Args:
+        query (str): Words to look for; the last one may be incomplete.
+        domains (iterable): Restrict to these domains (`events`, `shopping`, `expenses`,
+            `reimbursements`); all of them when empty.
+        limit (int): Maximum number of hits.
+
+    Returns:
+        list: Hits (`domain`, `id`, `title`, `snippet`, `score`), best first, with matched
+        words in `<mark>` tags and the rest HTML-escaped; empty on error.
+    """
+    params = [("q", query), ("limit", limit), *(("domains", domain) for domain in domains)]
+    results = _cached_get(f"/search/?{urlencode(params)}", SEARCH_TOPICS, {"hits": []})
+    return results.get("hits", [])
 
 def create_event(event_data):
     """Post a new event to the API.
@@ -159,7 +1086,8 @@ def create_event(event_data):
     Args:
         event_data (dict): Event payload matching backend schema.
     """
-    requests.post(f"{API_URL}/calendar/", json=event_data, headers=_auth_headers())
+    _post(f"{API_URL}/calendar/", json=event_data, headers=_auth_headers())
+    invalidate_cache("events")
 
 def update_event(event_id, event_data):
     """Update an existing event by ID.
@@ -168,7 +1096,70 @@ def update_event(event_id, event_data):
         event_id (int): Target event identifier.
         event_data (dict): Updated event payload.
     """
-    requests.put(f"{API_URL}/calendar/{event_id}", json=event_data, headers=_auth_headers())
+    _put(f"{API_URL}/calendar/{event_id}", json=event_data, headers=_auth_headers())
+    invalidate_cache("events")
+
+class EditConflict(Exception):
+    """A flatmate changed the record after it was loaded, so the edit was not applied."""
+
+
+def patch_event(event_id, changes, version=None):
+    """Change some fields of an event, only if nobody changed it since it was loaded.
+
+    Args:
+        event_id (int): Target event identifier.
+        changes (dict): Fields to change; the others keep their stored value.
+        version (int, optional): The event's `version` when it was loaded.
+
+    Returns:
+        dict | None: The event after the change, or None if it was not saved
+        (missing event, invalid change or network error).
+
+    Raises:
+        EditConflict: If the event is no longer at `version`.
+    """
+    try:
+        response = _patch(f"{API_URL}/calendar/{event_id}", json={**changes, "version": version}, headers=_auth_headers())
+    except requests.RequestException:
+        response = None
+    invalidate_cache("events")
+    if response is None:
+        return None
+    if response.status_code == 409:
+        raise EditConflict("The event was changed by a flatmate")
+    return response.json() if 200 <= response.status_code < 300 else None
+
+def update_occurrence(series_id, occurrence, event_data):
+    """Edit one occurrence of a recurring event, leaving the rest of the series as is.
+
+    Args:
+        series_id (int): Recurring event identifier.
+        occurrence (str): Original ISO date of the occurrence.
+        event_data (dict): Updated event payload for that occurrence.
+
+    Returns:
+        dict | None: The stored occurrence, or None if it was not saved.
+    """
+    try:
+        response = _put(
+            f"{API_URL}/calendar/{series_id}/occurrences/{occurrence}", json=event_data, headers=_auth_headers()
+        )
+    except requests.RequestException:
+        response = None
+    invalidate_cache("events")
+    if response is not None and 200 <= response.status_code < 300:
+        return response.json()
+    return None
+
+def cancel_occurrence(series_id, occurrence):
+    """Skip one occurrence of a recurring event.
+
+    Args:
+        series_id (int): Recurring event identifier.
+        occurrence (str): Original ISO date of the occurrence.
+    """
+    _delete(f"{API_URL}/calendar/{series_id}/occurrences/{occurrence}", headers=_auth_headers())
+    invalidate_cache("events")
 
 def get_shopping_list():
     """Fetch the shopping list from the backend.
@@ -176,29 +1167,110 @@ def get_shopping_list():
     Returns:
         list: Shopping items or empty list on error.
     """
-    try:
-        response = requests.get(f"{API_URL}/shopping/", headers=_auth_headers())
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return []
-    return []
+    return _cached_get("/shopping/", ("shopping",), [])
 
 def add_shopping_item(item_data):
-    """Create a shopping item via the API.
+    """Create a shopping item via the API and add it to the cached list.
 
     Args:
         item_data (dict): Item fields required by the backend.
+
+    Returns:
+        dict | None: Stored item with its ID, or None on failure.
     """
-    requests.post(f"{API_URL}/shopping/", json=item_data, headers=_auth_headers())
+    try:
+        response = _post(f"{API_URL}/shopping/", json=item_data, headers=_auth_headers())
+        if response.status_code == 200:
+            item = response.json()
+            _apply_local("shopping", "/shopping/", lambda items: items + [item])
+            return item
+    except Exception:
+        pass
+    invalidate_cache("shopping")
+    return None
 
 def remove_shopping_item(item_id):
-    """Remove a shopping item by ID.
+    """Remove a shopping item by ID, dropping it from the cached list right away.
+
+    The local removal is rolled back (the list is refetched) if the backend
+    does not confirm the delete.
 
     Args:
         item_id (int): Identifier of the item to delete.
+
+    Returns:
+        bool: True if the backend removed the item.
+    """
+    _apply_local("shopping", "/shopping/", lambda items: [item for item in items if item.get("id") != item_id])
+    try:
+        response = _delete(f"{API_URL}/shopping/{item_id}", headers=_auth_headers())
+        if response.status_code == 200:
+            return True
+    except Exception:
+        pass
+    invalidate_cache("shopping")
+    return False
+
+def diff_shopping_list(items, edited):
+    """Compare the shopping list with the rows of the bulk-edit grid.
+
+    Args:
+        items (list): Items as fetched from the backend.
+        edited (list): Grid rows with `id`, `quantity`, `purchased` and `remove`,
+            as plain Python values.
+
+    Returns:
+        dict: Batch payload with the changed fields per item (`update`), the
+        IDs to delete (`delete`) and the versions those items were read at
+        (`versions`); all empty when nothing changed.
     """
-    requests.delete(f"{API_URL}/shopping/{item_id}", headers=_auth_headers())
+    original = {item["id"]: item for item in items}
+    batch = {"update": [], "delete": [], "versions": {}}
+    for row in edited:
+        item = original.get(row["id"])
+        if item is None:
+            continue
+        if row.get("remove"):
+            batch["delete"].append(item["id"])
+        else:
+            change = {}
+            # A cleared quantity cell comes back as None and keeps the stored value.
+            if row.get("quantity") is not None and int(row["quantity"]) != item.get("quantity"):
+                change["quantity"] = int(row["quantity"])
+            if row.get("purchased") is not None and bool(row["purchased"]) != bool(item.get("purchased")):
+                change["purchased"] = bool(row["purchased"])
+            if not change:
+                continue
+            batch["update"].append({"id": item["id"], **change})
+        if item.get("version") is not None:
+            batch["versions"][str(item["id"])] = item["version"]
+    return batch
+
+def apply_shopping_changes(batch):
+    """Send the grid's edits as one batch and cache the resulting list.
+
+    Args:
+        batch (dict): Payload built by `diff_shopping_list`.
+
+    Returns:
+        bool: True if the backend applied the batch.
+
+    Raises:
+        EditConflict: If a flatmate changed one of the items since they were
+            read; nothing was applied.
+    """
+    try:
+        response = _post(f"{API_URL}/shopping/batch", json=batch, headers=_auth_headers())
+    except requests.RequestException:
+        response = None
+    if response is not None and response.status_code == 200:
+        items = response.json()
+        _apply_local("shopping", "/shopping/", lambda _: items)
+        return True
+    invalidate_cache("shopping")
+    if response is not None and response.status_code == 409:
+        raise EditConflict("The shopping list was changed by a flatmate")
+    return False
 
 def get_expenses():
     """Fetch all expenses.
@@ -206,21 +1278,52 @@ def get_expenses():
     Returns:
         list: Expense records or empty list on error.
     """
-    try:
-        response = requests.get(f"{API_URL}/expenses/", headers=_auth_headers())
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return []
-    return []
+    return _cached_get("/expenses/", ("expenses",), [])
+
+def _page_params(offset: int, limit: int, sort: str, descending: bool, **filters) -> str:
+    """Encode paging, sorting and the non-empty `filters` as a query string."""
+    params = {"offset": offset, "limit": limit, "sort": sort, "order": "desc" if descending else "asc"}
+    params.update({name: value for name, value in filters.items() if value})
+    return urlencode(params)
+
+def get_expenses_page(offset=0, limit=20, sort="id", descending=True, search=None, person=None):
+    """Fetch one server-sorted page of expenses.
+
+    Args:
+        offset (int): Number of matching expenses to skip.
+        limit (int): Page size.
+        sort (str): `id`, `title`, `amount` or `payer`.
+        descending (bool): Sort direction.
+        search (str, optional): Substring of the title.
+        person (str, optional): Only expenses this flatmate paid or shares.
+
+    Returns:
+        dict: `items` and the matching `total`, empty on error.
+    """
+    query = _page_params(offset, limit, sort, descending, q=search, person=person)
+    return _cached_get(f"/expenses/page?{query}", ("expenses",), {"items": [], "total": 0})
 
 def add_expense(expense_data):
     """Create a new expense.
 
+    The Expenses page shows server-computed totals and pages of the log, so
+    they are refetched rather than patched locally.
+
     Args:
         expense_data (dict): Expense payload expected by backend.
+
+    Returns:
+        dict | None: Stored expense with its ID, or None on failure.
     """
-    requests.post(f"{API_URL}/expenses/", json=expense_data, headers=_auth_headers())
+    expense = None
+    try:
+        response = _post(f"{API_URL}/expenses/", json=expense_data, headers=_auth_headers())
+        if response.status_code == 200:
+            expense = response.json()
+    except Exception:
+        pass
+    invalidate_cache("expenses")
+    return expense
 
 def get_debts():
     """Fetch simplified debt suggestions from the backend.
@@ -228,13 +1331,19 @@ def get_debts():
     Returns:
         list: Debt records or empty list on error.
     """
-    try:
-        response = requests.get(f"{API_URL}/expenses/debts", headers=_auth_headers())
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return []
-    return []
+    return _cached_get("/expenses/debts", ("expenses", "reimbursements"), [])
+
+def get_expense_summary():
+    """Fetch expense totals for the snapshot metrics and charts.
+
+    Returns:
+        dict: Total, count and per-payer/per-debtor totals, zeroed on error.
+    """
+    return _cached_get(
+        "/expenses/summary",
+        ("expenses", "reimbursements"),
+        {"total": 0.0, "count": 0, "by_payer": {}, "by_debtor": {}},
+    )
 
 def get_house_settings():
     """Retrieve the saved house settings.
@@ -242,13 +1351,7 @@ def get_house_settings():
     Returns:
         dict: House name and flatmates, with defaults on failure.
     """
-    try:
-        response = requests.get(f"{API_URL}/house/", headers=_auth_headers())
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return {"name": "My Flat", "flatmates": []}
-    return {"name": "My Flat", "flatmates": []}
+    return _cached_get("/house/", ("house",), {"name": "My Flat", "flatmates": []})
 
 def update_house_settings(settings):
     """Persist house configuration.
@@ -256,13 +1359,15 @@ def update_house_settings(settings):
     Args:
         settings (dict): House name and flatmates payload.
     """
-    requests.post(f"{API_URL}/house/", json=settings, headers=_auth_headers())
+    _post(f"{API_URL}/house/", json=settings, headers=_auth_headers())
+    invalidate_cache("house")
 
 
 def reset_house_data():
     """Request a full reset of house data."""
     try:
-        response = requests.delete(f"{API_URL}/house/reset", headers=_auth_headers())
+        response = _delete(f"{API_URL}/house/reset", headers=_auth_headers())
+        invalidate_cache(*HOUSE_TOPICS)
         return response.status_code == 200
     except:
         return False
@@ -271,7 +1376,8 @@ def reset_house_data():
 def delete_house():
     """Delete the current house and all its users/data."""
     try:
-        response = requests.delete(f"{API_URL}/house/delete", headers=_auth_headers())
+        response = _delete(f"{API_URL}/house/delete", headers=_auth_headers())
+        invalidate_cache(*HOUSE_TOPICS)
         return response.status_code == 200
     except:
         return False
@@ -283,13 +1389,24 @@ def get_reimbursements():
     Returns:
         list: Reimbursement records or empty list on error.
     """
-    try:
-        response = requests.get(f"{API_URL}/expenses/reimbursements", headers=_auth_headers())
-        if response.status_code == 200:
-            return response.json()
-    except:
-        return []
-    return []
+    return _cached_get("/expenses/reimbursements", ("reimbursements",), [])
+
+
+def get_reimbursements_page(offset=0, limit=20, sort="id", descending=True, person=None):
+    """Fetch one server-sorted page of reimbursements.
+
+    Args:
+        offset (int): Number of matching reimbursements to skip.
+        limit (int): Page size.
+        sort (str): `id`, `amount`, `from_person` or `to_person`.
+        descending (bool): Sort direction.
+        person (str, optional): Only transfers this flatmate sent or received.
+
+    Returns:
+        dict: `items` and the matching `total`, empty on error.
+    """
+    query = _page_params(offset, limit, sort, descending, person=person)
+    return _cached_get(f"/expenses/reimbursements/page?{query}", ("reimbursements",), {"items": [], "total": 0})
 
 
 def add_reimbursement(reimbursement_data):
@@ -298,4 +1415,172 @@ def add_reimbursement(reimbursement_data):
     Args:
         reimbursement_data (dict): Reimbursement payload expected by backend.
     """
-    requests.post(f"{API_URL}/expenses/reimbursements", json=reimbursement_data, headers=_auth_headers())
+    _post(f"{API_URL}/expenses/reimbursements", json=reimbursement_data, headers=_auth_headers())
+    invalidate_cache("reimbursements")
+
+
+def export_house_data(fmt="ndjson"):
+    """Download a full export of the current house.
+
+    Args:
+        fmt (str): Export format, `ndjson` or `csv`.
+
+    Returns:
+        bytes | None: Export file content, or None on failure.
+    """
+    try:
+        response = _get(
+            f"{API_URL}/house/export",
+            params={"format": fmt},
+            headers=_auth_headers(),
+            timeout=(API_TIMEOUT[0], TRANSFER_READ_TIMEOUT),
+        )
+        if response.status_code == 200:
+            return response.content
+    except Exception:
+        return None
+    return None
+
+
+def import_house_data(content, fmt="ndjson"):
+    """Upload an export file into the current house.
+
+    Args:
+        content (bytes): File content produced by `export_house_data`.
+        fmt (str): Format of the content, `ndjson` or `csv`.
+
+    Returns:
+        dict | None: Import summary with per-table counts, or None on failure.
+    """
+    try:
+        response = _post(
+            f"{API_URL}/house/import",
+            params={"format": fmt},
+            data=content,
+            headers=_auth_headers(),
+            timeout=(API_TIMEOUT[0], TRANSFER_READ_TIMEOUT),
+        )
+        if response.status_code == 200:
+            invalidate_cache(*HOUSE_TOPICS)
+            return response.json()
+    except Exception:
+        return None
+    return None
+
+
+def calendar_feed_url(rotate=False):
+    """Return the ICS subscription URL of the house calendar.
+
+    The URL carries the user's read-only feed token, not the session token.
+
+    Args:
+        rotate (bool): Issue a new feed token, revoking URLs handed out before.
+
+    Returns:
+        str | None: URL for calendar apps, or None on failure or when the backend
+        has no public address (e.g. with the embedded transport).
+    """
+    if not st.session_state.get("auth_token") or API_TRANSPORT == "embedded":
+        return None
+    try:
+        if rotate:
+            response = _request("POST", f"{API_URL}/auth/feed-token", headers=_auth_headers())
+        else:
+            response = _memo_get(f"{API_URL}/auth/feed-token", headers=_auth_headers())
+        if response.status_code != 200:
+            return None
+        feed_token = response.json()["token"]
+    except Exception:
+        return None
+    return f"{API_URL}/calendar/feed.ics?{urlencode({'token': feed_token})}"
+
+
+def import_calendar(content):
+    """Upload an iCalendar (.ics) file into the house calendar.
+
+    Args:
+        content (bytes): File content.
+
+    Returns:
+        dict | None: Import summary, or None on failure.
+    """
+    try:
+        response = _post(
+            f"{API_URL}/calendar/import",
+            data=content,
+            headers={**_auth_headers(), "Content-Type": "text/calendar"},
+            timeout=(API_TIMEOUT[0], TRANSFER_READ_TIMEOUT),
+        )
+        if response.status_code == 200:
+            invalidate_cache("events")
+            return response.json()
+    except Exception:
+        return None
+    return None
+
+
+def start_house_job(kind):
+    """Start a background house job.
+
+    Args:
+        kind (str): `reset` to clear house data or `delete` to remove the house.
+
+    Returns:
+        dict | None: Queued job record, or None on failure.
+    """
+    try:
+        response = _post(f"{API_URL}/house/{kind}", headers=_auth_headers())
+        if response.status_code == 202:
+            return response.json()
+    except Exception:
+        return None
+    return None
+
+
+def get_job(job_id):
+    """Fetch the status of a background job.
+
+    Args:
+        job_id (str): Identifier returned by `start_house_job`.
+
+    Returns:
+        dict | None: Job record, or None on failure.
+    """
+    try:
+        response = _get(f"{API_URL}/jobs/{job_id}", headers=_auth_headers())
+        if response.status_code == 200:
+            return response.json()
+    except Exception:
+        return None
+    return None
+
+
+def run_house_job(kind, on_progress=None, poll_interval=0.3, timeout=300):
+    """Start a background house job and wait for it to finish.
+
+    Args:
+        kind (str): `reset` or `delete`.
+        on_progress (callable, optional): Called with `(done, total)` after each poll.
+        poll_interval (float): Seconds between status checks.
+        timeout (float): Seconds to wait before giving up.
+
+    Returns:
+        bool: True if the job completed successfully.
+    """
+    job = start_house_job(kind)
+    deadline = time.monotonic() + timeout
+    while job and job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        try:
+            response = _get(f"{API_URL}/jobs/{job['id']}", headers=_auth_headers())
+        except requests.RequestException:
+            continue
+        if response.status_code == 401 and kind == "delete":
+            # Jobs are only visible to their house's users: the finished job removed them.
+            job = {**job, "status": "done"}
+        elif response.status_code == 200:
+            job = response.json()
+        if on_progress:
+            on_progress(job.get("progress", 0), job.get("total", 0))
+    invalidate_cache(*HOUSE_TOPICS)
+    return bool(job) and job["status"] == "done"
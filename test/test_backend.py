@@ -1,23 +1,21 @@
-import sqlite3
+import threading
+import time
 from datetime import date
 
 import pytest
+import requests
 from fastapi.testclient import TestClient
 
-from backend.db.database import Database
-from backend.main import app
+from backend.db.database import Database, VersionConflict
+from backend.embedded import EMBEDDED_URL, EmbeddedAdapter
+from backend.main import app, create_app
+from backend.settings import Settings
 
 
 @pytest.fixture
 def test_db(tmp_path, monkeypatch):
     """Create a fresh in-memory-style database per test and patch routers to use it."""
-    db_instance = Database()
-    db_instance.conn.close()
-
-    db_path = tmp_path / "test.db"
-    db_instance.conn = sqlite3.connect(db_path, check_same_thread=False)
-    db_instance.conn.row_factory = sqlite3.Row
-    db_instance._ensure_tables()
+    db_instance = Database(tmp_path / "test.db")
 
     targets = [
         "backend.db.database",
@@ -27,13 +25,17 @@ def test_db(tmp_path, monkeypatch):
         "backend.routers.expenses",
         "backend.routers.house",
         "backend.routers.auth",
+        "backend.routers.jobs",
+        "backend.routers.search",
+        "backend.idempotency",
+        "backend.main",
     ]
     for target in targets:
         monkeypatch.setattr(f"{target}.db", db_instance)
 
     yield db_instance
 
-    db_instance.conn.close()
+    db_instance.close()
 
 
 @pytest.fixture
@@ -83,6 +85,143 @@ def test_calendar_flow(client, auth_header):
     assert update_resp.json()["title"] == "Updated Event"
 
 
+def test_upcoming_and_day_events(client, auth_header, test_db):
+    events = [
+        ("Past", "2026-01-01", None, ["Alice"]),
+        ("Evening", "2026-01-05", "19:00:00", ["Bob"]),
+        ("All day", "2026-01-05", None, ["Alice", "Bob"]),
+        ("Morning", "2026-01-05", "08:00:00", ["Alice"]),
+        ("Later", "2026-02-01", None, []),
+    ]
+    for title, day, start_time, assigned in events:
+        payload = {"title": title, "date": day, "start_time": start_time, "assigned_to": assigned}
+        assert client.post("/calendar/", json=payload, headers=auth_header).status_code == 200
+
+    upcoming = client.get("/calendar/upcoming", params={"start": "2026-01-02", "limit": 3}, headers=auth_header)
+    assert [event["title"] for event in upcoming.json()] == ["All day", "Morning", "Evening"]
+
+    bobs = client.get("/calendar/upcoming", params={"start": "2026-01-02", "assignee": "Bob"}, headers=auth_header)
+    assert [event["title"] for event in bobs.json()] == ["All day", "Evening"]
+
+    day = client.get("/calendar/day/2026-01-05", headers=auth_header)
+    assert [event["title"] for event in day.json()] == ["All day", "Morning", "Evening"]
+    assert client.get("/calendar/day/not-a-date", headers=auth_header).status_code == 422
+
+    plan = test_db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM events WHERE house_id = ? AND date >= ? ORDER BY date, start_time, id LIMIT 5",
+        (1, "2026-01-02"),
+    ).fetchall()
+    assert any("idx_events_house_date" in row[-1] for row in plan)
+    assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+
+def test_recurring_events_expand_per_window(client, auth_header):
+    payload = {
+        "title": "Bins",
+        "date": "2026-01-05",
+        "assigned_to": ["Bob"],
+        "recurrence": {"freq": "weekly", "interval": 2, "until": "2026-03-02"},
+    }
+    series = client.post("/calendar/", json=payload, headers=auth_header).json()
+    client.post("/calendar/", json={"title": "Party", "date": "2026-01-20"}, headers=auth_header)
+
+    window = {"start": "2026-01-10", "end": "2026-02-10"}
+    events = client.get("/calendar/", params=window, headers=auth_header).json()
+    assert [(event["title"], event["date"]) for event in events] == [
+        ("Bins", "2026-01-19"),
+        ("Party", "2026-01-20"),
+        ("Bins", "2026-02-02"),
+    ]
+    assert all(event["id"] == series["id"] for event in events if event["title"] == "Bins")
+    assert len(client.get("/calendar/", headers=auth_header).json()) == 6
+
+    upcoming = client.get("/calendar/upcoming", params={"start": "2026-02-01", "limit": 2}, headers=auth_header)
+    assert [event["date"] for event in upcoming.json()] == ["2026-02-02", "2026-02-16"]
+    day = client.get("/calendar/day/2026-01-19", headers=auth_header).json()
+    assert [event["occurrence"] for event in day] == ["2026-01-19"]
+    bad_window = client.get("/calendar/", params={"start": "2026-02-01", "end": "2026-01-01"}, headers=auth_header)
+    assert bad_window.status_code == 400
+
+
+def test_editing_an_occurrence_creates_an_exception(client, auth_header, test_db):
+    payload = {"title": "Cleaning", "date": "2026-01-05", "recurrence": {"freq": "weekly", "count": 4}}
+    series_id = client.post("/calendar/", json=payload, headers=auth_header).json()["id"]
+
+    moved = {"title": "Deep cleaning", "date": "2026-01-13"}
+    resp = client.put(f"/calendar/{series_id}/occurrences/2026-01-12", json=moved, headers=auth_header)
+    assert resp.status_code == 200
+    assert resp.json()["series_id"] == series_id and resp.json()["occurrence"] == "2026-01-12"
+    # Editing it again updates the same exception row
+    client.put(f"/calendar/{series_id}/occurrences/2026-01-12", json=moved, headers=auth_header)
+    assert client.delete(f"/calendar/{series_id}/occurrences/2026-01-26", headers=auth_header).status_code == 200
+
+    events = client.get("/calendar/", headers=auth_header).json()
+    assert [(event["title"], event["date"]) for event in events] == [
+        ("Cleaning", "2026-01-05"),
+        ("Deep cleaning", "2026-01-13"),
+        ("Cleaning", "2026-01-19"),
+    ]
+    assert test_db.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 2
+
+    missing = client.put(f"/calendar/{series_id}/occurrences/2026-01-06", json=moved, headers=auth_header)
+    assert missing.status_code == 400
+    assert client.put("/calendar/999/occurrences/2026-01-05", json=moved, headers=auth_header).status_code == 404
+    invalid = {"title": "x", "date": "2026-01-05", "recurrence": {"freq": "daily", "count": 2, "until": "2026-02-01"}}
+    assert client.post("/calendar/", json=invalid, headers=auth_header).status_code == 422
+
+
+def test_put_without_recurrence_keeps_the_series(client, auth_header):
+    payload = {"title": "Cleaning", "date": "2026-01-05", "recurrence": {"freq": "weekly", "count": 3}}
+    series_id = client.post("/calendar/", json=payload, headers=auth_header).json()["id"]
+    client.delete(f"/calendar/{series_id}/occurrences/2026-01-12", headers=auth_header)
+
+    resp = client.put(f"/calendar/{series_id}", json={"title": "Hoovering", "date": "2026-01-05"}, headers=auth_header)
+    assert resp.status_code == 200
+    assert resp.json()["recurrence"]["exdates"] == ["2026-01-12"]
+    events = client.get("/calendar/", headers=auth_header).json()
+    assert [(event["title"], event["date"]) for event in events] == [
+        ("Hoovering", "2026-01-05"),
+        ("Hoovering", "2026-01-19"),
+    ]
+
+    single = {"title": "Hoovering", "date": "2026-01-05", "recurrence": None}
+    assert client.put(f"/calendar/{series_id}", json=single, headers=auth_header).json()["recurrence"] is None
+    assert len(client.get("/calendar/", headers=auth_header).json()) == 1
+
+
+def test_availability_reports_conflicts_and_shared_free_slots(client, auth_header):
+    events = [
+        ("Gym", "09:00:00", "10:30:00", ["Alice"]),
+        ("Call", "10:00:00", "11:00:00", ["Bob"]),
+        ("Lunch", "12:00:00", None, []),
+        ("Piano", "15:00:00", "16:00:00", ["Carol"]),
+        ("Cleaning", None, None, ["Alice"]),
+    ]
+    for title, start_time, end_time, assigned in events:
+        payload = {"title": title, "date": "2026-03-02", "start_time": start_time, "end_time": end_time,
+                   "assigned_to": assigned}
+        client.post("/calendar/", json=payload, headers=auth_header)
+
+    params = {"start": "2026-03-02", "end": "2026-03-02", "people": ["Alice", "Bob"], "min_minutes": 60,
+              "day_start": "08:00", "day_end": "18:00"}
+    resp = client.get("/calendar/availability", params=params, headers=auth_header)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [[event["title"] for event in conflict["events"]] for conflict in body["conflicts"]] == [["Gym", "Call"]]
+    assert (body["conflicts"][0]["start"], body["conflicts"][0]["end"]) == ("2026-03-02T10:00:00", "2026-03-02T10:30:00")
+    # Carol's piano lesson does not block Alice and Bob
+    assert [(slot["start"][11:16], slot["end"][11:16]) for slot in body["free_slots"]] == [
+        ("08:00", "09:00"),
+        ("11:00", "12:00"),
+        ("13:00", "18:00"),
+    ]
+
+    everyone = client.get("/calendar/availability", params={**params, "people": []}, headers=auth_header).json()
+    assert len(everyone["free_slots"]) == 4
+    too_long = {"start": "2026-01-01", "end": "2026-12-31"}
+    assert client.get("/calendar/availability", params=too_long, headers=auth_header).status_code == 400
+
+
 def test_shopping_flow(client, auth_header):
     item_payload = {"name": "Milk", "quantity": 2, "added_by": "Alice"}
     create_resp = client.post("/shopping/", json=item_payload, headers=auth_header)
@@ -100,6 +239,163 @@ def test_shopping_flow(client, auth_header):
     assert client.get("/shopping/", headers=auth_header).json() == []
 
 
+def test_shopping_batch(client, auth_header):
+    ids = [
+        client.post("/shopping/", json={"name": name, "added_by": "Alice"}, headers=auth_header).json()["id"]
+        for name in ("Milk", "Eggs", "Bread")
+    ]
+    version = client.get("/house/versions", headers=auth_header).json()["shopping"]
+
+    batch = {
+        "update": [{"id": ids[0], "quantity": 3}, {"id": ids[1], "purchased": True}],
+        "delete": [ids[2]],
+    }
+    resp = client.post("/shopping/batch", json=batch, headers=auth_header)
+    assert resp.status_code == 200
+    assert [(i["name"], i["quantity"], i["purchased"]) for i in resp.json()] == [
+        ("Milk", 3, False),
+        ("Eggs", 1, True),
+    ]
+    assert client.get("/shopping/", headers=auth_header).json() == resp.json()
+    # One transaction, one change notification
+    assert client.get("/house/versions", headers=auth_header).json()["shopping"] == version + 1
+
+    invalid = client.post("/shopping/batch", json={"update": [{"id": ids[0], "quantity": 0}]}, headers=auth_header)
+    assert invalid.status_code == 422
+
+
+def test_shopping_batch_rejects_items_changed_since_read(client, auth_header):
+    milk, eggs = (
+        client.post("/shopping/", json={"name": name, "added_by": "Alice"}, headers=auth_header).json()
+        for name in ("Milk", "Eggs")
+    )
+    # A flatmate buys the milk after the grid was loaded
+    client.patch(f"/shopping/{milk['id']}", json={"purchased": True}, headers=auth_header)
+
+    stale = {
+        "update": [{"id": eggs["id"], "quantity": 12}, {"id": milk["id"], "quantity": 2}],
+        "versions": {str(eggs["id"]): eggs["version"], str(milk["id"]): milk["version"]},
+    }
+    resp = client.post("/shopping/batch", json=stale, headers=auth_header)
+    assert resp.status_code == 409
+    assert [(i["quantity"], i["purchased"]) for i in client.get("/shopping/", headers=auth_header).json()] == [
+        (1, True),
+        (1, False),
+    ]
+
+    stale_delete = {"delete": [milk["id"]], "versions": {str(milk["id"]): milk["version"]}}
+    assert client.post("/shopping/batch", json=stale_delete, headers=auth_header).status_code == 409
+    current = {"delete": [milk["id"]], "versions": {str(milk["id"]): milk["version"] + 1}}
+    assert [i["name"] for i in client.post("/shopping/batch", json=current, headers=auth_header).json()] == ["Eggs"]
+
+
+def test_patch_updates_only_given_fields_and_detects_conflicts(client, auth_header, test_db):
+    item = client.post("/shopping/", json={"name": "Milk", "quantity": 2, "added_by": "Alice"}, headers=auth_header).json()
+    assert item["version"] == 1
+
+    bought = client.patch(f"/shopping/{item['id']}", json={"purchased": True, "version": 1}, headers=auth_header)
+    assert bought.status_code == 200
+    assert (bought.json()["name"], bought.json()["quantity"], bought.json()["purchased"]) == ("Milk", 2, True)
+    assert bought.json()["version"] == 2
+
+    # A flatmate still holding version 1 gets a conflict instead of overwriting the change.
+    stale = client.patch(f"/shopping/{item['id']}", json={"quantity": 5, "version": 1}, headers=auth_header)
+    assert stale.status_code == 409
+    assert client.get("/shopping/", headers=auth_header).json()[0]["quantity"] == 2
+    assert client.patch("/shopping/999", json={"quantity": 5}, headers=auth_header).status_code == 404
+    assert client.patch(f"/shopping/{item['id']}", json={"name": None}, headers=auth_header).status_code == 422
+
+    event = client.post(
+        "/calendar/", json={"title": "Dinner", "date": "2026-03-01", "description": "Pasta"}, headers=auth_header
+    ).json()
+    moved = client.patch(
+        f"/calendar/{event['id']}", json={"date": "2026-03-02", "start_time": "19:30"}, headers=auth_header
+    ).json()
+    assert (moved["title"], moved["date"], moved["start_time"], moved["description"]) == (
+        "Dinner", "2026-03-02", "19:30:00", "Pasta"
+    )
+    cleared = client.patch(
+        f"/calendar/{event['id']}", json={"description": None, "version": moved["version"]}, headers=auth_header
+    )
+    assert cleared.status_code == 200 and cleared.json()["description"] is None
+    # PUT honours a version too
+    stale_put = client.put(f"/calendar/{event['id']}", json={**event, "version": 1}, headers=auth_header)
+    assert stale_put.status_code == 409
+
+    expense = client.post(
+        "/expenses/", json={"title": "Gas", "amount": 30, "payer": "alice", "involved_people": ["alice", "bob"]},
+        headers=auth_header,
+    ).json()
+    fixed = client.patch(f"/expenses/{expense['id']}", json={"amount": 36.5}, headers=auth_header).json()
+    assert (fixed["title"], fixed["amount"], fixed["involved_people"]) == ("Gas", 36.5, ["alice", "bob"])
+
+    # Other houses' records look missing, not conflicting.
+    other = test_db.create_house("Other")
+    token = test_db.create_session_token(test_db.create_user("mallory", "secret", other.id).id)
+    foreign = client.patch(
+        f"/expenses/{expense['id']}", json={"amount": 1, "version": 1}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert foreign.status_code == 404
+
+
+def test_patch_miss_keeps_other_pending_writes(test_db):
+    from backend.models import ShoppingItem, ShoppingItemPatch
+
+    house = test_db.create_house("Flat")
+    item = test_db.add_shopping_item(ShoppingItem(name="Milk", added_by="a"), house.id)
+    # Another caller's write, not committed yet, on the same connection
+    test_db.conn.execute("INSERT INTO shopping_items (name, added_by, house_id) VALUES ('Eggs', 'a', ?)", (house.id,))
+
+    with pytest.raises(VersionConflict):
+        test_db.patch_shopping_item(item.id, ShoppingItemPatch(quantity=3, version=7), house.id)
+    assert test_db.patch_shopping_item(item.id + 100, ShoppingItemPatch(quantity=3), house.id) is None
+    test_db.conn.commit()
+    assert [i.name for i in test_db.get_shopping_list(house.id)] == ["Milk", "Eggs"]
+
+
+def test_search_ranks_marks_and_stays_in_sync(client, auth_header, test_db):
+    client.post("/calendar/", json={"title": "Kitchen cleaning", "date": "2026-01-05",
+                                    "description": "Scrub the oven <carefully>"}, headers=auth_header)
+    client.post("/calendar/", json={"title": "Party", "date": "2026-01-06",
+                                    "description": "Clean up after"}, headers=auth_header)
+    milk = client.post("/shopping/", json={"name": "Oat milk", "added_by": "alice"}, headers=auth_header).json()
+    client.post("/expenses/", json={"title": "Cleaning supplies", "amount": 12.0, "payer": "alice",
+                                    "involved_people": ["alice"]}, headers=auth_header)
+    client.post("/expenses/reimbursements", json={"from_person": "bob", "to_person": "alice", "amount": 5.0,
+                                                  "note": "Crème for the oven"}, headers=auth_header)
+
+    def search(q, **params):
+        resp = client.get("/search/", params={"q": q, **params}, headers=auth_header)
+        assert resp.status_code == 200
+        return resp.json()["hits"]
+
+    hits = search("clean")
+    # Title matches rank above the description-only match
+    assert {(hit["domain"], hit["title"]) for hit in hits[:2]} == {
+        ("events", "Kitchen <mark>cleaning</mark>"),
+        ("expenses", "<mark>Cleaning</mark> supplies"),
+    }
+    assert (hits[2]["domain"], hits[2]["title"]) == ("events", "Party")
+    assert hits[2]["snippet"] == "<mark>Clean</mark> up after"
+    assert search("oven scrub")[0]["snippet"] == "<mark>Scrub</mark> the <mark>oven</mark> &lt;carefully&gt;"
+    assert [hit["domain"] for hit in search("creme")] == ["reimbursements"]
+    assert [hit["domain"] for hit in search("clean", domains=["expenses"])] == ["expenses"]
+    assert search("!!!") == []
+    assert client.get("/search/", params={"q": "x", "domains": ["bills"]}, headers=auth_header).status_code == 422
+
+    # Writes, batches and other houses stay in sync with the index
+    client.post("/shopping/batch", json={"delete": [milk["id"]]}, headers=auth_header)
+    assert search("oat") == []
+    client.put("/calendar/1", json={"title": "Bathroom", "date": "2026-01-05"}, headers=auth_header)
+    assert [hit["title"] for hit in search("bath")] == ["<mark>Bathroom</mark>"]
+    other_house = test_db.create_house("Other")
+    other_user = test_db.create_user("carol", "pw", other_house.id)
+    other_header = {"Authorization": f"Bearer {test_db.create_session_token(other_user.id)}"}
+    assert client.get("/search/", params={"q": "bath"}, headers=other_header).json()["hits"] == []
+    test_db.purge_house_data(1, pause=0)
+    assert search("party") == []
+
+
 def test_house_settings(client, auth_header):
     payload = {"name": "My House"}
     save_resp = client.post("/house/", json=payload, headers=auth_header)
@@ -216,6 +512,97 @@ def test_expenses_and_debts_flow(client, auth_header):
     assert updated[0]["amount"] == 30.0
 
 
+def test_debts_settle_tied_balances_in_order_of_appearance(client, auth_header):
+    for payload in (
+        {"title": "Bins", "amount": 20.0, "payer": "Zoe", "involved_people": ["Carol", "Bob"]},
+        {"title": "Soap", "amount": 20.0, "payer": "Mia", "involved_people": ["Dan", "Ann"]},
+    ):
+        client.post("/expenses/", json=payload, headers=auth_header)
+
+    debts = client.get("/expenses/debts", headers=auth_header).json()
+    assert [(debt["debtor"], debt["creditor"], debt["amount"]) for debt in debts] == [
+        ("Carol", "Zoe", 10.0),
+        ("Bob", "Zoe", 10.0),
+        ("Dan", "Mia", 10.0),
+        ("Ann", "Mia", 10.0),
+    ]
+
+
+def test_expense_summary(client, auth_header, test_db):
+    empty = client.get("/expenses/summary", headers=auth_header)
+    assert empty.json() == {"total": 0.0, "count": 0, "by_payer": {}, "by_debtor": {}}
+
+    for payload in (
+        {"title": "Groceries", "amount": 100.0, "payer": "Alice", "involved_people": ["Alice", "Bob"]},
+        {"title": "Pizza", "amount": 30.0, "payer": "Bob", "involved_people": ["Alice", "Bob", "Carol"]},
+    ):
+        client.post("/expenses/", json=payload, headers=auth_header)
+
+    summary = client.get("/expenses/summary", headers=auth_header)
+    assert summary.status_code == 200
+    assert summary.json() == {
+        "total": 130.0,
+        "count": 2,
+        "by_payer": {"Alice": 100.0, "Bob": 30.0},
+        "by_debtor": {"Bob": 30.0, "Carol": 10.0},
+    }
+
+    client.post("/expenses/reimbursements", json={"from_person": "Bob", "to_person": "Alice", "amount": 20}, headers=auth_header)
+    assert test_db.get_balances(1) == pytest.approx({"Alice": 20.0, "Bob": -10.0, "Carol": -10.0})
+    assert client.get("/expenses/summary", headers=auth_header).json()["by_debtor"] == {"Bob": 10.0, "Carol": 10.0}
+
+    plan = test_db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT payer, SUM(amount), COUNT(*) FROM expenses WHERE house_id = ? GROUP BY payer",
+        (1,),
+    ).fetchall()
+    assert any("idx_expenses_house_payer" in row[-1] for row in plan)
+
+def test_expense_and_reimbursement_pages(client, auth_header):
+    for title, amount, payer, involved in [
+        ("Rent", 900.0, "Alice", ["Alice", "Bob"]),
+        ("100%_juice", 4.0, "Bob", ["Bob"]),
+        ("Groceries", 60.0, "Carol", ["Alice", "Carol"]),
+        ("Internet", 30.0, "Alice", ["Alice", "Bob", "Carol"]),
+        ("Groceries again", 45.0, "Bob", ["Bob", "Carol"]),
+    ]:
+        client.post(
+            "/expenses/",
+            json={"title": title, "amount": amount, "payer": payer, "involved_people": involved},
+            headers=auth_header,
+        )
+
+    first = client.get("/expenses/page", params={"limit": 2}, headers=auth_header).json()
+    assert first["total"] == 5
+    assert [e["title"] for e in first["items"]] == ["Groceries again", "Internet"]
+    second = client.get("/expenses/page", params={"limit": 2, "offset": 4}, headers=auth_header).json()
+    assert [e["title"] for e in second["items"]] == ["Rent"]
+
+    by_amount = client.get("/expenses/page", params={"sort": "amount", "order": "asc"}, headers=auth_header).json()
+    assert [e["amount"] for e in by_amount["items"]] == [4.0, 30.0, 45.0, 60.0, 900.0]
+
+    search = client.get("/expenses/page", params={"q": "grocer"}, headers=auth_header).json()
+    assert search["total"] == 2
+    literal = client.get("/expenses/page", params={"q": "%_"}, headers=auth_header).json()
+    assert [e["title"] for e in literal["items"]] == ["100%_juice"]
+
+    carol = client.get("/expenses/page", params={"person": "Carol"}, headers=auth_header).json()
+    assert [e["title"] for e in carol["items"]] == ["Groceries again", "Internet", "Groceries"]
+
+    bad_sort = client.get("/expenses/page", params={"sort": "house_id"}, headers=auth_header)
+    assert bad_sort.status_code == 422
+
+    for sender, receiver, amount in [("Bob", "Alice", 10.0), ("Carol", "Alice", 5.0), ("Bob", "Carol", 7.0)]:
+        client.post(
+            "/expenses/reimbursements",
+            json={"from_person": sender, "to_person": receiver, "amount": amount},
+            headers=auth_header,
+        )
+    history = client.get(
+        "/expenses/reimbursements/page", params={"person": "Carol", "limit": 1}, headers=auth_header
+    ).json()
+    assert history["total"] == 2
+    assert [(r["from_person"], r["to_person"]) for r in history["items"]] == [("Bob", "Carol")]
+
 def test_reset_house_data(client, auth_header):
     client.post("/house/", json={"name": "Resettable"}, headers=auth_header)
 
@@ -240,4 +627,415 @@ def test_reset_house_data(client, auth_header):
     assert client.get("/house/", headers=auth_header).json()["flatmates"] == ["alice"]
     assert client.get("/calendar/", headers=auth_header).json() == []
     assert client.get("/shopping/", headers=auth_header).json() == []
-    assert client.get("/expenses/", headers=auth_header).json() == []
\ No newline at end of file
+    assert client.get("/expenses/", headers=auth_header).json() == []
+
+def _seed_house(client, auth_header):
+    client.post(
+        "/calendar/",
+        json={"title": "Party", "date": str(date.today()), "description": "x", "assigned_to": ["alice"]},
+        headers=auth_header,
+    )
+    client.post("/shopping/", json={"name": "Milk", "quantity": 2, "added_by": "alice"}, headers=auth_header)
+    client.post(
+        "/expenses/",
+        json={"title": "Rent", "amount": 500.0, "payer": "alice", "involved_people": ["alice", "bob"]},
+        headers=auth_header,
+    )
+    client.post(
+        "/expenses/reimbursements",
+        json={"from_person": "bob", "to_person": "alice", "amount": 50.0},
+        headers=auth_header,
+    )
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_import_roundtrip(client, auth_header, test_db, fmt):
+    _seed_house(client, auth_header)
+    rota = {"title": "Rota", "date": str(date.today()), "recurrence": {"freq": "monthly", "count": 3}}
+    client.post("/calendar/", json=rota, headers=auth_header)
+
+    export_resp = client.get(f"/house/export?format={fmt}", headers=auth_header)
+    assert export_resp.status_code == 200
+    content = export_resp.content
+
+    other_house = test_db.create_house("Copy")
+    other_user = test_db.create_user("carol", "pw", other_house.id)
+    other_header = {"Authorization": f"Bearer {test_db.create_session_token(other_user.id)}"}
+
+    import_resp = client.post(f"/house/import?format={fmt}", content=content, headers=other_header)
+    assert import_resp.status_code == 200
+    assert import_resp.json()["total"] == 5
+
+    events = client.get("/calendar/", headers=other_header).json()
+    assert events[0]["title"] == "Party"
+    assert events[0]["assigned_to"] == ["alice"]
+    assert [event["recurrence"]["count"] for event in events if event["title"] == "Rota"] == [3, 3, 3]
+    expenses = client.get("/expenses/", headers=other_header).json()
+    assert expenses[0]["involved_people"] == ["alice", "bob"]
+    assert client.get("/shopping/", headers=other_header).json()[0]["quantity"] == 2
+    assert client.get("/expenses/reimbursements", headers=other_header).json()[0]["amount"] == 50.0
+
+
+def test_ics_feed_is_cached_per_house_version(client, auth_header):
+    token = client.get("/auth/feed-token", headers=auth_header).json()["token"]
+    client.post("/calendar/", json={"title": "Dinner, late", "date": "2026-01-05", "start_time": "19:00:00",
+                                    "end_time": "21:00:00", "assigned_to": ["alice"]}, headers=auth_header)
+    client.post("/calendar/", json={"title": "Bins", "date": "2026-01-06",
+                                    "recurrence": {"freq": "weekly", "count": 2}}, headers=auth_header)
+
+    feed = client.get("/calendar/feed.ics", params={"token": token})
+    assert feed.status_code == 200
+    assert feed.headers["content-type"].startswith("text/calendar")
+    body = feed.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert "SUMMARY:Dinner\\, late\r\nDTSTART:20260105T190000\r\nDTEND:20260105T210000" in body
+    assert body.count("BEGIN:VEVENT") == 3
+    assert client.get("/calendar/feed.ics").status_code == 401
+    session_token = auth_header["Authorization"].split()[1]
+    assert client.get("/calendar/feed.ics", params={"token": session_token}).status_code == 401
+    # The feed token grants nothing else
+    assert client.get("/calendar/", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+    etag, last_modified = feed.headers["etag"], feed.headers["last-modified"]
+    cached = client.get("/calendar/feed.ics", params={"token": token})
+    assert cached.text == body and cached.headers["etag"] == etag
+    assert client.get("/calendar/feed.ics", params={"token": token},
+                      headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/calendar/feed.ics", params={"token": token},
+                      headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    client.post("/calendar/", json={"title": "Movie", "date": "2026-01-07"}, headers=auth_header)
+    changed = client.get("/calendar/feed.ics", params={"token": token}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and "SUMMARY:Movie" in changed.text
+
+    rotated = client.post("/auth/feed-token", headers=auth_header).json()["token"]
+    assert client.get("/calendar/feed.ics", params={"token": token}).status_code == 401
+    assert client.get("/calendar/feed.ics", params={"token": rotated}).status_code == 200
+
+
+def test_ics_feed_cache_keeps_only_recently_polled_houses(client, auth_header, test_db, monkeypatch):
+    from collections import OrderedDict
+
+    from backend.routers import calendar as calendar_router
+
+    monkeypatch.setattr(calendar_router, "FEED_CACHE_HOUSES", 1)
+    monkeypatch.setattr(calendar_router, "_feed_cache", OrderedDict())
+    other = test_db.create_user("carol", "pw", test_db.create_house("Other").id)
+    tokens = [
+        client.get("/auth/feed-token", headers=auth_header).json()["token"],
+        test_db.get_feed_token(other.id),
+    ]
+
+    for token in tokens:
+        assert client.get("/calendar/feed.ics", params={"token": token}).status_code == 200
+
+    assert list(calendar_router._feed_cache) == [other.house_id]
+
+
+def test_ics_import_round_trips_the_feed(client, auth_header, test_db):
+    token = client.get("/auth/feed-token", headers=auth_header).json()["token"]
+    client.post("/calendar/", json={"title": "Cleaning; kitchen", "date": "2026-02-02", "start_time": "10:00:00",
+                                    "description": "Line one\nline two", "assigned_to": ["bob"]}, headers=auth_header)
+    feed = client.get("/calendar/feed.ics", params={"token": token}).content
+
+    other_house = test_db.create_house("Copy")
+    other_user = test_db.create_user("carol", "pw", other_house.id)
+    other_header = {"Authorization": f"Bearer {test_db.create_session_token(other_user.id)}"}
+    resp = client.post("/calendar/import", content=feed, headers=other_header)
+    assert resp.status_code == 200 and resp.json()["total"] == 1
+    event = client.get("/calendar/", headers=other_header).json()[0]
+    assert (event["title"], event["start_time"], event["description"], event["assigned_to"]) == (
+        "Cleaning; kitchen", "10:00:00", "Line one\nline two", ["bob"]
+    )
+
+    series = (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Rota\r\nDTSTART;VALUE=DATE:20260105\r\n"
+        "RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=3\r\nEXDATE;VALUE=DATE:20260119\r\n"
+        "BEGIN:VALARM\r\nSUMMARY:Ignored\r\nEND:VALARM\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    assert client.post("/calendar/import", content=series, headers=other_header).status_code == 200
+    dates = [e["date"] for e in client.get("/calendar/", headers=other_header).json() if e["title"] == "Rota"]
+    assert dates == ["2026-01-05", "2026-02-02"]
+
+    broken = "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:No start\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    assert client.post("/calendar/import", content=broken, headers=other_header).status_code == 400
+
+
+def test_ics_import_converts_zoned_times_and_keeps_escaped_commas(monkeypatch):
+    import io
+
+    from backend import ics
+
+    monkeypatch.setattr(ics, "LOCAL_TIMEZONE", "Europe/Rome")
+    feed = (
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:Call\r\nDTSTART:20260105T180000Z\r\nDTEND:20260105T190000Z\r\n"
+        "CATEGORIES:Bob\\, Jr,ann\r\nEND:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:Party\r\nDTSTART;TZID=America/New_York:20260105T090000\r\n"
+        "DTEND;TZID=America/New_York:20260105T200000\r\nEND:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+    call, party = [row for _, row in ics.parse_ics(io.BytesIO(feed.encode()))]
+    assert (call["date"], call["start_time"], call["end_time"]) == ("2026-01-05", "19:00:00", "20:00:00")
+    assert call["assigned_to"] == ["Bob, Jr", "ann"]
+    # 15:00 to 02:00 the next day in Rome: cut at the end of the first day
+    assert (party["date"], party["start_time"], party["end_time"]) == ("2026-01-05", "15:00:00", "23:59:00")
+
+
+def test_import_rejects_invalid_rows(client, auth_header):
+    content = b'{"entity": "shopping_items", "name": "Milk", "added_by": "a"}\n{"entity": "unknown"}\n'
+    resp = client.post("/house/import", content=content, headers=auth_header)
+    assert resp.status_code == 400
+    assert client.get("/shopping/", headers=auth_header).json() == []
+
+
+def test_import_is_atomic_while_requests_write(test_db):
+    from backend.models import Expense
+
+    house = test_db.create_house("Flat")
+    writer = threading.Thread(
+        target=test_db.add_expense, args=(Expense(title="Gas", amount=5, payer="a"), house.id)
+    )
+
+    def records():
+        yield "shopping_items", {"name": "Milk", "added_by": "a"}
+        yield "shopping_items", {"name": "Eggs", "added_by": "a"}
+        # A request commits on the shared connection while the import is half done.
+        writer.start()
+        time.sleep(0.1)
+        yield "unknown", {}
+
+    with pytest.raises(ValueError):
+        test_db.import_house_data(house.id, records(), batch_size=1)
+    writer.join()
+    assert test_db.get_shopping_list(house.id) == []
+    assert [expense.title for expense in test_db.get_expenses(house.id)] == ["Gas"]
+
+
+def test_hub_coalesces_changes_per_topic():
+    import asyncio
+    import threading
+
+    from backend.notifications import HouseHub
+
+    async def scenario():
+        hub = HouseHub()
+        subscription = hub.subscribe(1)
+        other = hub.subscribe(2)
+        publisher = threading.Thread(
+            target=lambda: [hub.publish(1, ["shopping"]) for _ in range(50)] + [hub.publish(1, ["events"])]
+        )
+        publisher.start()
+        publisher.join()
+        changes = await subscription.next_changes(timeout=1)
+        idle = await other.next_changes(timeout=0.01)
+        hub.unsubscribe(subscription)
+        hub.unsubscribe(other)
+        return changes, idle, hub.subscriber_count(1)
+
+    changes, idle, remaining = asyncio.run(scenario())
+    assert changes == {"shopping": 50, "events": 1}
+    assert idle is None
+    assert remaining == 0
+
+
+def test_mutations_notify_listeners(client, auth_header, test_db):
+    received = []
+    test_db.add_listener(lambda house_id, topics: received.append(topics))
+
+    client.post("/shopping/", json={"name": "Milk", "quantity": 1, "added_by": "A"}, headers=auth_header)
+    client.post("/expenses/", json={"title": "Gas", "amount": 5, "payer": "A", "involved_people": ["A"]}, headers=auth_header)
+    client.get("/shopping/", headers=auth_header)
+
+    assert received == [["shopping"], ["expenses"]]
+
+
+def test_house_versions_bump_on_committed_changes(client, auth_header):
+    before = client.get("/house/versions", headers=auth_header).json()
+    client.post("/shopping/", json={"name": "Milk", "quantity": 1, "added_by": "A"}, headers=auth_header)
+    client.post("/shopping/", json={"name": "Eggs", "quantity": 1, "added_by": "A"}, headers=auth_header)
+    client.get("/calendar/", headers=auth_header)
+    after = client.get("/house/versions", headers=auth_header).json()
+
+    assert set(after) == {"house", "events", "shopping", "expenses", "reimbursements"}
+    assert after["shopping"] == before["shopping"] + 2
+    assert after["events"] == before["events"]
+
+
+def test_metrics_exposes_route_templates_and_db_timings(client, auth_header):
+    client.post("/shopping/", json={"name": "Milk", "quantity": 1, "added_by": "A"}, headers=auth_header)
+    item_id = client.get("/shopping/", headers=auth_header).json()[0]["id"]
+    client.delete(f"/shopping/{item_id}", headers=auth_header)
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    body = resp.text
+    assert 'flatmates_http_requests_total{method="DELETE",route="/shopping/{item_id}",status="200"}' in body
+    assert 'flatmates_http_request_duration_seconds_bucket{method="GET",route="/shopping/",le="+Inf"}' in body
+    assert 'flatmates_db_calls_total{method="add_shopping_item"}' in body
+    assert "# TYPE flatmates_db_call_duration_seconds histogram" in body
+
+
+def test_sql_profiler_reports_server_timing_and_repeats(client, test_db, monkeypatch, caplog):
+    from backend.profiling import profiler
+
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "repeat_threshold", 2)
+    monkeypatch.setattr(profiler, "slow_query_seconds", 0.0)
+    test_db.enable_profiling()
+
+    with caplog.at_level("WARNING", logger="backend.profiling"):
+        resp = client.post("/auth/register", json={"username": "prof", "password": "pw", "house_name": "P"})
+
+    assert resp.status_code == 200
+    assert resp.headers["server-timing"].startswith("db;dur=")
+    assert "total;dur=" in resp.headers["server-timing"]
+    assert int(resp.headers["x-db-queries"]) >= 7
+    # get_house_settings runs twice during registration.
+    assert "x-repeated-queries" in resp.headers
+    assert any("plan:" in message for message in caplog.messages)
+
+
+def _wait_for_job(client, job_id, headers, timeout=5.0):
+    """Poll a job until it finishes; None once the caller's session is gone (deleted house)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resp = client.get(f"/jobs/{job_id}", headers=headers)
+        if resp.status_code == 401:
+            return None
+        job = resp.json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_reset_house_job_runs_in_background(client, auth_header):
+    _seed_house(client, auth_header)
+
+    start = client.post("/house/reset", headers=auth_header)
+    assert start.status_code == 202
+    job = _wait_for_job(client, start.json()["id"], auth_header)
+
+    assert job["status"] == "done"
+    assert job["kind"] == "reset_house"
+    assert job["progress"] == job["total"] == 4
+    assert client.get("/calendar/", headers=auth_header).json() == []
+    assert client.get("/house/", headers=auth_header).json()["flatmates"] == ["alice"]
+
+
+def test_jobs_are_only_visible_to_their_house(client, auth_header, test_db):
+    job_id = client.post("/house/reset", headers=auth_header).json()["id"]
+    other = test_db.create_user("mallory", "pw", test_db.create_house("Other").id)
+    other_header = {"Authorization": f"Bearer {test_db.create_session_token(other.id)}"}
+
+    assert client.get(f"/jobs/{job_id}").status_code == 401
+    assert client.get(f"/jobs/{job_id}", headers=other_header).status_code == 404
+    assert client.get("/jobs/unknown", headers=auth_header).status_code == 404
+    assert _wait_for_job(client, job_id, auth_header)["status"] == "done"
+
+
+def test_delete_house_job_removes_users(client, auth_header, test_db):
+    start = client.post("/house/delete", headers=auth_header)
+    assert start.status_code == 202
+    assert _wait_for_job(client, start.json()["id"], auth_header) is None
+    assert test_db.get_job(start.json()["id"]).status == "done"
+    assert client.get("/house/", headers=auth_header).status_code == 401
+    assert test_db.conn.execute("SELECT COUNT(*) FROM house_versions").fetchone()[0] == 0
+
+
+def test_background_import_reports_progress(client, auth_header):
+    content = b"".join(
+        b'{"entity": "shopping_items", "name": "Item %d", "added_by": "a"}\n' % i for i in range(3)
+    )
+    start = client.post("/house/import?background=true", content=content, headers=auth_header)
+    assert start.status_code == 202
+    job = _wait_for_job(client, start.json()["id"], auth_header)
+    assert job["status"] == "done"
+    assert job["progress"] == 3
+    assert len(client.get("/shopping/", headers=auth_header).json()) == 3
+
+
+def test_idempotency_key_replays_stored_response(client, auth_header):
+    headers = {**auth_header, "Idempotency-Key": "expense-1"}
+    payload = {"title": "Rent", "amount": 300.0, "payer": "alice", "involved_people": ["alice", "bob"]}
+
+    first = client.post("/expenses/", json=payload, headers=headers)
+    retry = client.post("/expenses/", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(client.get("/expenses/", headers=auth_header).json()) == 1
+
+    changed = client.post("/expenses/", json={**payload, "amount": 1.0}, headers=headers)
+    assert changed.status_code == 422
+
+    other_key = client.post("/expenses/", json=payload, headers={**auth_header, "Idempotency-Key": "expense-2"})
+    assert other_key.json()["id"] != first.json()["id"]
+
+
+def test_idempotency_keys_are_scoped_per_caller(client, auth_header, test_db):
+    other = test_db.create_user("bob", "pw", test_db.create_house("Other").id)
+    other_header = {"Authorization": f"Bearer {test_db.create_session_token(other.id)}"}
+    item = {"name": "Milk", "quantity": 1, "added_by": "a"}
+
+    client.post("/shopping/", json=item, headers={**auth_header, "Idempotency-Key": "k"})
+    client.post("/shopping/", json=item, headers={**other_header, "Idempotency-Key": "k"})
+
+    assert len(client.get("/shopping/", headers=auth_header).json()) == 1
+    assert len(client.get("/shopping/", headers=other_header).json()) == 1
+
+
+def test_idempotency_keys_do_not_store_auth_responses(client, auth_header, test_db):
+    headers = {"Idempotency-Key": "login-1"}
+    credentials = {"username": "alice", "password": "secret"}
+
+    first = client.post("/auth/login", json=credentials, headers=headers)
+    retry = client.post("/auth/login", json=credentials, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert "idempotent-replayed" not in retry.headers
+    assert retry.json()["token"] != first.json()["token"]
+    assert test_db.conn.execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()[0] == 0
+
+
+def test_settings_default_to_one_worker(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert Settings.from_env().workers == 1
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert Settings.from_env().workers == 4
+
+
+def test_create_app_uses_configured_database(tmp_path, test_db):
+    settings = Settings(db_path=tmp_path / "configured.db", workers=1)
+
+    with TestClient(create_app(settings)) as configured_client:
+        resp = configured_client.post("/auth/register", json={"username": "u", "password": "p"})
+        assert resp.status_code == 200
+        assert test_db.db_path == settings.db_path
+
+    assert test_db._conn is None
+    assert Database(settings.db_path).get_user_by_username("u") is not None
+
+
+def test_embedded_adapter_serves_requests_in_process(test_db, auth_header):
+    adapter = EmbeddedAdapter(create_app(Settings(db_path=test_db.db_path, workers=1)))
+    session = requests.Session()
+    session.mount(EMBEDDED_URL, adapter)
+    try:
+        assert session.get(f"{EMBEDDED_URL}/shopping/").status_code == 401
+        created = session.post(f"{EMBEDDED_URL}/shopping/", json={"name": "Milk", "added_by": "a"}, headers=auth_header)
+        assert created.status_code == 200
+        assert session.get(f"{EMBEDDED_URL}/shopping/", headers=auth_header).json() == [created.json()]
+        assert session.get(f"{EMBEDDED_URL}/calendar/day/not-a-date", headers=auth_header).status_code == 422
+
+        # Streamed responses arrive incrementally, and closing them disconnects the listener.
+        with session.get(f"{EMBEDDED_URL}/house/changes", headers=auth_header, stream=True, timeout=5) as feed:
+            lines = feed.iter_lines(decode_unicode=True)
+            assert next(lines) == "retry: 3000"
+            session.post(f"{EMBEDDED_URL}/shopping/", json={"name": "Eggs", "added_by": "a"}, headers=auth_header)
+            data = next(line for line in lines if line.startswith("data:"))
+            assert '"shopping"' in data
+    finally:
+        session.close()
@@ -1,26 +1,18 @@
-import sqlite3
 from datetime import date, time
 
 import pytest
 
-from backend.db.database import Database
+from backend.db.database import SCHEMA_VERSION, Database
 from backend.models import Event, ShoppingItem, Expense, HouseSettings, Reimbursement
 
 
 @pytest.fixture
 def db_instance(tmp_path):
-    instance = Database()
-    instance.conn.close()
-
-    db_path = tmp_path / "db.sqlite"
-    instance.db_path = db_path
-    instance.conn = sqlite3.connect(db_path, check_same_thread=False)
-    instance.conn.row_factory = sqlite3.Row
-    instance._ensure_tables()
+    instance = Database(tmp_path / "db.sqlite")
 
     yield instance
 
-    instance.conn.close()
+    instance.close()
 
 
 @pytest.fixture
@@ -142,4 +134,72 @@ def test_clear_all_data(db_instance, house_id):
     assert db_instance.get_events(house_id) == []
     assert db_instance.get_shopping_list(house_id) == []
     assert db_instance.get_expenses(house_id) == []
-    assert db_instance.get_reimbursements(house_id) == []
\ No newline at end of file
+    assert db_instance.get_reimbursements(house_id) == []
+
+def test_import_house_data_batches_and_rolls_back(db_instance, house_id):
+    rows = [("shopping_items", {"name": f"Item {i}", "added_by": "A"}) for i in range(5)]
+    progress = []
+    counts = db_instance.import_house_data(house_id, rows, batch_size=2, progress=progress.append)
+    assert counts["shopping_items"] == 5
+    assert progress == [2, 4, 5]
+    exported = list(db_instance.iter_house_rows(house_id, batch_size=2))
+    assert [row["name"] for _, row in exported] == [f"Item {i}" for i in range(5)]
+
+    with pytest.raises(ValueError):
+        db_instance.import_house_data(house_id, rows + [("expenses", {"title": "Bad"})])
+    assert len(db_instance.get_shopping_list(house_id)) == 5
+
+
+def test_import_notifies_only_touched_topics(db_instance, house_id):
+    received = []
+    db_instance.add_listener(lambda changed_house, topics: received.append((changed_house, topics)))
+    db_instance.import_house_data(house_id, [("expenses", {"title": "Gas", "amount": 5, "payer": "A"})])
+    assert received == [(house_id, ["expenses"])]
+
+
+def test_purge_house_data_deletes_in_chunks(db_instance, house_id):
+    other_house = db_instance.create_house("Other").id
+    rows = [("shopping_items", {"name": f"Item {i}", "added_by": "A"}) for i in range(7)]
+    db_instance.import_house_data(house_id, rows)
+    db_instance.import_house_data(other_house, rows[:2])
+
+    progress = []
+    deleted = db_instance.purge_house_data(house_id, chunk_size=3, pause=0, progress=lambda d, t: progress.append(d))
+
+    assert deleted == 7
+    assert progress == [0, 3, 6, 7]
+    assert db_instance.get_shopping_list(house_id) == []
+    assert len(db_instance.get_shopping_list(other_house)) == 2
+
+
+def test_job_records_and_interrupted_jobs(db_instance, house_id):
+    job = db_instance.create_job(house_id, "reset_house")
+    assert job.status == "queued"
+    db_instance.update_job(job.id, status="running", progress=1, total=4)
+    assert db_instance.get_job(job.id).progress == 1
+
+    assert db_instance.fail_interrupted_jobs() == 1
+    failed = db_instance.get_job(job.id)
+    assert failed.status == "failed"
+    assert failed.error
+    assert db_instance.get_job(job.id, house_id + 1) is None
+
+    running = db_instance.create_job(house_id, "reset_house")
+    db_instance.update_job(running.id, status="running")
+    assert db_instance.prune_jobs(3600) == 0
+    assert db_instance.prune_jobs(-1) == 1
+    assert db_instance.get_job(job.id) is None
+    assert db_instance.get_job(running.id) is not None
+
+
+def test_connection_is_lazy_and_schema_created_once(tmp_path):
+    instance = Database(tmp_path / "lazy.sqlite")
+    assert not instance.db_path.exists()
+
+    instance.create_house("Lazy")
+    assert instance.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    instance.close()
+
+    reopened = Database(tmp_path / "lazy.sqlite")
+    assert reopened.get_house_settings(1).name == "Lazy"
+    reopened.close()
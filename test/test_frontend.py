@@ -1,3 +1,10 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
 import frontend.utils as utils
 
 
@@ -5,6 +12,7 @@ class DummyResponse:
     def __init__(self, status_code, payload=None):
         self.status_code = status_code
         self._payload = payload or []
+        self.headers = {}
 
     def json(self):
         return self._payload
@@ -15,15 +23,25 @@ def test_get_events_success(monkeypatch):
         assert url == f"{utils.API_URL}/calendar/"
         return DummyResponse(200, [{"title": "Hello"}])
 
-    monkeypatch.setattr(utils.requests, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
     assert utils.get_events() == [{"title": "Hello"}]
 
 
+def test_calendar_loads_a_bounded_window(monkeypatch):
+    assert utils.calendar_window(utils.date(2026, 1, 15)) == (utils.date(2025, 12, 1), utils.date(2026, 4, 30))
+    assert utils.calendar_window(utils.date(2026, 11, 3)) == (utils.date(2026, 10, 1), utils.date(2027, 2, 28))
+
+    urls = []
+    monkeypatch.setattr(utils.SESSION, "get", lambda url, **kwargs: urls.append(url) or DummyResponse(200, []))
+    utils.get_events(*utils.calendar_window(utils.date(2026, 1, 15)))
+    assert urls == [f"{utils.API_URL}/calendar/?start=2025-12-01&end=2026-04-30"]
+
+
 def test_get_events_failure_returns_empty(monkeypatch):
     def boom(url, **kwargs):
         raise RuntimeError("network down")
 
-    monkeypatch.setattr(utils.requests, "get", boom)
+    monkeypatch.setattr(utils.SESSION, "get", boom)
     assert utils.get_events() == []
 
 
@@ -38,8 +56,8 @@ def test_shopping_list_and_delete(monkeypatch):
         captured["url"] = url
         return DummyResponse(200, {"message": "Item removed"})
 
-    monkeypatch.setattr(utils.requests, "get", fake_get)
-    monkeypatch.setattr(utils.requests, "delete", fake_delete)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "delete", fake_delete)
 
     assert utils.get_shopping_list() == [{"id": 1, "name": "Eggs"}]
     utils.remove_shopping_item(1)
@@ -57,8 +75,8 @@ def test_create_and_update_event_calls(monkeypatch):
         captured["put"] = (url, json)
         return DummyResponse(200, {"ok": True})
 
-    monkeypatch.setattr(utils.requests, "post", fake_post)
-    monkeypatch.setattr(utils.requests, "put", fake_put)
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
+    monkeypatch.setattr(utils.SESSION, "put", fake_put)
 
     utils.create_event({"title": "Study"})
     utils.update_event(5, {"title": "Updated"})
@@ -67,6 +85,27 @@ def test_create_and_update_event_calls(monkeypatch):
     assert captured["put"][0] == f"{utils.API_URL}/calendar/5"
 
 
+def test_patch_event_sends_version_and_reports_conflicts(monkeypatch):
+    captured = []
+
+    def fake_patch(url, json, **kwargs):
+        captured.append((url, json))
+        if json["version"] == 1:
+            return DummyResponse(409, {"detail": "The record was changed meanwhile (now at version 2)"})
+        return DummyResponse(200, {"id": 5, "title": "Moved", "version": 3})
+
+    monkeypatch.setattr(utils.SESSION, "patch", fake_patch)
+
+    assert utils.patch_event(5, {"title": "Moved"}, version=2) == {"id": 5, "title": "Moved", "version": 3}
+    with pytest.raises(utils.EditConflict):
+        utils.patch_event(5, {"title": "Moved"}, version=1)
+    monkeypatch.setattr(utils.SESSION, "patch", lambda url, **kwargs: DummyResponse(404, {"detail": "Event not found"}))
+    assert utils.patch_event(5, {"title": "Moved"}, version=2) is None
+    monkeypatch.setattr(utils.SESSION, "patch", lambda url, **kwargs: (_ for _ in ()).throw(utils.requests.ConnectionError()))
+    assert utils.patch_event(5, {"title": "Moved"}, version=2) is None
+    assert captured[0] == (f"{utils.API_URL}/calendar/5", {"title": "Moved", "version": 2})
+
+
 def test_expenses_and_debts_helpers(monkeypatch):
     def fake_get(url, **kwargs):
         if url.endswith("/expenses/"):
@@ -78,8 +117,8 @@ def test_expenses_and_debts_helpers(monkeypatch):
     def fake_post(url, json, **kwargs):
         return DummyResponse(200, {"id": 9})
 
-    monkeypatch.setattr(utils.requests, "get", fake_get)
-    monkeypatch.setattr(utils.requests, "post", fake_post)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
 
     assert utils.get_expenses() == [{"title": "Lunch"}]
     assert utils.get_debts() == [{"debtor": "Bob", "amount": 10}]
@@ -88,6 +127,37 @@ def test_expenses_and_debts_helpers(monkeypatch):
     utils.add_reimbursement({"from_person": "Bob", "to_person": "Alice", "amount": 5})
 
 
+def test_added_expense_refreshes_the_summary_and_log(monkeypatch):
+    calls = []
+    versions = {"house": 1, "events": 1, "shopping": 1, "expenses": 1, "reimbursements": 1}
+
+    def fake_get(url, **kwargs):
+        calls.append(url[len(utils.API_URL):].split("?")[0])
+        if url.endswith("/house/versions"):
+            return DummyResponse(200, dict(versions))
+        if "/expenses/summary" in url:
+            return DummyResponse(200, {"total": 10.0 * versions["expenses"], "count": versions["expenses"]})
+        return DummyResponse(200, {"items": [], "total": versions["expenses"]})
+
+    def fake_post(url, json, **kwargs):
+        versions["expenses"] += 1
+        return DummyResponse(200, {"id": 2, **json})
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
+    monkeypatch.setattr(utils, "RESPONSE_CACHE", utils.ResponseCache())
+    monkeypatch.setattr(utils.st, "session_state", {"auth_token": "tok"})
+
+    assert utils.get_expense_summary()["count"] == 1
+    assert utils.get_expenses_page()["total"] == 1
+    assert utils.add_expense({"title": "Dinner"})["id"] == 2
+    calls.clear()
+
+    assert utils.get_expense_summary()["count"] == 2
+    assert utils.get_expenses_page()["total"] == 2
+    assert calls == ["/house/versions", "/expenses/summary", "/expenses/page"]
+
+
 def test_house_settings_helpers(monkeypatch):
     captured = {}
 
@@ -99,8 +169,8 @@ def test_house_settings_helpers(monkeypatch):
         captured["payload"] = json
         return DummyResponse(200, json)
 
-    monkeypatch.setattr(utils.requests, "get", fake_get)
-    monkeypatch.setattr(utils.requests, "post", fake_post)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
 
     assert utils.get_house_settings() == {"name": "Test", "flatmates": ["A"]}
 
@@ -116,7 +186,7 @@ def test_reset_house_data(monkeypatch):
         captured["url"] = url
         return DummyResponse(200, {"message": "House and data reset"})
 
-    monkeypatch.setattr(utils.requests, "delete", fake_delete)
+    monkeypatch.setattr(utils.SESSION, "delete", fake_delete)
 
     assert utils.reset_house_data() is True
     assert captured["url"] == f"{utils.API_URL}/house/reset"
@@ -126,7 +196,7 @@ def test_reset_house_data_failure(monkeypatch):
     def boom(url, **kwargs):
         raise RuntimeError("network down")
 
-    monkeypatch.setattr(utils.requests, "delete", boom)
+    monkeypatch.setattr(utils.SESSION, "delete", boom)
 
     assert utils.reset_house_data() is False
 
@@ -135,7 +205,7 @@ def test_get_reimbursements_handles_failure(monkeypatch):
     def fake_get(url, **kwargs):
         raise RuntimeError("oops")
 
-    monkeypatch.setattr(utils.requests, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
     assert utils.get_reimbursements() == []
 
 
@@ -144,7 +214,7 @@ def test_get_reimbursements_success(monkeypatch):
         assert url == f"{utils.API_URL}/expenses/reimbursements"
         return DummyResponse(200, [{"id": 1, "amount": 10}])
 
-    monkeypatch.setattr(utils.requests, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
     assert utils.get_reimbursements() == [{"id": 1, "amount": 10}]
 
 
@@ -173,4 +243,459 @@ def test_resolve_api_url_missing_returns_none(monkeypatch):
     dummy_secrets = type("DummySecrets", (), {"get": missing_get})()
     monkeypatch.setattr(utils, "st", type("DummyStreamlit", (), {"secrets": dummy_secrets})())
 
-    assert utils._resolve_api_url() is None
\ No newline at end of file
+    assert utils._resolve_api_url() is None
+
+def test_change_feed_counts_topic_versions():
+    feed = utils.ChangeFeed("token")
+    feed.apply('{"topics": ["shopping", "events"]}')
+    feed.apply('{"topics": ["shopping"]}')
+    feed.apply("not json")
+
+    assert feed.snapshot(("shopping", "events", "expenses")) == (2, 1, 0)
+
+
+def test_run_house_job_polls_until_done(monkeypatch):
+    statuses = iter(["running", "done"])
+    progress = []
+
+    def fake_post(url, **kwargs):
+        assert url == f"{utils.API_URL}/house/reset"
+        return DummyResponse(202, {"id": "abc", "status": "queued"})
+
+    def fake_get(url, **kwargs):
+        assert url == f"{utils.API_URL}/jobs/abc"
+        return DummyResponse(200, {"id": "abc", "status": next(statuses), "progress": 2, "total": 4})
+
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+
+    assert utils.run_house_job("reset", on_progress=lambda d, t: progress.append((d, t)), poll_interval=0) is True
+    assert progress == [(2, 4), (2, 4)]
+
+
+def test_deleted_house_job_finishes_when_the_session_ends(monkeypatch):
+    monkeypatch.setattr(utils.SESSION, "post", lambda url, **kwargs: DummyResponse(202, {"id": "d1", "status": "running"}))
+    monkeypatch.setattr(utils.SESSION, "get", lambda url, **kwargs: DummyResponse(401, {"detail": "Invalid or expired token"}))
+
+    assert utils.run_house_job("delete", poll_interval=0, timeout=5) is True
+    assert utils.run_house_job("reset", poll_interval=0, timeout=0.05) is False
+
+
+def test_post_helpers_retry_with_same_idempotency_key(monkeypatch):
+    keys = []
+
+    def flaky_post(url, json, headers=None, **kwargs):
+        keys.append(headers["Idempotency-Key"])
+        if len(keys) == 1:
+            raise utils.requests.ConnectionError("reset")
+        return DummyResponse(200, {"id": 1})
+
+    monkeypatch.setattr(utils.SESSION, "post", flaky_post)
+    utils.add_expense({"title": "Dinner"})
+
+    assert len(keys) == 2
+    assert keys[0] == keys[1]
+
+
+def test_post_retries_while_first_delivery_is_in_progress(monkeypatch):
+    keys = []
+
+    def racing_post(url, json, headers=None, **kwargs):
+        keys.append(headers["Idempotency-Key"])
+        if len(keys) == 1:
+            raise utils.requests.Timeout("read timed out")
+        if len(keys) == 2:
+            return DummyResponse(409, {"detail": utils.IDEMPOTENCY_IN_PROGRESS})
+        return DummyResponse(200, {"id": 1})
+
+    monkeypatch.setattr(utils, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(utils.SESSION, "post", racing_post)
+
+    assert utils._post(f"{utils.API_URL}/expenses/", json={"title": "Dinner"}).status_code == 200
+    assert len(keys) == 3
+    assert len(set(keys)) == 1
+
+    keys.clear()
+    monkeypatch.setattr(utils.SESSION, "post", lambda url, **kwargs: keys.append(1) or DummyResponse(409, {"detail": "other"}))
+    assert utils._post(f"{utils.API_URL}/expenses/", json={}).status_code == 409
+    assert len(keys) == 1
+
+
+def test_auth_posts_are_sent_once_without_idempotency_key(monkeypatch):
+    calls = []
+
+    def timing_out_post(url, json=None, headers=None, **kwargs):
+        calls.append(headers or {})
+        raise utils.requests.Timeout("read timed out")
+
+    monkeypatch.setattr(utils.SESSION, "post", timing_out_post)
+
+    assert utils.register_user("ann", "pw", house_name="Flat") is None
+    assert utils.login_user("ann", "pw") is None
+    assert len(calls) == 2
+    assert not any("Idempotency-Key" in headers for headers in calls)
+
+
+def test_requests_use_shared_session_with_timeouts(monkeypatch):
+    captured = {}
+
+    def fake_get(url, **kwargs):
+        captured.update(kwargs)
+        return DummyResponse(200, [])
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    utils.CALL_LOG.clear()
+    utils.get_shopping_list()
+
+    assert captured["timeout"] == utils.API_TIMEOUT
+    stats = utils.get_call_stats()
+    assert stats[0]["path"] == "/shopping/"
+    assert stats[0]["calls"] == 1
+    assert stats[0]["errors"] == 0
+
+
+def test_session_retries_only_idempotent_methods():
+    retry = utils.SESSION.get_adapter(utils.API_URL).max_retries
+    assert retry.total == utils.API_RETRIES
+    assert "GET" in retry.allowed_methods
+    assert "POST" not in retry.allowed_methods
+
+
+def test_cached_lists_revalidate_with_one_versions_call(monkeypatch):
+    calls = []
+    versions = {"house": 1, "events": 1, "shopping": 1, "expenses": 1, "reimbursements": 1}
+
+    def fake_get(url, **kwargs):
+        calls.append(url[len(utils.API_URL):])
+        if url.endswith("/house/versions"):
+            return DummyResponse(200, dict(versions))
+        return DummyResponse(200, [{"id": len(calls)}])
+
+    def fake_put(url, **kwargs):
+        versions["events"] += 1
+        return DummyResponse(200, {})
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "put", fake_put)
+    monkeypatch.setattr(utils, "RESPONSE_CACHE", utils.ResponseCache())
+    monkeypatch.setattr(utils.st, "session_state", {"auth_token": "tok"})
+
+    first = utils.get_shopping_list()
+    utils.get_events()
+    assert utils.get_shopping_list() == first
+    assert calls == ["/house/versions", "/shopping/", "/calendar/"]
+
+    # Later rerun: one validation round trip, lists served from the cache.
+    monkeypatch.setattr(utils, "CACHE_REVALIDATE_SECONDS", 0)
+    calls.clear()
+    assert utils.get_shopping_list() == first
+    assert calls == ["/house/versions"]
+
+    # A mutation drops only the affected lists.
+    utils.update_event(1, {"title": "Moved"})
+    monkeypatch.setattr(utils, "CACHE_REVALIDATE_SECONDS", 60)
+    calls.clear()
+    utils.get_shopping_list()
+    utils.get_events()
+    assert calls == ["/house/versions", "/calendar/"]
+
+
+def test_fetch_all_runs_concurrently_and_isolates_failures():
+    def slow(value):
+        def fetch():
+            time.sleep(0.2)
+            return value
+        return fetch
+
+    def broken():
+        raise RuntimeError("boom")
+
+    start = time.perf_counter()
+    results = utils.fetch_all(
+        {"a": slow(1), "b": slow(2), "c": slow(3), "broken": broken},
+        defaults={"broken": []},
+    )
+
+    assert results == {"a": 1, "b": 2, "c": 3, "broken": []}
+    assert time.perf_counter() - start < 0.5
+
+
+def test_fetch_all_falls_back_to_defaults_after_deadline():
+    results = utils.fetch_all(
+        {"fast": lambda: "ok", "stuck": lambda: time.sleep(1) or "late"},
+        defaults={"stuck": "fallback"},
+        deadline=0.1,
+    )
+
+    assert results == {"fast": "ok", "stuck": "fallback"}
+
+
+def test_shopping_mutations_patch_cached_list(monkeypatch):
+    calls = []
+    versions = {"house": 1, "events": 1, "shopping": 1, "expenses": 1, "reimbursements": 1}
+
+    def fake_get(url, **kwargs):
+        calls.append(url[len(utils.API_URL):])
+        if url.endswith("/house/versions"):
+            return DummyResponse(200, dict(versions))
+        return DummyResponse(200, [{"id": 1, "name": "Eggs"}])
+
+    def fake_post(url, json, **kwargs):
+        versions["shopping"] += 1
+        return DummyResponse(200, {"id": 2, **json})
+
+    def failing_delete(url, **kwargs):
+        return DummyResponse(500, {})
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
+    monkeypatch.setattr(utils.SESSION, "delete", failing_delete)
+    monkeypatch.setattr(utils, "RESPONSE_CACHE", utils.ResponseCache())
+    monkeypatch.setattr(utils.st, "session_state", {"auth_token": "tok"})
+    monkeypatch.setattr(utils, "CACHE_REVALIDATE_SECONDS", 0)
+
+    utils.get_shopping_list()
+    calls.clear()
+
+    # The created item is added locally; revalidation confirms it without a refetch.
+    assert utils.add_shopping_item({"name": "Milk"}) == {"id": 2, "name": "Milk"}
+    assert [item["id"] for item in utils.get_shopping_list()] == [1, 2]
+    assert calls == ["/house/versions"]
+
+    # A delete the backend rejects is rolled back by refetching the list.
+    calls.clear()
+    assert utils.remove_shopping_item(1) is False
+    assert [item["id"] for item in utils.get_shopping_list()] == [1]
+    assert calls == ["/house/versions", "/shopping/"]
+
+
+def test_identical_gets_in_one_run_share_a_call(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        release.wait(1)
+        return DummyResponse(200, {"name": "Flat", "flatmates": ["A"]})
+
+    ctx = SimpleNamespace(session_id="s1", widget_ids_this_run=set())
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "post", lambda url, **kwargs: DummyResponse(200, {}))
+    monkeypatch.setattr(utils, "get_script_run_ctx", lambda suppress_warning=False: ctx)
+    monkeypatch.setattr(utils, "MEMO_STATS", {"requests": 0, "saved": 0})
+
+    threads = [threading.Thread(target=utils.get_house_settings) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert utils.get_house_settings() == {"name": "Flat", "flatmates": ["A"]}
+    assert len(calls) == 1
+    assert utils.get_dedup_stats() == {"requests": 4, "saved": 3}
+
+    # Writes and new runs start from a clean memo.
+    utils.update_house_settings({"name": "Other"})
+    utils.get_house_settings()
+    ctx.widget_ids_this_run = set()
+    utils.get_house_settings()
+    assert len(calls) == 3
+
+
+def test_job_polling_is_not_memoized_within_a_run(monkeypatch):
+    statuses = iter(["running", "running", "done"])
+    polls = []
+
+    def fake_get(url, **kwargs):
+        polls.append(url)
+        return DummyResponse(200, {"id": "j1", "status": next(statuses), "progress": len(polls), "total": 3})
+
+    ctx = SimpleNamespace(session_id="s1", widget_ids_this_run=set())
+    monkeypatch.setattr(utils, "get_script_run_ctx", lambda suppress_warning=False: ctx)
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils.SESSION, "post", lambda url, **kwargs: DummyResponse(202, {"id": "j1", "status": "queued"}))
+    monkeypatch.setattr(utils, "invalidate_cache", lambda *topics: None)
+
+    assert utils.run_house_job("reset", poll_interval=0, timeout=5) is True
+    assert polls == [f"{utils.API_URL}/jobs/j1"] * 3
+
+
+def test_perf_panel_records_calls_per_run(monkeypatch, tmp_path):
+    log_path = tmp_path / "perf.jsonl"
+    ctx = SimpleNamespace(session_id="s1", widget_ids_this_run=set())
+    monkeypatch.setattr(utils, "PERF_PANEL", True)
+    monkeypatch.setattr(utils, "PERF_LOG_PATH", str(log_path))
+    monkeypatch.setattr(utils, "get_script_run_ctx", lambda suppress_warning=False: ctx)
+    monkeypatch.setattr(utils.st, "session_state", {})
+    monkeypatch.setattr(utils.SESSION, "get", lambda url, **kwargs: DummyResponse(200, []))
+
+    for _ in range(2):
+        ctx.widget_ids_this_run = set()
+        utils._start_perf_run("1_Calendar")
+        utils.get_events()
+        utils.render_perf_panel()
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [record["rerun"] for record in records] == [1, 2]
+    assert records[0]["page"] == "1_Calendar"
+    assert records[0]["api_calls"] == 1
+    assert records[0]["calls"][0]["path"] == "/calendar/"
+    assert records[0]["script_ms"] >= records[0]["api_ms"]
+
+
+def test_calendar_view_is_compact_and_memoized(monkeypatch):
+    events = [
+        {"id": 1, "title": "Clean", "date": "2026-01-02", "start_time": "09:00:00", "end_time": "10:00:00",
+         "description": "Kitchen", "assigned_to": ["Bob"]},
+        {"id": 2, "title": "Party", "date": "2026-01-03", "start_time": None, "end_time": None,
+         "description": None, "assigned_to": []},
+    ]
+    def fake_get(url, **kwargs):
+        if url.endswith("/house/versions"):
+            return DummyResponse(200, {"events": 1})
+        return DummyResponse(200, events)
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    monkeypatch.setattr(utils, "RESPONSE_CACHE", utils.ResponseCache())
+    monkeypatch.setattr(utils.st, "session_state", {"auth_token": "tok"})
+    start, end = utils.calendar_window(utils.date(2026, 1, 2))
+
+    calendar_events, by_id = utils.calendar_view(utils.get_events(start, end), ["Ann", "Bob"], start, end)
+
+    assert calendar_events == [
+        {"id": "1", "title": "Clean (Bob)", "start": "2026-01-02T09:00:00", "color": utils.CALENDAR_COLORS[1],
+         "end": "2026-01-02T10:00:00"},
+        {"id": "2", "title": "Party (Everyone)", "start": "2026-01-03", "color": utils.DEFAULT_EVENT_COLOR},
+    ]
+    assert by_id["1"]["description"] == "Kitchen"
+
+    monkeypatch.setattr(utils, "build_calendar_events", lambda *args: pytest.fail("transform not memoized"))
+    assert utils.calendar_view(utils.get_events(start, end), ["Ann", "Bob"], start, end)[0] is calendar_events
+
+
+def test_occurrences_of_a_series_get_distinct_calendar_ids(monkeypatch):
+    rule = {"freq": "weekly", "interval": 1, "until": None, "count": None, "exdates": []}
+    events = [
+        {"id": 4, "title": "Bins", "date": "2026-01-05", "recurrence": rule, "series_id": 4, "occurrence": "2026-01-05"},
+        {"id": 4, "title": "Bins", "date": "2026-01-12", "recurrence": rule, "series_id": 4, "occurrence": "2026-01-12"},
+        {"id": 9, "title": "Bins", "date": "2026-01-20", "recurrence": None, "series_id": 4, "occurrence": "2026-01-19"},
+    ]
+    assert [item["id"] for item in utils.build_calendar_events(events, [])] == ["4:2026-01-05", "4:2026-01-12", "9"]
+
+    calls = []
+    monkeypatch.setattr(
+        utils, "_put", lambda url, **kwargs: calls.append(("PUT", url, kwargs["json"])) or DummyResponse(200, {})
+    )
+    monkeypatch.setattr(utils, "_delete", lambda url, **kwargs: calls.append(("DELETE", url, None)))
+    utils.update_occurrence(4, "2026-01-12", {"title": "Recycling"})
+    utils.cancel_occurrence(4, "2026-01-19")
+    assert calls == [
+        ("PUT", f"{utils.API_URL}/calendar/4/occurrences/2026-01-12", {"title": "Recycling"}),
+        ("DELETE", f"{utils.API_URL}/calendar/4/occurrences/2026-01-19", None),
+    ]
+
+
+def test_upcoming_and_day_event_helpers(monkeypatch):
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+        return DummyResponse(200, [{"id": 1}])
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+    today = utils.date.today().isoformat()
+
+    assert utils.get_upcoming_events(3, assignee="Bob") == [{"id": 1}]
+    assert utils.get_day_events(utils.date(2026, 1, 5)) == [{"id": 1}]
+    utils.get_availability(utils.date(2026, 1, 5), utils.date(2026, 1, 9), ["Ann", "Bob"], 45)
+    assert urls == [
+        f"{utils.API_URL}/calendar/upcoming?start={today}&limit=3&assignee=Bob",
+        f"{utils.API_URL}/calendar/day/2026-01-05",
+        f"{utils.API_URL}/calendar/availability?start=2026-01-05&end=2026-01-09&min_minutes=45&people=Ann&people=Bob",
+    ]
+
+
+def test_search_house_encodes_domains(monkeypatch):
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+        return DummyResponse(200, {"query": "oat", "hits": [{"domain": "shopping", "id": 3}], "limit": 5})
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+
+    assert utils.search_house("oat m", ["shopping", "expenses"], limit=5) == [{"domain": "shopping", "id": 3}]
+    assert urls == [f"{utils.API_URL}/search/?q=oat+m&limit=5&domains=shopping&domains=expenses"]
+
+
+def test_page_helpers_encode_sort_and_filters(monkeypatch):
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+        return DummyResponse(200, {"items": [{"id": 3}], "total": 41})
+
+    monkeypatch.setattr(utils.SESSION, "get", fake_get)
+
+    page = utils.get_expenses_page(offset=20, limit=20, sort="amount", descending=False, search="rent", person="")
+    assert page == {"items": [{"id": 3}], "total": 41}
+    utils.get_reimbursements_page(person="Bob")
+    assert urls == [
+        f"{utils.API_URL}/expenses/page?offset=20&limit=20&sort=amount&order=asc&q=rent",
+        f"{utils.API_URL}/expenses/reimbursements/page?offset=0&limit=20&sort=id&order=desc&person=Bob",
+    ]
+
+
+def test_diff_shopping_list_and_batch_save(monkeypatch):
+    items = [
+        {"id": 1, "name": "Milk", "quantity": 1, "added_by": "A", "purchased": False, "version": 1},
+        {"id": 2, "name": "Eggs", "quantity": 6, "added_by": "B", "purchased": False, "version": 4},
+        {"id": 3, "name": "Bread", "quantity": 1, "added_by": "A", "purchased": True, "version": 2},
+    ]
+    edited = [
+        {"id": 1, "quantity": 2.0, "purchased": False, "remove": False},
+        {"id": 2, "quantity": None, "purchased": True, "remove": False},
+        {"id": 3, "quantity": 1, "purchased": True, "remove": True},
+        {"id": 9, "quantity": 1, "purchased": False, "remove": True},
+    ]
+    batch = utils.diff_shopping_list(items, edited)
+    assert batch == {
+        "update": [{"id": 1, "quantity": 2}, {"id": 2, "purchased": True}],
+        "delete": [3],
+        "versions": {"1": 1, "2": 4, "3": 2},
+    }
+    unchanged = utils.diff_shopping_list(items, [dict(i, remove=False) for i in items])
+    assert unchanged == {"update": [], "delete": [], "versions": {}}
+
+    posts = []
+
+    def fake_post(url, **kwargs):
+        posts.append((url, kwargs["json"]))
+        return DummyResponse(200, [{"id": 1, "quantity": 2}])
+
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
+    assert utils.apply_shopping_changes(batch) is True
+    assert posts == [(f"{utils.API_URL}/shopping/batch", batch)]
+
+    monkeypatch.setattr(utils.SESSION, "post", lambda url, **kwargs: DummyResponse(409, {"detail": "changed"}))
+    with pytest.raises(utils.EditConflict):
+        utils.apply_shopping_changes(batch)
+
+
+def test_calendar_feed_url_and_ics_import(monkeypatch):
+    monkeypatch.setattr(utils.st, "session_state", {"auth_token": "session"})
+    monkeypatch.setattr(utils.SESSION, "get", lambda url, **kwargs: DummyResponse(200, {"token": "feed one"}))
+    assert utils.calendar_feed_url() == f"{utils.API_URL}/calendar/feed.ics?token=feed+one"
+
+    sent = {}
+
+    def fake_post(url, **kwargs):
+        sent.update(url=url, **kwargs)
+        return DummyResponse(200, {"imported": {"events": 2}, "total": 2})
+
+    monkeypatch.setattr(utils.SESSION, "post", fake_post)
+    assert utils.import_calendar(b"BEGIN:VCALENDAR")["total"] == 2
+    assert sent["url"] == f"{utils.API_URL}/calendar/import"
+    assert sent["data"] == b"BEGIN:VCALENDAR"
+    assert sent["headers"]["Content-Type"] == "text/calendar"